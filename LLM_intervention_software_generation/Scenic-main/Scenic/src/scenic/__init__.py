@@ -1,8 +1,33 @@
 """A compiler and scene generator for the Scenic scenario description language."""
 
+import importlib as _importlib
+
 import scenic.core.errors as _errors
 from scenic.core.errors import setDebuggingOptions
-from scenic.syntax.translator import scenarioFromFile, scenarioFromString
 
 _errors.showInternalBacktrace = False  # see comment in errors module
 del _errors
+
+# The compiler (and through it, the geometry libraries Scenic depends on) is only
+# imported when first needed, so that tools which only use part of Scenic (e.g. the
+# serialization format or the command-line help) start up quickly.
+_lazyAttributes = {
+    "scenarioFromFile": "scenic.syntax.translator",
+    "scenarioFromString": "scenic.syntax.translator",
+}
+_lazySubmodules = {"core", "domains", "formats", "simulators", "syntax"}
+
+
+def __getattr__(name):
+    if name in _lazyAttributes:
+        value = getattr(_importlib.import_module(_lazyAttributes[name]), name)
+    elif name in _lazySubmodules:
+        value = _importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazyAttributes) | _lazySubmodules)
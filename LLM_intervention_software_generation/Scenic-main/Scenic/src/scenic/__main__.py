@@ -11,10 +11,7 @@ import warnings
 import numpy
 
 import scenic
-from scenic.core.distributions import RejectionException
 import scenic.core.errors as errors
-from scenic.core.simulators import SimulationCreationError
-import scenic.syntax.translator as translator
 
 parser = argparse.ArgumentParser(
     prog="scenic",
@@ -79,6 +76,15 @@ simOpts.add_argument(
     metavar="N",
     help="max # of rejected simulations before sampling a new scene (default 1)",
 )
+simOpts.add_argument(
+    "--workers",
+    type=int,
+    metavar="N",
+    help=(
+        "run simulations in N parallel worker processes (requires --count, "
+        "which then counts attempted simulations, including rejected ones)"
+    ),
+)
 
 # Interactive rendering options
 intOptions = parser.add_argument_group("static scene diagramming options")
@@ -151,6 +157,12 @@ parser.add_argument("scenicFile", help="a Scenic file to run", metavar="FILE")
 
 # Parse arguments and set up configuration
 args = parser.parse_args()
+
+# Import the compiler only now, so that --help and --version return quickly
+from scenic.core.distributions import RejectionException
+from scenic.core.simulators import SimulationCreationError
+import scenic.syntax.translator as translator
+
 delay = args.delay
 mode2D = getattr(args, "2d")
 
@@ -188,6 +200,41 @@ if args.seed is not None:
     random.seed(args.seed)
     numpy.random.seed(args.seed)
 
+# Run simulations in parallel if requested, compiling the scenario in the workers
+if args.workers is not None:
+    if not args.simulate or args.count <= 0:
+        parser.error("--workers requires --simulate and a positive --count")
+    if args.gather_stats is not None:
+        parser.error("--gather-stats cannot be used with --workers")
+    from scenic.batch import simulateBatch
+
+    batch = simulateBatch(
+        args.scenicFile,
+        args.count,
+        workers=args.workers,
+        seed=args.seed,
+        params=params,
+        model=args.model,
+        scenario=args.scenario,
+        mode2D=mode2D,
+        maxSteps=args.time,
+        maxIterations=args.max_sims_per_scene,
+        verbosity=0 if args.verbosity <= 1 else args.verbosity,
+    )
+    for result in batch:
+        if args.verbosity >= 1:
+            if result.error is not None:
+                outcome = f"failed: {result.error}"
+            elif result.simulation is None:
+                outcome = "rejected"
+            else:
+                outcome = f"{result.steps} steps ({result.terminationReason})"
+            print(f"  Simulation {result.index} in {result.time:.4g} seconds: {outcome}")
+        if result.records and args.show_records:
+            for name, value in result.records.items():
+                print(f'    Record "{name}": {value}')
+    sys.exit()
+
 # Load scenario from file
 if args.verbosity >= 1:
     print("Beginning scenario construction...")
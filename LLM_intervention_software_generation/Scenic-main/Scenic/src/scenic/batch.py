@@ -0,0 +1,266 @@
+"""Running batches of simulations in parallel worker processes.
+
+The `simulateBatch` function generates scenes from one or more Scenic files and
+simulates them, distributing the simulations across a pool of worker processes. Each
+worker keeps a `ScenarioServer`, so that every file is compiled (and its simulator
+created) at most once per worker, no matter how many simulations of it the worker
+runs. Results are yielded as soon as they are available, as `BatchResult` objects
+holding a summary of the simulation together with its serialized form (see
+:ref:`serialization`), from which the simulation can be replayed.
+
+Batches can also be run from the command line::
+
+    python -m scenic.batch --count 100 --workers 8 --output results/ *.scenic
+
+or, for a single file, using the :option:`--workers` option of the ``scenic`` command.
+"""
+
+import argparse
+import dataclasses
+import itertools
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import random
+import time
+
+import scenic.core.errors as errors
+from scenic.server import ScenarioServer, _decode
+
+
+@dataclasses.dataclass
+class BatchResult:
+    """The result of one simulation run by `simulateBatch`.
+
+    If the simulation could not be run (e.g. because the scene could not be generated
+    or the simulator raised an exception), ``error`` describes the problem and
+    ``simulation`` is `None`; if the simulation was rejected (for example because a
+    requirement was violated), both are `None`.
+    """
+
+    #: Path of the Scenic file simulated.
+    file: str
+    #: Index of the simulation among those of the same file.
+    index: int
+    #: Random seed used to generate the scene and run the simulation.
+    seed: int
+    #: The simulation, serialized as by `Scenario.simulationToBytes`.
+    simulation: bytes = None
+    steps: int = None
+    terminationType: str = None
+    terminationReason: str = None
+    records: dict = None
+    error: str = None
+    #: Wall-clock time taken by the worker, in seconds.
+    time: float = None
+
+    def replay(self, scenario, simulator, **kwargs):
+        """Replay this simulation, using the scenario compiled from `file`.
+
+        Keyword arguments are passed to `Scenario.simulationFromBytes`.
+        """
+        return scenario.simulationFromBytes(self.simulation, simulator, **kwargs)
+
+
+# State of each worker process
+_server = None
+_options = None
+
+
+def _initializeWorker(options, preload, verbosity):
+    global _server, _options
+    errors.setDebuggingOptions(verbosity=verbosity)
+    _server = ScenarioServer(preload=preload)
+    _options = options
+    # Destroy simulators when the pool shuts down
+    multiprocessing.util.Finalize(None, _server.close, exitpriority=10)
+
+
+def _runTask(task):
+    path, index, seed = task
+    result = BatchResult(file=path, index=index, seed=seed)
+    startTime = time.time()
+    try:
+        response = _server.handle("simulate", dict(_options, file=path, seed=seed))
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    else:
+        if response["simulation"] is not None:
+            result.simulation = _decode(response["simulation"])
+            result.steps = response["steps"]
+            result.terminationType = response["terminationType"]
+            result.terminationReason = response["terminationReason"]
+            result.records = response["records"]
+    result.time = time.time() - startTime
+    return result
+
+
+def simulateBatch(
+    files,
+    count=1,
+    *,
+    workers=None,
+    seed=None,
+    params=None,
+    model=None,
+    scenario=None,
+    mode2D=False,
+    maxSteps=None,
+    maxIterations=1,
+    preload=(),
+    verbosity=0,
+    mpContext=None,
+):
+    """Simulate scenes from Scenic files in parallel.
+
+    Simulation *i* of each file uses the random seed ``seed + i``, so results do not
+    depend on the number of workers or on how the simulations are scheduled.
+
+    Args:
+        files: Path of a Scenic file, or a list of paths.
+        count (int): Number of simulations to run for each file.
+        workers (int): Number of worker processes; by default, the number of CPUs.
+        seed (int): Base random seed; by default, one is chosen at random.
+        params, model, scenario, mode2D: As for `scenarioFromFile`.
+        maxSteps, maxIterations: As for `Simulator.simulate`.
+        preload: Names of modules (e.g. simulator interfaces) for each worker to
+            import when it starts.
+        verbosity (int): Verbosity level used in the workers.
+        mpContext: `multiprocessing` context to use to create the workers.
+
+    Returns:
+        An iterator yielding a `BatchResult` for each simulation, in the order in
+        which they complete.
+    """
+    if isinstance(files, (str, os.PathLike)):
+        files = [files]
+    files = [os.fspath(path) for path in files]
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    tasks = [
+        (path, index, seed + index)
+        for path, index in itertools.product(files, range(count))
+    ]
+    options = {
+        "params": {} if params is None else params,
+        "model": model,
+        "scenario": scenario,
+        "mode2D": mode2D,
+        "maxSteps": maxSteps,
+        "maxIterations": maxIterations,
+    }
+    if workers is None:
+        workers = os.cpu_count()
+    workers = max(1, min(workers, len(tasks)))
+    if mpContext is None:
+        mpContext = multiprocessing.get_context()
+
+    def results():
+        pool = mpContext.Pool(
+            workers,
+            initializer=_initializeWorker,
+            initargs=(options, tuple(preload), verbosity),
+        )
+        try:
+            yield from pool.imap_unordered(_runTask, tasks)
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    return results()
+
+
+def saveResult(result, directory):
+    """Save a `BatchResult` into a directory.
+
+    The serialized simulation (if any) is saved in a file named after the Scenic file
+    and the index of the simulation, with extension ``.replay``; the remaining fields
+    of the result are appended to the file ``results.jsonl``.
+    """
+    os.makedirs(directory, exist_ok=True)
+    summary = dataclasses.asdict(result)
+    if result.simulation is not None:
+        stem = os.path.splitext(os.path.basename(result.file))[0]
+        name = f"{stem}-{result.index}.replay"
+        with open(os.path.join(directory, name), "wb") as stream:
+            stream.write(result.simulation)
+        summary["simulation"] = name
+    with open(os.path.join(directory, "results.jsonl"), "a") as stream:
+        stream.write(json.dumps(summary, default=repr) + "\n")
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m scenic.batch",
+        description="Simulate scenes from Scenic files in parallel.",
+    )
+    parser.add_argument("files", nargs="+", metavar="FILE", help="Scenic files to run")
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=1,
+        help="number of simulations to run per file (default 1)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument("-s", "--seed", type=int, help="base random seed")
+    parser.add_argument("--time", type=int, help="time bound for simulations")
+    parser.add_argument(
+        "--max-sims-per-scene",
+        type=int,
+        default=1,
+        metavar="N",
+        help="max # of rejected simulations before sampling a new scene (default 1)",
+    )
+    parser.add_argument("-m", "--model", help="specify a Scenic world model")
+    parser.add_argument(
+        "--2d", action="store_true", help="run Scenic in 2D compatibility mode"
+    )
+    parser.add_argument(
+        "--preload",
+        action="append",
+        default=[],
+        metavar="MODULE",
+        help="module for each worker to import at startup",
+    )
+    parser.add_argument(
+        "-o", "--output", metavar="DIR", help="directory in which to save results"
+    )
+    args = parser.parse_args(args)
+
+    batch = simulateBatch(
+        args.files,
+        args.count,
+        workers=args.workers,
+        seed=args.seed,
+        model=args.model,
+        mode2D=getattr(args, "2d"),
+        maxSteps=args.time,
+        maxIterations=args.max_sims_per_scene,
+        preload=args.preload,
+    )
+    failures = 0
+    for result in batch:
+        if result.error is not None:
+            failures += 1
+            outcome = f"error: {result.error}"
+        elif result.simulation is None:
+            outcome = "rejected"
+        else:
+            outcome = f"{result.steps} steps, {result.terminationReason}"
+        print(f"{result.file} #{result.index} (seed {result.seed}): {outcome}")
+        if args.output is not None:
+            saveResult(result, args.output)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,14 +3,13 @@
 import functools
 import inspect
 import itertools
-import sys
 import warnings
 
 from scenic.core.distributions import Samplable, toDistribution
 import scenic.core.dynamics as dynamics
 from scenic.core.errors import InvalidScenarioError
 from scenic.core.type_support import CoercionFailure
-from scenic.core.utils import alarm
+from scenic.core.utils import deadline
 
 from .invocables import Invocable
 from .utils import StuckBehaviorWarning
@@ -94,9 +93,9 @@ class Behavior(Invocable, Samplable):
         super()._step()
         assert self._runningIterator
 
-        def alarmHandler(signum, frame):
+        def stuckHandler(tracer):
             # NOTE: if using pytest-cov, sys.gettrace() set to CTracer(), but we still want timeout warnings enabled
-            if sys.gettrace() and "coverage" not in str(type(sys.gettrace())):
+            if tracer and "coverage" not in str(type(tracer)):
                 return  # skip the warning if we're in the debugger
             warnings.warn(
                 f"the behavior {self} is taking a long time to take an action; "
@@ -105,7 +104,7 @@ class Behavior(Invocable, Samplable):
             )
 
         timeout = dynamics.stuckBehaviorWarningTimeout
-        with veneer.executeInBehavior(self), alarm(timeout, alarmHandler):
+        with veneer.executeInBehavior(self), deadline(timeout, stuckHandler):
             try:
                 actions = self._runningIterator.send(None)
             except StopIteration:
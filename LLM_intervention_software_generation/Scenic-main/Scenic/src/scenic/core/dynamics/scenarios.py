@@ -13,12 +13,13 @@ import scenic
 import scenic.core.dynamics as dynamics
 from scenic.core.errors import InvalidScenarioError, ScenicSyntaxError
 from scenic.core.lazy_eval import DelayedArgument, needsLazyEvaluation
+import scenic.core.propositions as propositions
 from scenic.core.requirements import (
     DynamicRequirement,
     PendingRequirement,
     RequirementType,
 )
-from scenic.core.utils import alarm, argsToString
+from scenic.core.utils import argsToString, deadline
 from scenic.core.workspaces import Workspace
 
 from .actions import _EndScenarioAction, _EndSimulationAction
@@ -222,10 +223,11 @@ class DynamicScenario(Invocable):
         super()._step()
 
         # Check temporal requirements
-        for m in self._requirementMonitors:
-            result = m.value()
-            if result == rv_ltl.B4.FALSE:
-                raise RejectSimulationException(str(m))
+        with propositions.sharedAtomicValues():
+            for m in self._requirementMonitors:
+                result = m.value()
+                if result == rv_ltl.B4.FALSE:
+                    raise RejectSimulationException(str(m))
 
         # Check if we have reached the time limit, if any
         if (
@@ -241,8 +243,8 @@ class DynamicScenario(Invocable):
             composeDone = True  # compose block ended in an earlier step
         else:
 
-            def alarmHandler(signum, frame):
-                if sys.gettrace():
+            def stuckHandler(tracer):
+                if tracer:
                     return  # skip the warning if we're in the debugger
                 warnings.warn(
                     f"the compose block of scenario {self} is taking a long time; "
@@ -251,7 +253,7 @@ class DynamicScenario(Invocable):
                 )
 
             timeout = dynamics.stuckBehaviorWarningTimeout
-            with veneer.executeInScenario(self), alarm(timeout, alarmHandler):
+            with veneer.executeInScenario(self), deadline(timeout, stuckHandler):
                 try:
                     result = self._runningIterator.send(None)
                     if isinstance(result, (_EndSimulationAction, _EndScenarioAction)):
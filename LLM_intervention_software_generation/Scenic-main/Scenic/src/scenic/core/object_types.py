@@ -84,7 +84,7 @@ from scenic.core.vectors import (
     alwaysGlobalOrientation,
     globalOrientation,
 )
-from scenic.core.visibility import canSee
+from scenic.core.visibility import canSee, canSeeMany
 
 ## Types
 #: Type alias for an interval (a pair of floats).
@@ -1268,6 +1268,33 @@ class Object(OrientedPoint):
             debug=debug,
         )
 
+    def canSeeMany(self, others, occludingObjects=tuple()):
+        """Whether or not this `Object` can see each of ``others``.
+
+        Equivalent to calling `canSee` on each of ``others``, but faster since
+        the visibility rays are tested for occlusion all at once.
+
+        Args:
+            others: A sequence of `Point`, `OrientedPoint`, or `Object` instances
+              to check for visibility.
+            occludingObjects: A list of objects that can occlude visibility.
+
+        Returns:
+            A list of booleans, one for each of ``others``.
+        """
+        true_position = self.position.offsetLocally(self.orientation, self.cameraOffset)
+        return canSeeMany(
+            position=true_position,
+            orientation=self.orientation,
+            visibleDistance=self.visibleDistance,
+            viewAngles=self.viewAngles,
+            rayCount=self.viewRayCount,
+            rayDensity=self.viewRayDensity,
+            distanceScaling=self.viewRayDistanceScaling,
+            targets=others,
+            occludingObjects=occludingObjects,
+        )
+
     @cached_property
     def corners(self):
         """A tuple containing the corners of this object's bounding box"""
@@ -1298,9 +1325,21 @@ class Object(OrientedPoint):
     def occupiedSpace(self):
         """A region representing the space this object occupies"""
         shape = self.shape
+        dimensions = (self.width, self.length, self.height)
+        deps = (self.position, self.orientation, shape) + dimensions
+        if not any(isLazy(v) for v in deps):
+            # Share the scaled mesh (and data derived from it) with other objects of
+            # the same shape and dimensions; see MeshVolumeRegion._instanced.
+            return MeshVolumeRegion._instanced(
+                shape.mesh,
+                dimensions,
+                position=self.position,
+                rotation=self.orientation,
+                isConvex=shape.isConvex,
+            )
         return MeshVolumeRegion(
             mesh=shape.mesh,
-            dimensions=(self.width, self.length, self.height),
+            dimensions=dimensions,
             position=self.position,
             rotation=self.orientation,
             centerMesh=False,
@@ -1328,7 +1367,11 @@ class Object(OrientedPoint):
     @cached_property
     def boundingBox(self):
         """A region representing this object's bounding box"""
-        return MeshVolumeRegion(self.occupiedSpace.mesh.bounding_box, centerMesh=False)
+        occupiedSpace = self.occupiedSpace
+        if isLazy(occupiedSpace):
+            return MeshVolumeRegion(occupiedSpace.mesh.bounding_box, centerMesh=False)
+        box = trimesh.creation.box(bounds=occupiedSpace._bounds)
+        return MeshVolumeRegion(box, centerMesh=False)
 
     @cached_property
     def inradius(self):
@@ -1,5 +1,6 @@
 """Objects representing propositions that can be used to specify conditions"""
 
+from contextlib import contextmanager
 from functools import reduce
 import operator
 from typing import List
@@ -9,22 +10,59 @@ import rv_ltl
 from scenic.core.errors import InvalidScenarioError
 from scenic.core.lazy_eval import needsLazyEvaluation
 
+#: Values of atomic propositions shared between monitors; see `sharedAtomicValues`.
+_sharedValues = None
+_missing = object()
+
+
+@contextmanager
+def sharedAtomicValues():
+    """Context manager sharing the values of identical atomic propositions.
+
+    Inside this context, atomic propositions of different monitors which have the same
+    code and bindings (e.g. the condition ``A`` in ``require always A implies B`` and
+    ``require always A implies C``) are evaluated only once. This should only be used
+    while the state the propositions depend on does not change, e.g. while checking
+    the requirements of a scenario at a single time step.
+    """
+    global _sharedValues
+    if _sharedValues is not None:
+        yield
+        return
+    _sharedValues = {}
+    try:
+        yield
+    finally:
+        _sharedValues = None
+
 
 class PropositionMonitor:
     def __init__(self, proposition: "PropositionNode") -> None:
         self._proposition = proposition
         self._monitor = proposition.ltl_node.create_monitor()
 
+        # Compile the proposition into a flat list of the atomic propositions to
+        # evaluate at each time step, so that we needn't walk the tree every step
+        plan = {}
+        for ap in proposition.atomics():
+            plan[str(ap.syntax_id)] = (ap.closure, ap.sharingKey())
+        self._plan = tuple((key,) + entry for key, entry in plan.items())
+
     def update(self):
-        atomic_propositions = self._proposition.atomics()
+        shared = _sharedValues
         state = {}
-        for ap in atomic_propositions:
-            b = ap.closure()
+        for key, closure, sharingKey in self._plan:
+            if shared is None:
+                b = closure()
+            else:
+                b = shared.get(sharingKey, _missing)
+                if b is _missing:
+                    b = shared[sharingKey] = closure()
             if needsLazyEvaluation(b):
                 raise InvalidScenarioError(
                     f"value undefined outside of object definition"
                 )
-            state[str(ap.syntax_id)] = b
+            state[key] = b
         self._monitor.update(state)
         return self._monitor.evaluate()
 
@@ -113,6 +151,23 @@ class Atomic(PropositionNode):
     def evaluate(self):
         return self.closure()
 
+    def sharingKey(self):
+        """Key identifying atomic propositions which always have the same value.
+
+        Two atomic propositions have the same key if their closures have the same code
+        (ignoring line numbers) and refer to the same global namespace and cells.
+        """
+        code = self.closure.__code__
+        cells = self.closure.__closure__ or ()
+        return (
+            code.co_code,
+            code.co_consts,
+            code.co_names,
+            code.co_freevars,
+            id(self.closure.__globals__),
+            tuple(id(cell) for cell in cells),
+        )
+
 
 class UnaryProposition(PropositionNode):
     """Base class for temporal unary operators"""
@@ -6,6 +6,9 @@ compilation (from `translator.constructScenarioFrom`).
 
 import builtins
 import collections
+import concurrent.futures
+import dataclasses
+import hashlib
 import math
 import time
 
@@ -27,13 +30,16 @@ from scenic.core.distributions import (
 )
 from scenic.core.errors import InvalidScenarioError
 from scenic.core.geometry import hypot, normalizeAngle, plotPolygon, polygonUnion
+from scenic.core.lazy_eval import isLazy
 from scenic.core.object_types import Object, Point
 import scenic.core.regions as regions
 from scenic.core.regions import (
     EmptyRegion,
+    MeshRegion,
     MeshSurfaceRegion,
     MeshVolumeRegion,
     PolygonalRegion,
+    PolygonCache,
     Region,
     VoxelRegion,
 )
@@ -51,6 +57,190 @@ from scenic.syntax.relations import DistanceRelation, RelativeHeadingRelation
 ### Constants
 PRUNING_PITCH = 0.15
 
+#: Maximum number of voxels used to approximate an eroded container when positions
+#: are sampled directly from the approximation (see `pruneContainment`).
+MAX_PRUNING_VOXELS = 2**18
+
+#: Maximum number of results kept in the pruning cache (see `clearCache`).
+PRUNING_CACHE_SIZE = 256
+
+#: Approximate maximum total size in bytes of the geometry of the regions kept in the
+#: pruning cache (see `clearCache`).
+PRUNING_CACHE_BYTES = 2**28
+
+#: Default number of threads used by `prune` for independent computations.
+#:
+#: Parallel pruning is opt-in, since the lazily-computed properties of regions and
+#: meshes (and the caches of `PolygonCache` and `MeshVolumeRegion`) are not
+#: thread-safe: only use more than one thread if no other thread is using the
+#: regions of the scenario being pruned.
+PRUNING_WORKERS = 1
+
+
+### Statistics
+@dataclasses.dataclass
+class PassStatistics:
+    """Statistics about one pass of `prune`."""
+
+    #: Name of the pass.
+    name: str
+    #: Wall-clock time taken by the pass, in seconds.
+    time: float = 0
+    #: Percentage of space pruned for each object whose position was restricted (or
+    #: `None` if the percentage could not be computed).
+    percentages: list = dataclasses.field(default_factory=list)
+    #: Number of results taken from the pruning cache.
+    cacheHits: int = 0
+
+    def __str__(self):
+        known = [p for p in self.percentages if p is not None]
+        mean = f", mean {sum(known) / len(known):.1f}% of space" if known else ""
+        count = len(self.percentages)
+        objects = "object" if count == 1 else "objects"
+        return (
+            f"{self.name} pruning took {self.time:.4g} seconds "
+            f"({count} {objects} restricted{mean}; "
+            f"{self.cacheHits} cached results)"
+        )
+
+
+### Caching
+
+# Results of pruning computations, keyed by the geometry of the regions involved
+# together with the parameters of the computation (see `geometryKey`). Objects with
+# the same requirements in the same workspace, e.g. when compiling a scenario again
+# or compiling several scenarios on the same map, then share results. Values are pairs
+# of a result and its approximate size (see `resultSize`); the cached regions, and
+# anything they refer to, stay alive until evicted or `clearCache` is called.
+_cache = collections.OrderedDict()
+
+
+def clearCache():
+    """Forget all cached pruning results.
+
+    The cache holds at most `PRUNING_CACHE_SIZE` results whose geometry takes up at
+    most about `PRUNING_CACHE_BYTES` bytes; calling this function frees it entirely,
+    e.g. once no more scenarios will be compiled in the same workspace.
+    """
+    _cache.clear()
+
+
+def resultSize(result):
+    """Approximate size in bytes of the geometry of a pruning result."""
+    if isinstance(result, MeshRegion):
+        mesh = result.mesh
+        return mesh.vertices.nbytes + mesh.faces.nbytes
+    if isinstance(result, VoxelRegion):
+        return result._occupancy.nbytes
+    if isinstance(result, (PolygonalRegion, regions.PolygonalFootprintRegion)):
+        return 16 * shapely.get_num_coordinates(result.polygons)
+    return 0
+
+
+def geometryKey(region):
+    """A hashable key identifying the geometry of a fixed region.
+
+    Regions with the same key are of the same type and contain the same points, but
+    may have different preferred orientations. Returns `None` for regions whose
+    geometry cannot be identified this way.
+    """
+    if isLazy(region):
+        return None
+    name = type(region).__name__
+    if isinstance(region, (regions.AllRegion, EmptyRegion)):
+        return (name,)
+    if isinstance(region, PolygonalRegion):
+        return (name, PolygonCache.keyFor(region.polygons), region.z)
+    if isinstance(region, regions.PolygonalFootprintRegion):
+        return (name, PolygonCache.keyFor(region.polygons))
+    if isinstance(region, MeshRegion):
+        mesh = region.mesh
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(numpy.ascontiguousarray(mesh.vertices, dtype=float).tobytes())
+        digest.update(numpy.ascontiguousarray(mesh.faces, dtype=numpy.int64).tobytes())
+        return (name, digest.hexdigest(), region.tolerance)
+    if isinstance(region, VoxelRegion):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(numpy.packbits(region._occupancy).tobytes())
+        digest.update(repr(region._occupancy.shape).encode())
+        digest.update(region._transform.tobytes())
+        return (name, digest.hexdigest())
+    return None
+
+
+def fieldKey(field):
+    """A hashable key identifying the cells of a `PolygonalVectorField`."""
+    digest = hashlib.blake2b(digest_size=16)
+    for cell, heading in field.cells:
+        digest.update(shapely.to_wkb(cell))
+        digest.update(repr(heading).encode())
+    return digest.hexdigest()
+
+
+def _copyRegion(region):
+    """Make a shallow copy of a cached region, so that it can be modified safely."""
+    if not isinstance(region, Region):
+        return region
+    copied = object.__new__(type(region))
+    copied.__dict__.update(region.__dict__)
+    copied._conditioned = copied
+    return copied
+
+
+def runCached(jobs, statistics=None, workers=1):
+    """Run independent pruning computations, using the cache where possible.
+
+    Jobs with the same key are only computed once. Those whose results are not in the
+    cache are run in a pool of threads if **workers** is more than 1, since the
+    underlying geometric operations can run in parallel (but see `PRUNING_WORKERS`).
+
+    Args:
+        jobs: Sequence of triples ``(key, function, args)``, where ``key`` identifies
+            the result of ``function(*args)`` (or is `None` if it should not be
+            cached).
+        statistics (`PassStatistics`): If given, cache hits are counted there.
+        workers (int): Maximum number of threads to use.
+
+    Returns:
+        The list of results of the jobs. Regions are copied, so that each result can
+        be modified independently.
+    """
+    results = [None] * len(jobs)
+    pending = {}
+    for index, (key, function, args) in enumerate(jobs):
+        if key is not None and key in _cache:
+            _cache.move_to_end(key)
+            results[index] = _cache[key][0]
+            if statistics is not None:
+                statistics.cacheHits += 1
+        else:
+            group = ("uncached", index) if key is None else key
+            pending.setdefault(group, []).append(index)
+
+    computations = [jobs[indices[0]] for indices in pending.values()]
+    if workers > 1 and len(computations) > 1:
+        with concurrent.futures.ThreadPoolExecutor(
+            min(workers, len(computations))
+        ) as executor:
+            futures = [executor.submit(func, *args) for _, func, args in computations]
+            values = [future.result() for future in futures]
+    else:
+        values = [func(*args) for _, func, args in computations]
+
+    for indices, value in zip(pending.values(), values):
+        for index in indices:
+            results[index] = value
+        key = jobs[indices[0]][0]
+        if key is not None:
+            _cache[key] = (value, resultSize(value))
+            while _cache and (
+                len(_cache) > PRUNING_CACHE_SIZE
+                or sum(size for _, size in _cache.values()) > PRUNING_CACHE_BYTES
+            ):
+                _cache.popitem(last=False)
+
+    return [_copyRegion(result) for result in results]
+
 
 ### Utilities
 def currentPropValue(obj, prop):
@@ -73,6 +263,19 @@ def isFunctionCall(thing, function):
     return thing.function is underlyingFunction(function)
 
 
+def voxelErosionPitch(container, maxErosion):
+    """Voxel size for eroding a `MeshVolumeRegion` by at most the given distance.
+
+    The size is chosen so that three erosion passes are possible, unless that would
+    need more than `MAX_PRUNING_VOXELS` voxels. It is returned as a fraction of the
+    largest extent of the container, as expected by ``_erodeOverapproximate``.
+    """
+    extents = container.mesh.extents
+    pitch = maxErosion / (4.5 * math.sqrt(3))
+    minPitch = (numpy.prod(extents) / MAX_PRUNING_VOXELS) ** (1 / 3)
+    return min(max(pitch, minPitch) / max(extents), 1)
+
+
 def unpackWorkspace(reg):
     if isinstance(reg, Workspace):
         return reg.region
@@ -152,7 +355,7 @@ def matchPolygonalField(heading, position):
 ### Pruning procedures
 
 
-def prune(scenario, verbosity=1):
+def prune(scenario, verbosity=1, workers=None):
     """Prune a `Scenario`, removing infeasible parts of the space.
 
     This function directly modifies the Distributions used in the Scenario,
@@ -163,22 +366,46 @@ def prune(scenario, verbosity=1):
 
         * Pruning based on containment (`pruneContainment`)
         * Pruning based on relative heading bounds (`pruneRelativeHeading`)
+        * Pruning based on visibility (`pruneVisibility`)
+
+    Results of the underlying geometric computations are cached (see `clearCache`), and
+    independent computations can be run in parallel using up to **workers** threads (by
+    default, `PRUNING_WORKERS`, i.e. serially).
+
+    Returns:
+        A list of `PassStatistics`, one for each technique.
     """
+    if workers is None:
+        workers = PRUNING_WORKERS
+
     if verbosity >= 1:
         print("  Pruning scenario...")
         startTime = time.time()
 
-    pruneContainment(scenario, verbosity)
-    pruneRelativeHeading(scenario, verbosity)
-    pruneVisibility(scenario, verbosity)
+    passes = (
+        ("Containment", pruneContainment),
+        ("Relative heading", pruneRelativeHeading),
+        ("Visibility", pruneVisibility),
+    )
+    allStatistics = []
+    for name, pruner in passes:
+        statistics = PassStatistics(name)
+        passStartTime = time.time()
+        pruner(scenario, verbosity, statistics=statistics, workers=workers)
+        statistics.time = time.time() - passStartTime
+        allStatistics.append(statistics)
+        if verbosity >= 1:
+            print(f"    {statistics}")
 
     if verbosity >= 1:
         totalTime = time.time() - startTime
         print(f"  Pruned scenario in {totalTime:.4g} seconds.")
 
+    return allStatistics
+
 
 ## Pruning based on containment
-def pruneContainment(scenario, verbosity):
+def pruneContainment(scenario, verbosity, statistics=None, workers=1):
     """Prune based on the requirement that individual Objects fit within their container.
 
     Specifically, if O is positioned uniformly (with a possible offset) in region B and
@@ -186,8 +413,12 @@ def pruneContainment(scenario, verbosity):
     If we can also lower bound the radius of O, then we can first erode C by that distance
     minus that maximum offset distance.
     """
+    # Extract the base region and container region of each object, while doing
+    # minor checks; the restricted base regions are then computed all at once.
+    candidates = []
+    jobs = []
+    keys = {}  # geometry keys of the regions seen so far, which may be costly
     for obj in scenario.objects:
-        # Extract the base region and container region, while doing minor checks.
         base, offset, _ = matchInRegion(obj.position)
 
         if base is None or needsSampling(base):
@@ -230,44 +461,45 @@ def pruneContainment(scenario, verbosity):
             # For most regions, use full object inradius.
             minRadius, _ = supportInterval(obj.inradius)
 
-        # Erode the container if possible and productive
-        if (
-            maxDistance is not None
-            and minRadius is not None
-            and (maxErosion := minRadius - maxDistance) > 0
-        ):
-            if hasattr(container, "buffer"):
-                # We can do an exact erosion
-                container = container.buffer(-maxErosion)
-            elif isinstance(container, MeshVolumeRegion):
-                current_pitch = PRUNING_PITCH
-                eroded_container = None
-
-                while eroded_container is None:
-                    # We can attempt to erode a voxel approximation of the MeshVolumeRegion.
-                    eroded_container = container._erodeOverapproximate(
-                        maxErosion, PRUNING_PITCH
-                    )
-
-                    if isinstance(eroded_container, VoxelRegion):
-                        eroded_container = eroded_container.mesh
-
-                    current_pitch = min(2 * current_pitch, 1)
-
-                # Now check if this erosion is valid and useful, i.e. do we have less volume
-                # to sample from. If so, replace the original container.
-                if (
-                    eroded_container is not None
-                    and eroded_container.size < container.size
-                ):
-                    container = eroded_container
-
-        # Restrict the base region to the possibly eroded container, unless
-        # they're the same in which case we're done
-        if base is container:
+        # Erode the container if possible and productive (see `restrictedBase`)
+        maxErosion = None
+        if maxDistance is not None and minRadius is not None:
+            if minRadius - maxDistance > 0:
+                maxErosion = minRadius - maxDistance
+
+        # If positions are sampled from the container itself (or from everywhere)
+        # without an offset, any position outside the container will be rejected
+        # anyway (see `restrictedBase`).
+        useVoxels = offset is None and (
+            base is container or isinstance(base, regions.AllRegion)
+        )
+
+        # Objects with the same requirements in the same workspace share results
+        for region in (base, container):
+            if id(region) not in keys:
+                keys[id(region)] = geometryKey(region)
+        baseKey, containerKey = keys[id(base)], keys[id(container)]
+        if baseKey is None or containerKey is None:
+            key = None
+        else:
+            key = (
+                "containment",
+                baseKey,
+                containerKey,
+                base is container,
+                maxErosion,
+                useVoxels,
+            )
+        candidates.append((obj, base, offset))
+        jobs.append((key, restrictedBase, (base, container, maxErosion, useVoxels)))
+
+    newBases = runCached(jobs, statistics=statistics, workers=workers)
+
+    for (obj, base, offset), newBase in zip(candidates, newBases):
+        # The base region was already within the container
+        if newBase is None:
             continue
 
-        newBase = base.intersect(container)
         newBase.orientation = base.orientation
 
         # Check if base was a volume and newBase is a surface,
@@ -296,6 +528,9 @@ def pruneContainment(scenario, verbosity):
                     f"    Region containment constraint pruned {percentage_pruned:.1f}% of space."
                 )
 
+        if statistics is not None:
+            statistics.percentages.append(percentage_pruned)
+
         # Condition object to pruned position
         newPos = regions.Region.uniformPointIn(newBase)
 
@@ -305,8 +540,63 @@ def pruneContainment(scenario, verbosity):
         obj.position.conditionTo(newPos)
 
 
+def restrictedBase(base, container, maxErosion, useVoxels):
+    """Restrict a base region to a container, first eroding the container if possible.
+
+    Args:
+        base (Region): The region in which positions are sampled.
+        container (Region): The container region.
+        maxErosion (float): Distance by which the container can be eroded, or `None`.
+        useVoxels (bool): Whether positions may be sampled from a voxel approximation
+            of the eroded container (only valid if positions outside the container are
+            rejected anyway).
+
+    Returns:
+        The restricted base region, or `None` if the base is the container itself.
+    """
+    if maxErosion is not None:
+        if hasattr(container, "buffer"):
+            # We can do an exact erosion
+            container = container.buffer(-maxErosion)
+        elif isinstance(container, MeshVolumeRegion):
+            # If allowed, we sample directly from the voxel approximation of the
+            # eroded container, avoiding converting it back into a mesh and
+            # intersecting it with the base.
+            if useVoxels:
+                current_pitch = voxelErosionPitch(container, maxErosion)
+            else:
+                current_pitch = PRUNING_PITCH
+            eroded_container = None
+
+            while eroded_container is None and current_pitch <= 1:
+                # We can attempt to erode a voxel approximation of the MeshVolumeRegion.
+                eroded_container = container._erodeOverapproximate(
+                    maxErosion, current_pitch
+                )
+
+                if isinstance(eroded_container, VoxelRegion) and not useVoxels:
+                    eroded_container = eroded_container.mesh
+
+                current_pitch *= 2
+
+            # Now check if this erosion is valid and useful, i.e. do we have less volume
+            # to sample from. If so, replace the original container.
+            if eroded_container is not None and eroded_container.size < container.size:
+                container = eroded_container
+
+    # Restrict the base region to the possibly eroded container, unless
+    # they're the same in which case we're done
+    if base is container:
+        return None
+
+    if isinstance(container, VoxelRegion):
+        # Only possible if sampling from the voxels directly is valid (see above)
+        return container
+    return base.intersect(container)
+
+
 ## Pruning based on orientation
-def pruneRelativeHeading(scenario, verbosity):
+def pruneRelativeHeading(scenario, verbosity, statistics=None, workers=1):
     """Prune based on requirements bounding the relative heading of an Object.
 
     Specifically, if an object O is:
@@ -327,12 +617,18 @@ def pruneRelativeHeading(scenario, verbosity):
     # TODO Add test for empty pruned polygon (Might cause crash?)
     # Check which objects are (approximately) aligned to polygonal vector fields
     fields = {}
+    fieldKeys = {}
     for obj in scenario.objects:
         field, offsetL, offsetR = matchPolygonalField(obj.heading, obj.position)
         if field is not None:
             fields[obj] = (field, offsetL, offsetR)
+            if id(field) not in fieldKeys:
+                fieldKeys[id(field)] = fieldKey(field)
 
-    # Check for relative heading relations among such objects
+    # Check for relative heading relations among such objects, collecting the
+    # feasible regions to compute
+    candidates = []
+    jobs = []
     for obj, (field, offsetL, offsetR) in fields.items():
         position = currentPropValue(obj, "position")
         base, offset, _ = matchInRegion(position)
@@ -348,7 +644,7 @@ def pruneRelativeHeading(scenario, verbosity):
         if basePoly is None:  # the Region must be polygonal
             continue
 
-        newBasePoly = basePoly
+        count = 0
         for rel in obj._relations:
             if isinstance(rel, RelativeHeadingRelation) and rel.target in fields:
                 tField, tOffsetL, tOffsetR = fields[rel.target]
@@ -356,7 +652,7 @@ def pruneRelativeHeading(scenario, verbosity):
                 if maxDist == float("inf"):
                     # the distance between the objects must be bounded
                     continue
-                feasible = feasibleRHPolygon(
+                args = (
                     field,
                     offsetL,
                     offsetR,
@@ -367,21 +663,34 @@ def pruneRelativeHeading(scenario, verbosity):
                     rel.upper,
                     maxDist,
                 )
-                if feasible is None:
-                    # the RH bounds may be too weak to restrict the space
-                    continue
-                try:
-                    pruned = newBasePoly & feasible
-                except shapely.geos.TopologicalError:  # TODO how can we prevent these??
-                    pruned = newBasePoly & feasible.buffer(0.1, cap_style=2)
-                if verbosity >= 1:
-                    percent = 100 * (1.0 - (pruned.area / newBasePoly.area))
-                    print(
-                        f"    Relative heading constraint pruned {percent:.1f}% of space."
-                    )
-                newBasePoly = pruned
+                key = ("relativeHeading", fieldKeys[id(field)], fieldKeys[id(tField)])
+                key += args[1:3] + args[4:]
+                jobs.append((key, feasibleRHPolygon, args))
+                count += 1
+        candidates.append((obj, base, basePoly, count))
+
+    allFeasible = iter(runCached(jobs, statistics=statistics, workers=workers))
+
+    for obj, base, basePoly, count in candidates:
+        newBasePoly = basePoly
+        for _ in range(count):
+            feasible = next(allFeasible)
+            if feasible is None:
+                # the RH bounds may be too weak to restrict the space
+                continue
+            try:
+                pruned = newBasePoly & feasible
+            except shapely.geos.TopologicalError:  # TODO how can we prevent these??
+                pruned = newBasePoly & feasible.buffer(0.1, cap_style=2)
+            if verbosity >= 1:
+                percent = 100 * (1.0 - (pruned.area / newBasePoly.area))
+                print(f"    Relative heading constraint pruned {percent:.1f}% of space.")
+            newBasePoly = pruned
 
         if newBasePoly is not basePoly:
+            if statistics is not None:
+                percent = 100 * (1.0 - (newBasePoly.area / basePoly.area))
+                statistics.percentages.append(percent)
             newBase = regions.PolygonalRegion(
                 polygon=newBasePoly, orientation=base.orientation
             )
@@ -390,7 +699,7 @@ def pruneRelativeHeading(scenario, verbosity):
 
 
 # Pruning based on visibility
-def pruneVisibility(scenario, verbosity):
+def pruneVisibility(scenario, verbosity, statistics=None, workers=1):
     ego = scenario.egoObject
 
     for obj in scenario.objects:
@@ -416,36 +725,35 @@ def pruneVisibility(scenario, verbosity):
         currDist = pir_dist
         currPos = position
 
-        # Define a helper function to attempt to buffer an observer's visibleRegion, resulting
-        # in a region that contains all points that could feasibly be the position
-        # of obj, if it is visible from the observer. If possible buffer exactly, otherwise
-        # try to buffer approximately, and if that is also not feasible just return the viewRegion.
-        def bufferHelper(viewRegion):
+        # Define a helper function to restrict the current base region to the buffer
+        # of an observer's visibleRegion, i.e. to the points that could feasibly be the
+        # position of obj if it is visible from the observer. Results for fixed regions
+        # are cached; since they may keep the preferred orientation of either region,
+        # the orientations are part of the keys.
+        def restrictToVisible(viewRegion):
             buffer_quantity = obj.radius + maxDistance
-            if hasattr(viewRegion, "buffer"):
-                return viewRegion.buffer(buffer_quantity)
-            elif hasattr(viewRegion, "_bufferOverapproximate"):
-                if needsSampling(viewRegion):
-                    return viewRegion._bufferOverapproximate(buffer_quantity, 1)
-                else:
-                    current_pitch = PRUNING_PITCH
-                    buffered_container = None
-
-                    while buffered_container is None:
-                        buffered_container = viewRegion._bufferOverapproximate(
-                            buffer_quantity, current_pitch
-                        )
-
-                        if isinstance(buffered_container, VoxelRegion):
-                            buffered_container = buffered_container.mesh
-
-                        current_pitch = min(2 * current_pitch, 1)
-
-                    assert buffered_container is not None
+            viewKey = geometryKey(viewRegion)
+            if viewKey is None:
+                key = None
+            else:
+                key = ("buffer", viewKey, viewRegion.orientation, buffer_quantity)
+            job = (key, bufferHelper, (viewRegion, buffer_quantity))
+            (buffered,) = runCached([job], statistics=statistics)
 
-                    return buffered_container
+            baseKey, bufferedKey = geometryKey(currBase), geometryKey(buffered)
+            if baseKey is None or bufferedKey is None:
+                key = None
             else:
-                assert False
+                key = (
+                    "intersection",
+                    baseKey,
+                    currBase.orientation,
+                    bufferedKey,
+                    buffered.orientation,
+                )
+            job = (key, currBase.intersect, (buffered,))
+            (intersection,) = runCached([job], statistics=statistics)
+            return intersection
 
         # Prune based off visibility/non-visibility requirements
         if obj.requireVisible and obj is not ego:
@@ -455,7 +763,7 @@ def pruneVisibility(scenario, verbosity):
                 print(
                     f"    Pruning restricted base region of {obj} to visible region of ego."
                 )
-            candidateBase = currBase.intersect(bufferHelper(ego.visibleRegion))
+            candidateBase = restrictToVisible(ego.visibleRegion)
             candidateDist = regions.Region.uniformPointIn(candidateBase)
 
             # Condition object to pruned position
@@ -479,9 +787,7 @@ def pruneVisibility(scenario, verbosity):
                 print(
                     f"    Pruning restricted base region of {obj} to visible region of {obj._observingEntity}."
                 )
-            candidateBase = currBase.intersect(
-                bufferHelper(obj._observingEntity.visibleRegion)
-            )
+            candidateBase = restrictToVisible(obj._observingEntity.visibleRegion)
             candidateDist = regions.Region.uniformPointIn(candidateBase)
 
             if not checkConditionedCycle(candidateDist, currDist):
@@ -513,10 +819,44 @@ def pruneVisibility(scenario, verbosity):
             if verbosity >= 1:
                 print(f"    Visibility pruning pruned {percentage_pruned:.1f}% of space.")
 
+        if statistics is not None:
+            statistics.percentages.append(percentage_pruned)
+
         # Condition position value to pruned position
         obj.position.conditionTo(currPos)
 
 
+def bufferHelper(viewRegion, buffer_quantity):
+    """Buffer an observer's visible region, for use in `pruneVisibility`.
+
+    If possible buffer exactly, otherwise try to buffer approximately.
+    """
+    if hasattr(viewRegion, "buffer"):
+        return viewRegion.buffer(buffer_quantity)
+    elif hasattr(viewRegion, "_bufferOverapproximate"):
+        if needsSampling(viewRegion):
+            return viewRegion._bufferOverapproximate(buffer_quantity, 1)
+        else:
+            current_pitch = PRUNING_PITCH
+            buffered_container = None
+
+            while buffered_container is None:
+                buffered_container = viewRegion._bufferOverapproximate(
+                    buffer_quantity, current_pitch
+                )
+
+                if isinstance(buffered_container, VoxelRegion):
+                    buffered_container = buffered_container.mesh
+
+                current_pitch = min(2 * current_pitch, 1)
+
+            assert buffered_container is not None
+
+            return buffered_container
+    else:
+        assert False
+
+
 def maxDistanceBetween(scenario, obj, target):
     """Upper bound the distance between the given Objects."""
     # visDist is initialized to infinity. Then we can use
@@ -8,9 +8,13 @@ Manipulations of meshes is done using the
 """
 
 from abc import ABC, abstractmethod
+import collections
+import hashlib
 import itertools
 import math
+import os
 import random
+import tempfile
 import warnings
 
 import numpy
@@ -184,6 +188,22 @@ class Region(Samplable, ABC):
     def sampleGiven(self, value):
         return self
 
+    def containsPoints(self, points):
+        """Check which of an array of points are contained in this `Region`.
+
+        By default this method calls `containsPoint` on each point, but can be
+        overwritten by subclasses able to answer many queries at once.
+
+        Args:
+            points: An array-like of shape (n, 3), or a sequence of vectors.
+
+        Returns:
+            A boolean NumPy array of shape (n,).
+        """
+        return numpy.array(
+            [self.containsPoint(toVector(point)) for point in points], dtype=bool
+        )
+
     def _trueContainsPoint(self, point) -> bool:
         """Whether or not this region could produce point when sampled.
 
@@ -745,6 +765,64 @@ class UndefinedSamplingException(Exception):
     pass
 
 
+def _uniformPointsInSimplices(simplices, cumulativeSizes, count=1):
+    """Sample points uniformly from a union of disjoint simplices.
+
+    Args:
+        simplices: A (m, k+1, d) array of the vertices of m k-simplices in d-dimensional
+          space (e.g. triangles or tetrahedra).
+        cumulativeSizes: The cumulative sizes (areas, volumes, etc.) of the simplices.
+        count: The number of points to sample.
+
+    Returns:
+        A (count, d) array of points.
+    """
+    # Choose simplices weighted by size
+    targets = numpy.random.random_sample(count) * cumulativeSizes[-1]
+    indices = numpy.searchsorted(cumulativeSizes, targets, side="right")
+    indices = numpy.minimum(indices, len(cumulativeSizes) - 1)
+
+    # Barycentric coordinates uniformly distributed over the simplex are given
+    # by normalized exponential random variables.
+    weights = numpy.random.exponential(size=(count, simplices.shape[1]))
+    weights /= numpy.sum(weights, axis=1, keepdims=True)
+    return numpy.einsum("ij,ijk->ik", weights, simplices[indices])
+
+
+def _barycentricTransforms(tetrahedra):
+    """Precompute data for `_countContainingTetrahedra` from an (m, 4, 3) array of tetrahedra.
+
+    The tetrahedra must not be degenerate.
+    """
+    apexes = tetrahedra[:, 0]
+    edges = numpy.transpose(tetrahedra[:, 1:] - apexes[:, None], (0, 2, 1))
+    lower, upper = numpy.min(tetrahedra, axis=1), numpy.max(tetrahedra, axis=1)
+    # Index the bounding boxes of the tetrahedra (projected to the XY plane)
+    tree = shapely.STRtree(
+        shapely.box(lower[:, 0], lower[:, 1], upper[:, 0], upper[:, 1])
+    )
+    return tree, (lower[:, 2], upper[:, 2]), apexes, numpy.linalg.inv(edges)
+
+
+def _countContainingTetrahedra(transforms, points):
+    """Count how many tetrahedra contain each of an (n, 3) array of points.
+
+    The tetrahedra are given by the output of `_barycentricTransforms`.
+    """
+    tree, (lower, upper), apexes, inverses = transforms
+    # Find all pairs of a point and a tetrahedron whose bounding box contains it, then
+    # compute the barycentric coordinates of the points for all pairs at once.
+    pointIndices, tetIndices = tree.query(shapely.points(points[:, :2]))
+    z = points[pointIndices, 2]
+    inBox = (lower[tetIndices] <= z) & (z <= upper[tetIndices])
+    pointIndices, tetIndices = pointIndices[inBox], tetIndices[inBox]
+    coords = numpy.einsum(
+        "kij,kj->ki", inverses[tetIndices], points[pointIndices] - apexes[tetIndices]
+    )
+    inside = numpy.all(coords >= 0, axis=1) & (numpy.sum(coords, axis=1) <= 1)
+    return numpy.bincount(pointIndices[inside], minlength=len(points))
+
+
 ###################################################################################################
 # 3D Regions
 ###################################################################################################
@@ -762,6 +840,66 @@ class SurfaceCollisionTrimesh(trimesh.Trimesh):
         return False
 
 
+class _MeshInstance:
+    """A mesh scaled to given dimensions, shared by all regions placing it in space.
+
+    Objects of the same shape and dimensions occupy congruent regions, differing only
+    by a rigid motion. `MeshVolumeRegion.fromInstance` represents such a region as a
+    placement of a shared instance, so that data which is invariant under rigid motions
+    (the scaled mesh, its volume and convex hull, and the proximity query structure
+    used for point containment and distances) is computed only once. The placed mesh
+    itself is only computed if needed.
+
+    Instances should be obtained with `forMesh`, which keeps the most recently used
+    instances in an LRU cache.
+    """
+
+    #: Maximum number of instances kept in the cache.
+    cacheSize = 256
+    _cache = collections.OrderedDict()
+
+    def __init__(self, mesh, dimensions, isConvex=None):
+        self.mesh = mesh.copy()
+        self.dimensions = tuple(dimensions)
+        scale = numpy.array(self.dimensions) / self.mesh.extents
+        self.mesh.apply_transform(compose_matrix(scale=scale))
+        self._isConvex = isConvex
+
+    @classmethod
+    def forMesh(cls, mesh, dimensions, isConvex=None):
+        """Get the instance of a mesh scaled to the given dimensions."""
+        key = (hash(mesh), len(mesh.vertices), len(mesh.faces), tuple(dimensions))
+        instance = cls._cache.get(key)
+        if instance is not None:
+            cls._cache.move_to_end(key)
+            return instance
+        instance = cls(mesh, dimensions, isConvex)
+        cls._cache[key] = instance
+        while len(cls._cache) > cls.cacheSize:
+            cls._cache.popitem(last=False)
+        return instance
+
+    @cached_property
+    def isConvex(self):
+        return self.mesh.is_convex if self._isConvex is None else self._isConvex
+
+    @cached_property
+    def volume(self):
+        return self.mesh.volume
+
+    @cached_property
+    def hullVertices(self):
+        """Vertices of the convex hull of the mesh."""
+        if self.isConvex:
+            return self.mesh.vertices
+        return self.mesh.convex_hull.vertices
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["mesh"] = self.mesh.copy()
+        return state
+
+
 class MeshRegion(Region):
     """Region given by a scaled, positioned, and rotated mesh.
 
@@ -790,6 +928,9 @@ class MeshRegion(Region):
         additionalDeps: Any additional sampling dependencies this region relies on.
     """
 
+    #: The shared `_MeshInstance` this region places, if any.
+    _instance = None
+
     def __init__(
         self,
         mesh,
@@ -802,6 +943,7 @@ class MeshRegion(Region):
         onDirection=None,
         name=None,
         additionalDeps=[],
+        _instance=None,
     ):
         # Copy parameters
         self._mesh = mesh
@@ -828,6 +970,13 @@ class MeshRegion(Region):
         if isLazy(self):
             return
 
+        # If placing a shared instance, only compute the transformed mesh when needed
+        if _instance is not None:
+            del self._mesh
+            self._instance = _instance
+            self.orientation = orientation
+            return
+
         # Convert extract mesh
         if isinstance(mesh, trimesh.primitives.Primitive):
             self._mesh = mesh.to_mesh()
@@ -936,6 +1085,19 @@ class MeshRegion(Region):
             name=self.name,
         )
 
+    def __getattr__(self, name):
+        # Compute the mesh of a region placing a shared instance on first use
+        if name == "_mesh" and self._instance is not None:
+            rotation, translation = self._placement
+            instanceMesh = self._instance.mesh
+            self._mesh = trimesh.Trimesh(
+                vertices=instanceMesh.vertices @ rotation.T + translation,
+                faces=instanceMesh.faces,
+                process=False,
+            )
+            return self._mesh
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
     ## API Methods ##
     @property
     @distributionFunction
@@ -986,8 +1148,9 @@ class MeshRegion(Region):
     @distributionFunction
     def circumcircle(self):
         """Compute an upper bound on the radius of the region"""
-        center_point = Vector(*self.mesh.bounding_box.center_mass)
-        half_extents = [val / 2 for val in self.mesh.extents]
+        bounds = self._bounds
+        center_point = Vector(*(bounds[0] + bounds[1]) / 2)
+        half_extents = [val / 2 for val in bounds[1] - bounds[0]]
         circumradius = hypot(*half_extents)
 
         return (center_point, circumradius)
@@ -999,14 +1162,60 @@ class MeshRegion(Region):
     @property
     def AABB(self):
         return (
-            tuple(self.mesh.bounds[0]),
-            tuple(self.mesh.bounds[1]),
+            tuple(self._bounds[0]),
+            tuple(self._bounds[1]),
         )
 
+    @cached_property
+    def _placement(self):
+        """The rotation matrix and translation placing the shared instance, if any."""
+        rotation = numpy.identity(3) if self.rotation is None else self.rotation._matrix
+        position = (0, 0, 0) if self.position is None else self.position.coordinates
+        return rotation, numpy.array(position, dtype=numpy.float64)
+
+    @cached_property
+    def _extremeVertices(self):
+        """Vertices of the mesh which include all vertices of its convex hull.
+
+        Bounds and maximum distances can be computed from these vertices alone; for a
+        region placing a shared instance, they avoid computing the whole mesh.
+        """
+        assert not isLazy(self)
+        if self._instance is None:
+            return self.mesh.vertices
+        rotation, translation = self._placement
+        return self._instance.hullVertices @ rotation.T + translation
+
+    @cached_property
+    def _bounds(self):
+        """The axis-aligned bounds of the mesh, as for ``self.mesh.bounds``."""
+        if self._instance is None:
+            return self.mesh.bounds
+        vertices = self._extremeVertices
+        return numpy.array((vertices.min(axis=0), vertices.max(axis=0)))
+
+    @property
+    def _volume(self):
+        return self.mesh.volume if self._instance is None else self._instance.volume
+
+    def _signedDistances(self, points):
+        """Signed distances from the mesh to an (n, 3) array of points.
+
+        Points inside the mesh have positive distance, following trimesh's convention.
+        """
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        if self._instance is not None:
+            # Distances are invariant under rigid motions, so we can query the shared
+            # instance with the points moved into its frame.
+            rotation, translation = self._placement
+            localPoints = (points - translation) @ rotation
+            return trimesh.proximity.signed_distance(self._instance.mesh, localPoints)
+        return trimesh.proximity.signed_distance(self.mesh, points)
+
     @cached_property
     def _boundingPolygonHull(self):
         assert not isLazy(self)
-        return shapely.multipoints(self.mesh.vertices).convex_hull
+        return shapely.multipoints(self._extremeVertices).convex_hull
 
     @cached_property
     def _boundingPolygon(self):
@@ -1042,7 +1251,10 @@ class MeshRegion(Region):
     def __getstate__(self):
         state = self.__dict__.copy()
         # Make copy of mesh to clear non-picklable cache
-        state["_mesh"] = self._mesh.copy()
+        if "_mesh" in state:
+            state["_mesh"] = self._mesh.copy()
+        # Drop acceleration structures; they will be rebuilt lazily if needed
+        state.pop("_cached__tetrahedralization", None)
         return state
 
 
@@ -1097,15 +1309,50 @@ class MeshVolumeRegion(MeshRegion):
 
         # Compute how many samples are necessary to achieve 99% probability
         # of success when rejection sampling volume.
-        p_volume = self._mesh.volume / self._mesh.bounding_box.volume
+        bounds = self._bounds
+        p_volume = self._volume / numpy.prod(bounds[1] - bounds[0])
+        self.num_samples = self._rejectionSampleCount(p_volume)
+
+        # If rejection sampling from the bounding box is likely to be inefficient,
+        # sample from a tetrahedralization of the mesh instead.
+        self._useTetrahedralSampling = p_volume < self._tetrahedralSamplingThreshold
+
+    @classmethod
+    def _instanced(cls, mesh, dimensions, position=None, rotation=None, isConvex=None):
+        """Create a region placing a mesh scaled to the given dimensions.
 
-        if p_volume > 0.99:
-            self.num_samples = 1
+        Equivalent to creating a region with ``centerMesh=False`` and the given
+        dimensions, position, and rotation, but the scaled mesh and the data derived
+        from it are shared with all other regions created by this method from the same
+        mesh and dimensions (see `_MeshInstance`). The mesh must already be centered.
+        """
+        instance = _MeshInstance.forMesh(mesh, dimensions, isConvex)
+        return cls(
+            mesh=instance.mesh,
+            dimensions=instance.dimensions,
+            position=position,
+            rotation=rotation,
+            centerMesh=False,
+            _internal=True,
+            _isConvex=instance.isConvex,
+            _instance=instance,
+        )
+
+    #: Fraction of the bounding box volume filled by the mesh below which
+    #: `uniformPointInner` samples from a tetrahedralization instead of
+    #: rejection sampling the bounding box.
+    _tetrahedralSamplingThreshold = 0.5
+
+    @staticmethod
+    def _rejectionSampleCount(p_accept):
+        """Number of samples needed to succeed with 99% probability when rejection sampling."""
+        if p_accept > 0.99:
+            num_samples = 1
         else:
-            self.num_samples = min(1e6, max(1, math.ceil(math.log(0.01, 1 - p_volume))))
+            num_samples = min(1e6, max(1, math.ceil(math.log(0.01, 1 - p_accept))))
 
         # Always try to take at least 8 samples to avoid surface point total rejections
-        self.num_samples = max(self.num_samples, 8)
+        return max(num_samples, 8)
 
     # Property testing methods #
     @distributionFunction
@@ -1122,8 +1369,8 @@ class MeshVolumeRegion(MeshRegion):
             # Check if bounding boxes intersect. If not, volumes cannot intersect.
             # For bounding boxes to intersect there must be overlap of the bounds
             # in all 3 dimensions.
-            bounds = self._mesh.bounds
-            obounds = other._mesh.bounds
+            bounds = self._bounds
+            obounds = other._bounds
             range_overlaps = (
                 (bounds[0, dim] <= obounds[1, dim])
                 and (obounds[0, dim] <= bounds[1, dim])
@@ -1143,8 +1390,9 @@ class MeshVolumeRegion(MeshRegion):
 
             # Get a candidate point from each mesh. If the center of the object is in the mesh use that.
             # Otherwise try to sample a point as a candidate, skipping this pass if the sample fails.
-            if self.containsPoint(Vector(*self.mesh.bounding_box.center_mass)):
-                s_candidate_point = Vector(*self.mesh.bounding_box.center_mass)
+            s_center = Vector(*numpy.mean(bounds, axis=0))
+            if self.containsPoint(s_center):
+                s_candidate_point = s_center
             elif (
                 len(samples := trimesh.sample.volume_mesh(self.mesh, self.num_samples))
                 > 0
@@ -1153,8 +1401,9 @@ class MeshVolumeRegion(MeshRegion):
             else:
                 s_candidate_point = None
 
-            if other.containsPoint(Vector(*other.mesh.bounding_box.center_mass)):
-                o_candidate_point = Vector(*other.mesh.bounding_box.center_mass)
+            o_center = Vector(*numpy.mean(obounds, axis=0))
+            if other.containsPoint(o_center):
+                o_candidate_point = o_center
             elif (
                 len(samples := trimesh.sample.volume_mesh(other.mesh, other.num_samples))
                 > 0
@@ -1165,23 +1414,15 @@ class MeshVolumeRegion(MeshRegion):
 
             if s_candidate_point is not None and o_candidate_point is not None:
                 # Compute the inradius of each object from its candidate point.
-                s_inradius = abs(
-                    trimesh.proximity.ProximityQuery(self.mesh).signed_distance(
-                        [s_candidate_point]
-                    )[0]
-                )
-                o_inradius = abs(
-                    trimesh.proximity.ProximityQuery(other.mesh).signed_distance(
-                        [o_candidate_point]
-                    )[0]
-                )
+                s_inradius = abs(self._signedDistances(s_candidate_point)[0])
+                o_inradius = abs(other._signedDistances(o_candidate_point)[0])
 
                 # Compute the circumradius of each object from its candidate point.
                 s_circumradius = numpy.max(
-                    numpy.linalg.norm(self.mesh.vertices - s_candidate_point, axis=1)
+                    numpy.linalg.norm(self._extremeVertices - s_candidate_point, axis=1)
                 )
                 o_circumradius = numpy.max(
-                    numpy.linalg.norm(other.mesh.vertices - o_candidate_point, axis=1)
+                    numpy.linalg.norm(other._extremeVertices - o_candidate_point, axis=1)
                 )
 
                 # Get the distance between the two points and check for mandatory or impossible collision.
@@ -1237,8 +1478,8 @@ class MeshVolumeRegion(MeshRegion):
             # For bounding boxes to intersect there must be overlap of the bounds
             # in all 3 dimensions.
             range_overlaps = [
-                (self.mesh.bounds[0, dim] <= other.mesh.bounds[1, dim])
-                and (other.mesh.bounds[0, dim] <= self.mesh.bounds[1, dim])
+                (self._bounds[0, dim] <= other._bounds[1, dim])
+                and (other._bounds[0, dim] <= self._bounds[1, dim])
                 for dim in range(3)
             ]
             bb_overlap = all(range_overlaps)
@@ -1275,7 +1516,7 @@ class MeshVolumeRegion(MeshRegion):
         if isinstance(other, PolygonalFootprintRegion):
             # Determine the mesh's vertical bounds (adding a little extra to avoid mesh errors) and
             # the mesh's vertical center.
-            vertical_bounds = (self.mesh.bounds[0][2], self.mesh.bounds[1][2])
+            vertical_bounds = (self._bounds[0][2], self._bounds[1][2])
             mesh_height = vertical_bounds[1] - vertical_bounds[0] + 1
             centerZ = (vertical_bounds[1] + vertical_bounds[0]) / 2
 
@@ -1289,7 +1530,37 @@ class MeshVolumeRegion(MeshRegion):
     @distributionFunction
     def containsPoint(self, point):
         """Check if this region's volume contains a point."""
-        return self.distanceTo(point) <= self.tolerance
+        point = toVector(point, f"Could not convert {point} to vector.")
+        return bool(self.containsPoints([point.coordinates])[0])
+
+    def containsPoints(self, points):
+        """Check which of an array of points are contained in this region's volume.
+
+        Equivalent to calling `containsPoint` on each point, but all points are
+        answered by a single vectorized query.
+
+        Args:
+            points: An array-like of shape (n, 3), or a sequence of vectors.
+
+        Returns:
+            A boolean NumPy array of shape (n,).
+        """
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        result = numpy.zeros(len(points), dtype=bool)
+
+        # Points farther than the tolerance outside the bounding box can't be
+        # contained, so only query the proximity structure for the remainder.
+        bounds = self._bounds
+        candidates = numpy.all(
+            (points >= bounds[0] - self.tolerance)
+            & (points <= bounds[1] + self.tolerance),
+            axis=1,
+        )
+        if numpy.any(candidates):
+            distances = self._signedDistances(points[candidates])
+            result[candidates] = distances >= -self.tolerance
+
+        return result
 
     @distributionFunction
     def containsObject(self, obj):
@@ -1297,9 +1568,10 @@ class MeshVolumeRegion(MeshRegion):
         # PASS 1
         # Check if bounding boxes intersect. If not, volumes cannot intersect and so
         # the object cannot be contained in this region.
+        objBounds = obj.occupiedSpace._bounds
         range_overlaps = [
-            (self.mesh.bounds[0, dim] <= obj.occupiedSpace.mesh.bounds[1, dim])
-            and (obj.occupiedSpace.mesh.bounds[0, dim] <= self.mesh.bounds[1, dim])
+            (self._bounds[0, dim] <= objBounds[1, dim])
+            and (objBounds[0, dim] <= self._bounds[1, dim])
             for dim in range(3)
         ]
         bb_overlap = all(range_overlaps)
@@ -1311,13 +1583,13 @@ class MeshVolumeRegion(MeshRegion):
         # If this region is convex, first check if we contain all corners of the object's bounding box.
         # If so, return True. Otherwise, check if all points are contained and return that value.
         if self.isConvex:
-            pq = trimesh.proximity.ProximityQuery(self.mesh)
-            bb_distances = pq.signed_distance(obj.boundingBox.mesh.vertices)
+            bb_distances = self._signedDistances(obj.boundingBox.mesh.vertices)
 
             if numpy.all(bb_distances > 0):
                 return True
 
-            vertex_distances = pq.signed_distance(obj.occupiedSpace.mesh.vertices)
+            # Since this region is convex, it suffices to check the object's hull
+            vertex_distances = self._signedDistances(obj.occupiedSpace._extremeVertices)
 
             return numpy.all(vertex_distances > 0)
 
@@ -1346,19 +1618,20 @@ class MeshVolumeRegion(MeshRegion):
 
         if obj_candidate_point is not None:
             # If this region doesn't contain the candidate point, it can't contain the object.
-            if not self.containsPoint(obj_candidate_point):
+            # The signed distance answers this and gives the distance to the mesh below.
+            candidate_distance = self._signedDistances(obj_candidate_point)[0]
+            if candidate_distance < -self.tolerance:
                 return False
 
             # Compute the circumradius of the object from the candidate point.
             obj_circumradius = numpy.max(
                 numpy.linalg.norm(
-                    obj.occupiedSpace.mesh.vertices - obj_candidate_point, axis=1
+                    obj.occupiedSpace._extremeVertices - obj_candidate_point, axis=1
                 )
             )
 
             # Compute the minimum distance from the region to this point.
-            pq = trimesh.proximity.ProximityQuery(self.mesh)
-            region_distance = abs(pq.signed_distance([obj_candidate_point])[0])
+            region_distance = abs(candidate_distance)
 
             if region_distance > obj_circumradius:
                 return True
@@ -1371,8 +1644,9 @@ class MeshVolumeRegion(MeshRegion):
 
         # Get a candidate point from the rgion mesh. If the center of mass of the region is in the mesh use that.
         # Otherwise try to sample a point as a candidate, skipping this pass if the sample fails.
-        if self.containsPoint(Vector(*self.mesh.bounding_box.center_mass)):
-            reg_candidate_point = Vector(*self.mesh.bounding_box.center_mass)
+        reg_center = Vector(*numpy.mean(self._bounds, axis=0))
+        if self.containsPoint(reg_center):
+            reg_candidate_point = reg_center
         elif len(samples := trimesh.sample.volume_mesh(self.mesh, self.num_samples)) > 0:
             reg_candidate_point = Vector(*samples[0])
         else:
@@ -1381,13 +1655,13 @@ class MeshVolumeRegion(MeshRegion):
         if reg_candidate_point is not None:
             # Calculate circumradius of the region from the candidate_point
             reg_circumradius = numpy.max(
-                numpy.linalg.norm(self.mesh.vertices - reg_candidate_point, axis=1)
+                numpy.linalg.norm(self._extremeVertices - reg_candidate_point, axis=1)
             )
 
             # Calculate maximum distance to the object.
             obj_max_distance = numpy.max(
                 numpy.linalg.norm(
-                    obj.occupiedSpace.mesh.vertices - reg_candidate_point, axis=1
+                    obj.occupiedSpace._extremeVertices - reg_candidate_point, axis=1
                 )
             )
 
@@ -1456,7 +1730,7 @@ class MeshVolumeRegion(MeshRegion):
 
             # Determine the mesh's vertical bounds (adding a little extra to avoid mesh errors) and
             # the mesh's vertical center.
-            vertical_bounds = (self.mesh.bounds[0][2], self.mesh.bounds[1][2])
+            vertical_bounds = (self._bounds[0][2], self._bounds[1][2])
             mesh_height = vertical_bounds[1] - vertical_bounds[0] + 1
             centerZ = (vertical_bounds[1] + vertical_bounds[0]) / 2
 
@@ -1520,19 +1794,17 @@ class MeshVolumeRegion(MeshRegion):
                 refined_polylines.append(refined_points)
 
             # Keep only lines and vertices for line segments in the mesh.
-            internal_lines = []
-
-            for polyline in refined_polylines:
-                source = polyline[0]
-
-                for pt_iter in range(1, len(polyline)):
-                    dest = polyline[pt_iter]
-
-                    midpoint = (source + dest) / 2
-                    if self.containsPoint(midpoint):
-                        internal_lines.append((source, dest))
-
-                    source = dest
+            pieces = [
+                (source, dest)
+                for polyline in refined_polylines
+                for source, dest in zip(polyline, polyline[1:])
+            ]
+            midpoints = [(source + dest) / 2 for source, dest in pieces]
+            internal_lines = [
+                piece
+                for piece, inside in zip(pieces, self.containsPoints(midpoints))
+                if inside
+            ]
 
             # Check if merged lines is empty. If so, return the EmptyRegion. Otherwise,
             # transform merged lines back into a path region.
@@ -1601,17 +1873,17 @@ class MeshVolumeRegion(MeshRegion):
 
             # Keep only lines and vertices for line segments in the mesh. Also converts them
             # to shapely's point format.
-            internal_lines = []
-
-            for vertices, segments in refined_lines:
-                for segment in segments:
-                    source = vertices[segment[0]]
-                    dest = vertices[segment[1]]
-
-                    midpoint = (source + dest) / 2
-
-                    if self.containsPoint(midpoint):
-                        internal_lines.append((source, dest))
+            pieces = [
+                (vertices[segment[0]], vertices[segment[1]])
+                for vertices, segments in refined_lines
+                for segment in segments
+            ]
+            midpoints = [(source + dest) / 2 for source, dest in pieces]
+            internal_lines = [
+                piece
+                for piece, inside in zip(pieces, self.containsPoints(midpoints))
+                if inside
+            ]
 
             merged_lines = shapely.ops.linemerge(internal_lines)
 
@@ -1695,7 +1967,7 @@ class MeshVolumeRegion(MeshRegion):
 
             # Determine the mesh's vertical bounds (adding a little extra to avoid mesh errors) and
             # the mesh's vertical center.
-            vertical_bounds = (self.mesh.bounds[0][2], self.mesh.bounds[1][2])
+            vertical_bounds = (self._bounds[0][2], self._bounds[1][2])
             mesh_height = vertical_bounds[1] - vertical_bounds[0] + 1
             centerZ = (vertical_bounds[1] + vertical_bounds[0]) / 2
 
@@ -1708,23 +1980,88 @@ class MeshVolumeRegion(MeshRegion):
         return super().difference(other)
 
     def uniformPointInner(self):
-        # TODO: Look into tetrahedralization, perhaps to be turned on when a heuristic
-        # is met. Currently using Trimesh's rejection sampling.
-        sample = trimesh.sample.volume_mesh(self.mesh, self.num_samples)
+        if self._useTetrahedralSampling:
+            tetrahedra, cumulativeVolumes, positive, negative = self._tetrahedralization
+            if negative is None:
+                # The tetrahedra exactly partition the volume, so no rejection is needed.
+                return Vector(
+                    *_uniformPointsInSimplices(tetrahedra, cumulativeVolumes)[0]
+                )
+
+            # Some tetrahedra overlap: a point covered by n positive tetrahedra is
+            # proposed n times as often as it should be, and lies in the mesh iff it
+            # is covered by m = n-1 negative tetrahedra (otherwise m = n). Accepting
+            # with probability (n - m) / n therefore yields uniform samples.
+            count = self._rejectionSampleCount(self.mesh.volume / cumulativeVolumes[-1])
+            sample = _uniformPointsInSimplices(tetrahedra, cumulativeVolumes, count)
+            n = _countContainingTetrahedra(positive, sample)
+            m = _countContainingTetrahedra(negative, sample)
+            accept = numpy.random.random_sample(count) * n < n - m
+            sample = sample[accept]
+        else:
+            sample = trimesh.sample.volume_mesh(self.mesh, self.num_samples)
 
         if len(sample) == 0:
             raise RejectionException("Rejection sampling MeshVolumeRegion failed.")
         else:
             return Vector(*sample[0])
 
+    @cached_property
+    def _tetrahedralization(self):
+        """Signed tetrahedra used for sampling this region.
+
+        Each face of the mesh is joined to a common apex, giving tetrahedra whose signed
+        volumes sum to the volume of the mesh. The apex is chosen among a few candidates
+        to minimize the total volume of the positive tetrahedra.
+
+        Returns:
+            A tuple ``(tetrahedra, cumVolumes, positive, negative)``, where ``tetrahedra``
+            is an (n, 4, 3) array of the tetrahedra with positive volume, ``cumVolumes``
+            their cumulative volumes, and ``positive`` and ``negative`` are the output of
+            `_barycentricTransforms` for the tetrahedra with positive and negative volume
+            respectively. If the mesh is star-shaped with respect to the apex, there are
+            no negative tetrahedra and ``negative`` is None: then the positive tetrahedra
+            exactly partition the region.
+        """
+        assert not isLazy(self)
+        mesh = self.mesh
+        triangles = mesh.triangles
+        vertices = mesh.vertices
+        stride = max(1, len(vertices) // 32)
+        candidates = numpy.concatenate(
+            (
+                [mesh.center_mass, mesh.bounding_box.center_mass],
+                vertices[::stride],
+            )
+        )
+
+        def signedVolumes(apex):
+            return numpy.linalg.det(triangles - apex) / 6
+
+        apex = min(
+            candidates, key=lambda apex: numpy.sum(numpy.maximum(signedVolumes(apex), 0))
+        )
+        volumes = signedVolumes(apex)
+        tetrahedra = numpy.concatenate(
+            (numpy.broadcast_to(apex, (len(triangles), 1, 3)), triangles), axis=1
+        )
+        # Skip (nearly) degenerate tetrahedra, e.g. from faces containing the apex,
+        # which have negligible volume and no barycentric transform.
+        epsilon = 1e-12 * numpy.max(numpy.abs(volumes))
+        positive, negative = volumes > epsilon, volumes < -epsilon
+        return (
+            tetrahedra[positive],
+            numpy.cumsum(volumes[positive]),
+            _barycentricTransforms(tetrahedra[positive]),
+            _barycentricTransforms(tetrahedra[negative]) if numpy.any(negative) else None,
+        )
+
     @distributionFunction
     def distanceTo(self, point):
         """Get the minimum distance from this region to the specified point."""
         point = toVector(point, f"Could not convert {point} to vector.")
 
-        pq = trimesh.proximity.ProximityQuery(self.mesh)
-
-        dist = pq.signed_distance([point.coordinates])[0]
+        dist = self._signedDistances(point.coordinates)[0]
 
         # Positive distance indicates being contained in the mesh.
         if dist > 0:
@@ -1735,10 +2072,9 @@ class MeshVolumeRegion(MeshRegion):
     @cached_property
     @distributionFunction
     def inradius(self):
-        center_point = self.mesh.bounding_box.center_mass
+        center_point = numpy.mean(self._bounds, axis=0)
 
-        pq = trimesh.proximity.ProximityQuery(self.mesh)
-        region_distance = pq.signed_distance([center_point])[0]
+        region_distance = self._signedDistances(center_point)[0]
 
         if region_distance < 0:
             return 0
@@ -1755,7 +2091,7 @@ class MeshVolumeRegion(MeshRegion):
 
     @cached_property
     def size(self):
-        return self.mesh.mass / self.mesh.density
+        return self._volume
 
     ## Utility Methods ##
     def voxelized(self, pitch, lazy=False):
@@ -1815,7 +2151,7 @@ class MeshVolumeRegion(MeshRegion):
             # connectivity 3 (a 3x3x3 cube of voxels). Each dilation pass must dilate by at
             # least pitch. Therefore we must make at least ceil(minBuffer/pitch) passes to
             # guarantee dilating at least minBuffer. We also add 1 iteration for the reasons above.
-            iterations = math.ceil(minBuffer / pitch) + 1
+            iterations = math.ceil(minBuffer / target_pitch) + 1
 
             dilated_mesh = voxelized_mesh.dilation(iterations=iterations)
 
@@ -1917,7 +2253,7 @@ class MeshSurfaceRegion(MeshRegion):
         if isinstance(other, PolygonalFootprintRegion):
             # Determine the mesh's vertical bounds (adding a little extra to avoid mesh errors) and
             # the mesh's vertical center.
-            vertical_bounds = (self.mesh.bounds[0][2], self.mesh.bounds[1][2])
+            vertical_bounds = (self._bounds[0][2], self._bounds[1][2])
             mesh_height = vertical_bounds[1] - vertical_bounds[0] + 1
             centerZ = (vertical_bounds[1] + vertical_bounds[0]) / 2
 
@@ -1962,9 +2298,7 @@ class MeshSurfaceRegion(MeshRegion):
         """Get the minimum distance from this object to the specified point."""
         point = toVector(point, f"Could not convert {point} to vector.")
 
-        pq = trimesh.proximity.ProximityQuery(self.mesh)
-
-        dist = abs(pq.signed_distance([point.coordinates])[0])
+        dist = abs(self._signedDistances(point.coordinates)[0])
 
         return dist
 
@@ -1988,8 +2322,9 @@ class MeshSurfaceRegion(MeshRegion):
         If ``pos`` is not within ``self.tolerance`` of the surface of the mesh, a
         ``RejectionException`` is raised.
         """
-        prox_query = trimesh.proximity.ProximityQuery(self.mesh)
-        _, distance, triangle_id = prox_query.on_surface([pos.coordinates])
+        _, distance, triangle_id = trimesh.proximity.closest_point(
+            self.mesh, [pos.coordinates]
+        )
         if distance > self.tolerance:
             raise RejectionException(
                 "Attempted to get flat orientation of a mesh away from a surface."
@@ -2116,9 +2451,16 @@ class SpheroidRegion(MeshVolumeRegion):
 
 
 class VoxelRegion(Region):
-    """(WIP) Region represented by a voxel grid in 3D space.
+    """Region represented by a voxel grid in 3D space.
 
-    NOTE: This region is a work in progress and is currently only recommended for internal use.
+    The region is the union of the (closed) occupied voxels of the grid. Containment
+    of points is checked by indexing into a dense occupancy array, so takes constant
+    time per point, and sampling picks an occupied voxel uniformly at random, so
+    never needs rejection.
+
+    Containment of objects and regions is checked conservatively using their
+    bounding boxes: the answer is `True` only if every voxel overlapping the bounding
+    box is occupied.
 
     Args:
         voxelGrid: The Trimesh voxelGrid to be used.
@@ -2129,6 +2471,10 @@ class VoxelRegion(Region):
           VoxelRegion is unlikely to be used outside of an intermediate step in compiling/pruning.
     """
 
+    #: Tolerance (as a fraction of the voxel size) used when testing whether a point
+    #: lies on the boundary of a voxel.
+    _indexTolerance = 1e-9
+
     def __init__(self, voxelGrid, orientation=None, name=None, lazy=False):
         # Initialize superclass
         super().__init__(name, orientation=orientation)
@@ -2137,51 +2483,197 @@ class VoxelRegion(Region):
         if voxelGrid.encoding.is_empty:
             raise ValueError("Tried to create an empty VoxelRegion.")
 
-        # Store voxel grid and extract points and scale
+        # Store voxel grid and extract scale
         self.voxelGrid = voxelGrid
-        self.voxel_points = self.voxelGrid.points
         self.scale = self.voxelGrid.scale
 
+        if not lazy:
+            self._occupancy
+            self._occupiedIndices
+
+    @cached_property
+    def voxel_points(self):
+        """The centers of the occupied voxels."""
+        return self.voxelGrid.points
+
     @cached_property
     def kdTree(self):
         return scipy.spatial.KDTree(self.voxel_points)
 
+    @cached_property
+    def _occupancy(self):
+        """Dense boolean array indicating which voxels are occupied."""
+        return numpy.asarray(self.voxelGrid.encoding.dense, dtype=bool)
+
+    @cached_property
+    def _paddedOccupancy(self):
+        # Padded with a layer of empty voxels, so that indices just outside the grid
+        # can be looked up without special cases.
+        return numpy.pad(self._occupancy, 1)
+
+    @cached_property
+    def _occupiedIndices(self):
+        return numpy.argwhere(self._occupancy)
+
+    @cached_property
+    def _transform(self):
+        return numpy.array(self.voxelGrid.transform)
+
+    @cached_property
+    def _inverseTransform(self):
+        return numpy.linalg.inv(self._transform)
+
+    @cached_property
+    def _pitches(self):
+        """The sizes of the voxels along each axis, if the grid is axis-aligned."""
+        matrix = self._transform[:3, :3]
+        if numpy.count_nonzero(matrix - numpy.diag(numpy.diagonal(matrix))):
+            return None
+        return numpy.abs(numpy.diagonal(matrix))
+
+    @cached_property
+    def _distanceField(self):
+        """Distance from the center of each voxel to the nearest occupied voxel center."""
+        return scipy.ndimage.distance_transform_edt(
+            ~self._occupancy, sampling=self._pitches
+        )
+
+    def _indexCoordinates(self, points):
+        """Convert points to (fractional) voxel indices.
+
+        The voxel with index ``i`` covers the index coordinates ``[i-0.5, i+0.5]``.
+        """
+        inverse = self._inverseTransform
+        return points @ inverse[:3, :3].T + inverse[:3, 3]
+
+    def _pointsFromIndexCoordinates(self, coords):
+        transform = self._transform
+        return coords @ transform[:3, :3].T + transform[:3, 3]
+
+    def _coversBox(self, bounds):
+        """Whether every voxel overlapping the given axis-aligned box is occupied."""
+        corners = numpy.array(list(itertools.product(*numpy.transpose(bounds))))
+        coords = self._indexCoordinates(corners)
+        eps = self._indexTolerance
+        low = numpy.floor(numpy.min(coords, axis=0) + 0.5 + eps).astype(int)
+        high = numpy.ceil(numpy.max(coords, axis=0) - 0.5 - eps).astype(int)
+        high = numpy.maximum(high, low)
+        shape = numpy.array(self._occupancy.shape)
+        if numpy.any(low < 0) or numpy.any(high >= shape):
+            return False
+        block = self._occupancy[tuple(slice(l, h + 1) for l, h in zip(low, high))]
+        return bool(numpy.all(block))
+
     def containsPoint(self, point):
         point = toVector(point)
+        shape = self._occupancy.shape
+        index = []
+        for row, size in zip(self._inverseTransform[:3].tolist(), shape):
+            coord = row[0] * point.x + row[1] * point.y + row[2] * point.z + row[3]
+            i = math.floor(coord + 0.5)
+            if abs(abs(coord - i) - 0.5) <= self._indexTolerance:
+                # On the boundary between voxels; check both of them
+                return bool(self.containsPoints([point.coordinates])[0])
+            if not 0 <= i < size:
+                return False
+            index.append(i)
+        return bool(self._occupancy[tuple(index)])
+
+    def containsPoints(self, points):
+        """Check which of an array of points are contained in this region.
 
-        # Find closest voxel point
-        _, index = self.kdTree.query(point)
-        closest_point = self.voxel_points[index]
+        Equivalent to calling `containsPoint` on each point, but all points are
+        answered by vectorized lookups in the occupancy grid.
 
-        # Check voxel containment
-        voxel_low = closest_point - self.scale / 2
-        voxel_high = closest_point + self.scale / 2
+        Args:
+            points: An array-like of shape (n, 3), or a sequence of vectors.
 
-        return numpy.all(voxel_low <= point) & numpy.all(point <= voxel_high)
+        Returns:
+            A boolean NumPy array of shape (n,).
+        """
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        coords = self._indexCoordinates(points)
+
+        # A point on the boundary between voxels is in all of them, so look up the
+        # voxels on both sides along each axis (usually these are the same voxel).
+        # Indices are shifted by one to account for the padding.
+        eps = self._indexTolerance
+        limit = numpy.array(self._occupancy.shape) + 1
+        low = numpy.clip(numpy.ceil(coords - 0.5 - eps) + 1, 0, limit).astype(int)
+        high = numpy.clip(numpy.floor(coords + 0.5 + eps) + 1, 0, limit).astype(int)
+        occupancy = self._paddedOccupancy
+        result = numpy.zeros(len(points), dtype=bool)
+        for corner in itertools.product((False, True), repeat=3):
+            indices = numpy.where(corner, high, low)
+            result |= occupancy[indices[:, 0], indices[:, 1], indices[:, 2]]
+        return result
 
     def containsObject(self, obj):
-        raise NotImplementedError
+        """Check conservatively whether this region contains an object.
 
-    def containsRegionInner(self, reg):
-        raise NotImplementedError
+        Returns `True` only if all voxels overlapping the object's bounding box are
+        occupied.
+        """
+        return self._coversBox(obj.occupiedSpace._bounds)
+
+    def containsRegionInner(self, reg, tolerance):
+        try:
+            bounds = numpy.array(reg.AABB, dtype=float)
+        except (TypeError, NotImplementedError):
+            raise NotImplementedError(
+                f"VoxelRegion cannot check containment of {type(reg).__name__}"
+            )
+        if bounds.shape != (2, 3):
+            raise NotImplementedError(
+                f"VoxelRegion cannot check containment of {type(reg).__name__}"
+            )
+        # Shrink the box by the tolerance (without inverting it)
+        center = numpy.mean(bounds, axis=0)
+        bounds[0] = numpy.minimum(bounds[0] + tolerance, center)
+        bounds[1] = numpy.maximum(bounds[1] - tolerance, center)
+        return self._coversBox(bounds)
 
     def distanceTo(self, point):
-        raise NotImplementedError
+        pitches = self._pitches
+        if pitches is None:
+            raise NotImplementedError(
+                "distanceTo is only supported for axis-aligned voxel grids"
+            )
+        point = numpy.array(toVector(point).coordinates)
+        if self.containsPoints(point[numpy.newaxis])[0]:
+            return 0
+
+        # The distance transform gives the distance from the center of the voxel
+        # nearest the point to the nearest occupied voxel center, which bounds the
+        # distance from the point to the region.
+        shape = numpy.array(self._occupancy.shape)
+        coords = self._indexCoordinates(point[numpy.newaxis])[0]
+        nearest = numpy.clip(numpy.rint(coords), 0, shape - 1).astype(int)
+        nearestCenter = self._pointsFromIndexCoordinates(nearest)
+        bound = self._distanceField[tuple(nearest)] + numpy.linalg.norm(
+            point - nearestCenter
+        )
+
+        # Only voxels within the bound (plus half a voxel) along each axis can be
+        # closer, so compute exact distances to the occupied voxels among those.
+        reach = bound / pitches + 0.5
+        low = numpy.clip(numpy.floor(coords - reach), 0, shape - 1).astype(int)
+        high = numpy.clip(numpy.ceil(coords + reach), 0, shape - 1).astype(int)
+        block = self._occupancy[tuple(slice(l, h + 1) for l, h in zip(low, high))]
+        centers = self._pointsFromIndexCoordinates(numpy.argwhere(block) + low)
+        gaps = numpy.maximum(numpy.abs(centers - point) - pitches / 2, 0)
+        return float(numpy.min(numpy.linalg.norm(gaps, axis=1)))
 
     def projectVector(self, point, onDirection):
         raise NotImplementedError
 
     def uniformPointInner(self):
-        # First generate a point uniformly in a box with dimensions
-        # equal to scale, centered at the origin.
-        base_pt = numpy.random.random_sample(3) - 0.5
-        scaled_pt = base_pt * self.scale
-
-        # Pick a random voxel point and add it to base_pt.
-        voxel_base = self.voxel_points[random.randrange(len(self.voxel_points))]
-        offset_pt = voxel_base + scaled_pt
-
-        return Vector(*offset_pt)
+        # Pick an occupied voxel uniformly at random (they all have the same volume),
+        # then a point uniformly within it.
+        indices = self._occupiedIndices
+        voxel = indices[random.randrange(len(indices))]
+        coords = voxel + numpy.random.random_sample(3) - 0.5
+        return self.orient(Vector(*self._pointsFromIndexCoordinates(coords)))
 
     def dilation(self, iterations, structure=None):
         """Returns a dilated/eroded version of this VoxelRegion.
@@ -2207,10 +2699,18 @@ class VoxelRegion(Region):
         if structure == None:
             structure = scipy.ndimage.generate_binary_structure(3, 3)
 
+        # When dilating, pad the grid so that the result isn't clipped at its edges
+        occupancy = self._occupancy
+        transform = self.voxelGrid.transform
+        if morphology_func is scipy.ndimage.binary_dilation:
+            padding = [iterations * (size // 2) for size in structure.shape]
+            occupancy = numpy.pad(occupancy, [(pad, pad) for pad in padding])
+            transform = transform @ translation_matrix([-pad for pad in padding])
+
         # Compute a dilated/eroded encoding
         new_encoding = trimesh.voxel.encoding.DenseEncoding(
             morphology_func(
-                trimesh.voxel.morphology._dense(self.voxelGrid.encoding, rank=3),
+                occupancy,
                 structure=structure,
                 iterations=iterations,
             )
@@ -2221,9 +2721,7 @@ class VoxelRegion(Region):
             return nowhere
 
         # Otherwise, return a VoxelRegion representing the eroded region.
-        new_voxel_grid = trimesh.voxel.VoxelGrid(
-            new_encoding, transform=self.voxelGrid.transform
-        )
+        new_voxel_grid = trimesh.voxel.VoxelGrid(new_encoding, transform=transform)
         return VoxelRegion(voxelGrid=new_voxel_grid)
 
     @cached_property
@@ -2728,6 +3226,123 @@ class PathRegion(Region):
 ###################################################################################################
 
 
+class PolygonCache:
+    """Cache of the triangulations of polygons used to sample from `PolygonalRegion`.
+
+    Entries are keyed by a hash of the WKB representation of the polygons, so regions
+    with identical geometry (e.g. the same lane in different compilations of a
+    scenario, or a region rebuilt by an intersection) share a single triangulation and
+    table of cumulative triangle areas. The least-recently-used entries are evicted
+    once there are more than **maxSize** of them.
+
+    If **directory** is given, entries are also saved there (one ``.npz`` file per
+    entry, whose name includes `formatVersion`) and loaded from there when missing
+    from memory, so that they can be shared between processes and between runs. If an
+    entry cannot be saved, a warning is issued and it is only kept in memory. The cache
+    used by all regions is `polygonCache`; persistence can be enabled by setting its
+    `directory` attribute.
+
+    Args:
+        maxSize (int): Maximum number of entries to keep in memory.
+        directory (str; optional): Directory in which to persist entries.
+    """
+
+    #: Version of the format of saved entries, to be incremented whenever it (or the
+    #: triangulation algorithm) changes so that stale entries are ignored.
+    formatVersion = 1
+
+    def __init__(self, maxSize=4096, directory=None):
+        self.maxSize = maxSize
+        self.directory = directory
+        self._entries = collections.OrderedDict()
+
+    @staticmethod
+    def keyFor(polygons):
+        """Key identifying a ``shapely`` geometry, computed from its WKB representation."""
+        wkb = shapely.to_wkb(polygons)
+        return hashlib.blake2b(wkb, digest_size=16).hexdigest()
+
+    def samplingData(self, polygons):
+        """Get the triangles and cumulative triangle areas of a (multi)polygon.
+
+        Returns:
+            A pair consisting of an (m, 3, 2) array of triangles and an array of their
+            cumulative areas. The arrays are shared and must not be modified.
+        """
+        key = self.keyFor(polygons)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        entry = self._load(key)
+        if entry is None:
+            entry = self._computeSamplingData(polygons)
+            self._save(key, entry)
+        for array in entry:
+            array.flags.writeable = False
+        self._entries[key] = entry
+        while len(self._entries) > self.maxSize:
+            self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _computeSamplingData(polygons):
+        triangles = []
+        for polygon in polygons.geoms:
+            triangles.extend(triangulatePolygon(polygon))
+        assert len(triangles) > 0, polygons
+        # Extract the vertices of each triangle (dropping the repeated closing vertex)
+        triangles = shapely.get_coordinates(triangles).reshape(-1, 4, 2)[:, :3]
+        edges = triangles[:, 1:] - triangles[:, :1]
+        areas = numpy.abs(numpy.cross(edges[:, 0], edges[:, 1])) / 2
+        return triangles, numpy.cumsum(areas)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.v{self.formatVersion}.npz")
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with numpy.load(self._path(key)) as data:
+                return data["triangles"], data["cumulativeAreas"]
+        except (OSError, KeyError, ValueError):
+            # Missing or corrupted entry
+            return None
+
+    def _save(self, key, entry):
+        if self.directory is None:
+            return
+        triangles, cumulativeAreas = entry
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary file first so other processes never see partial entries
+            fd, tmpPath = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as stream:
+                    numpy.savez(
+                        stream, triangles=triangles, cumulativeAreas=cumulativeAreas
+                    )
+                os.replace(tmpPath, self._path(key))
+            except BaseException:
+                os.unlink(tmpPath)
+                raise
+        except OSError as e:
+            warnings.warn(f"unable to save entry to polygon cache {self.directory}: {e}")
+
+    def clear(self):
+        """Forget all entries kept in memory (entries saved to disk are kept)."""
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+#: The `PolygonCache` used by `PolygonalRegion`.
+polygonCache = PolygonCache()
+
+
 class PolygonalRegion(Region):
     """Region given by one or more polygons (possibly with holes) at a fixed z coordinate.
 
@@ -2836,25 +3451,36 @@ class PolygonalRegion(Region):
 
     @cached_property
     def _samplingData(self):
-        triangles = []
-        for polygon in self.polygons.geoms:
-            triangles.extend(triangulatePolygon(polygon))
-        assert len(triangles) > 0, self.polygons
-        shapely.prepare(triangles)
-        trianglesAndBounds = tuple((tri, tri.bounds) for tri in triangles)
-        areas = (triangle.area for triangle in triangles)
-        cumulativeTriangleAreas = tuple(itertools.accumulate(areas))
-        return trianglesAndBounds, cumulativeTriangleAreas
+        return polygonCache.samplingData(self.polygons)
 
     def uniformPointInner(self):
-        trisAndBounds, cumulativeAreas = self._samplingData
-        triangle, bounds = random.choices(trisAndBounds, cum_weights=cumulativeAreas)[0]
-        minx, miny, maxx, maxy = bounds
-        # TODO improve?
-        while True:
-            x, y = random.uniform(minx, maxx), random.uniform(miny, maxy)
-            if shapely.intersects_xy(triangle, x, y):
-                return self.orient(Vector(x, y, self.z))
+        triangles, cumulativeAreas = self._samplingData
+        index = numpy.searchsorted(
+            cumulativeAreas, random.random() * cumulativeAreas[-1], side="right"
+        )
+        a, b, c = triangles[min(index, len(triangles) - 1)]
+        # Sample uniformly from the parallelogram spanned by the triangle, reflecting
+        # points in the other half back into the triangle.
+        u, v = random.random(), random.random()
+        if u + v > 1:
+            u, v = 1 - u, 1 - v
+        x, y = (a + u * (b - a) + v * (c - a)).tolist()
+        return self.orient(Vector(x, y, self.z))
+
+    def uniformPoints(self, n):
+        """Sample many points uniformly from this region at once.
+
+        Unlike `uniformPointInner`, no :term:`preferred orientation` is applied.
+
+        Args:
+            n (int): The number of points to sample.
+
+        Returns:
+            An (n, 3) NumPy array of points.
+        """
+        triangles, cumulativeAreas = self._samplingData
+        points = _uniformPointsInSimplices(triangles, cumulativeAreas, n)
+        return numpy.column_stack((points, numpy.full(n, self.z, dtype=float)))
 
     @distributionFunction
     def intersects(self, other, triedReversed=False):
@@ -3741,7 +4367,7 @@ class PointSetRegion(Region):
         return self.orient(Vector(*self.points[i]))
 
     def intersects(self, other, triedReversed=False):
-        return any(other.containsPoint(pt) for pt in self.points)
+        return bool(numpy.any(other.containsPoints(self.points)))
 
     def intersect(self, other, triedReversed=False):
         # Try other way first before falling back to IntersectionRegion with sampler.
@@ -3751,14 +4377,11 @@ class PointSetRegion(Region):
         def sampler(intRegion):
             o = intRegion.regions[1]
             center, radius = o.circumcircle
-            possibles = (
-                Vector(*self.kdTree.data[i])
-                for i in self.kdTree.query_ball_point(center, radius)
-            )
-            intersection = [p for p in possibles if o.containsPoint(p)]
+            possibles = self.kdTree.data[self.kdTree.query_ball_point(center, radius)]
+            intersection = possibles[o.containsPoints(possibles)]
             if len(intersection) == 0:
                 raise RejectionException(f"empty intersection of Regions {self} and {o}")
-            return self.orient(random.choice(intersection))
+            return self.orient(Vector(*random.choice(intersection)))
 
         orientation = orientationFor(self, other, triedReversed)
         return IntersectionRegion(self, other, sampler=sampler, orientation=orientation)
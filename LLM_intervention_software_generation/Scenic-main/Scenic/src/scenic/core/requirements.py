@@ -13,6 +13,7 @@ from scenic.core.distributions import Samplable, needsSampling, toDistribution
 from scenic.core.errors import InvalidScenarioError
 from scenic.core.lazy_eval import needsLazyEvaluation
 from scenic.core.propositions import Atomic, PropositionNode
+from scenic.core.visibility import VisibilityEngine
 import scenic.syntax.relations as relations
 
 
@@ -389,10 +390,16 @@ class VisibilityRequirement(SamplingRequirement):
         )
 
     def falsifiedByInner(self, sample):
+        from scenic.core.object_types import Object
+
         source = sample[self.source]
         target = sample[self.target]
         potential_occluders = tuple(sample[obj] for obj in self.potential_occluders)
         occluders = tuple(obj for obj in potential_occluders if obj.occluding)
+        # Build one engine covering every object in the scene, so that all the
+        # visibility requirements on this sample share a single acceleration structure
+        endpoints = tuple(obj for obj in (source, target) if isinstance(obj, Object))
+        VisibilityEngine.forObjects(endpoints + occluders)
         return not source.canSee(target, occludingObjects=occluders)
 
     @property
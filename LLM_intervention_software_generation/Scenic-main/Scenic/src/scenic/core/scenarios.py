@@ -37,7 +37,7 @@ from scenic.core.requirements import (
     VisibilityRequirement,
 )
 from scenic.core.sample_checking import BasicChecker, WeightedAcceptanceChecker
-from scenic.core.serialization import Serializer, dumpAsScenicCode
+from scenic.core.serialization import Serializer, SharedScene, dumpAsScenicCode
 from scenic.core.vectors import Vector
 
 # Global params
@@ -698,6 +698,36 @@ class Scenario(_ScenarioPickleMixin):
         ser = Serializer(data, allowPickle=allowPickle)
         return ser.readScene(self, verify=verify)
 
+    def sceneToSharedMemory(self, scene, allowPickle=False):
+        """Encode a `Scene` sampled from this scenario into shared memory.
+
+        This is an alternative to pickling a scene for sending it to another process,
+        which avoids copying large values like object meshes: the scene is encoded as
+        by `sceneToBytes` into a shared-memory segment, and the returned `SharedScene`
+        handle, which pickles to a few bytes, may be sent to any process which has
+        compiled the same scenario. That process can then decode the scene using
+        `sceneFromSharedMemory`. The caller must release the segment by calling
+        `SharedScene.unlink` once the scene has been decoded.
+
+        Raises:
+            SerializationError: as for `sceneToBytes`.
+        """
+        return SharedScene.create(self.sceneToBytes(scene, allowPickle=allowPickle))
+
+    def sceneFromSharedMemory(self, handle, verify=True, allowPickle=False):
+        """Decode a `Scene` encoded with `sceneToSharedMemory`.
+
+        Args:
+            handle (SharedScene): Handle returned by `sceneToSharedMemory` (possibly in
+                another process).
+            verify (bool): As in `sceneFromBytes`.
+            allowPickle (bool): As in `sceneFromBytes`.
+
+        Raises:
+            SerializationError: if the scene could not be properly decoded.
+        """
+        return self.sceneFromBytes(handle.read(), verify=verify, allowPickle=allowPickle)
+
     def simulationToBytes(self, simulation, allowPickle=False):
         """Encode a `Simulation` sampled from this scenario to a `bytes` object.
 
@@ -2,14 +2,19 @@
 
 The functions in this module usually do not need to be used directly.
 For high-level serialization APIs, see `Scenario.sceneToBytes`,
-`Scenario.simulationToBytes`, and `Scene.dumpAsScenicCode`.
+`Scenario.simulationToBytes`, `Scenario.sceneToSharedMemory`, and
+`Scene.dumpAsScenicCode`.
 """
 
 import io
 import math
+import os
 import pickle
 import struct
+import sys
+import threading
 import types
+import zlib
 
 from scenic.core.distributions import Samplable, needsSampling
 from scenic.core.utils import DefaultIdentityDict
@@ -108,10 +113,13 @@ class Serializer:
 
     def __init__(self, data=b"", allowPickle=False, detectEnd=False):
         self.allowPickle = allowPickle
-        self.stream = data if isinstance(data, io.BufferedIOBase) else io.BytesIO(data)
-        if detectEnd:
+        self.stream = data if isinstance(data, io.IOBase) else io.BytesIO(data)
+        if detectEnd and not hasattr(self.stream, "peek"):
             self.stream = io.BufferedReader(self.stream)
         self.seenObjs = set()
+        #: Quantum for `writeDynamicValue`, or `None` to write values exactly.
+        self.quantum = None
+        self._previousValues = {}
 
     def getBytes(self):
         return self.stream.getvalue()
@@ -132,10 +140,10 @@ class Serializer:
     def replayFormatVersion(cls):
         """Current version of the `Simulation` replay serialization format.
 
-        Must be incremented if the `writeReplayHeader` or `writeValue` methods
-        change, or if a new codec is added.
+        Must be incremented if the `writeReplayHeader`, `writeValue`, or
+        `writeDynamicValue` methods change, or if a new codec is added.
         """
-        return 2
+        return 4
 
     def writeScene(self, scenario, scene):
         """Serialize a `Scene`."""
@@ -214,6 +222,64 @@ class Serializer:
         flags = struct.unpack("<I", flagsField)[0]
         return flags
 
+    def writeDynamicValue(self, key, value, ty):
+        """Serialize the value of a dynamic property in a replay.
+
+        If `quantum` is set, scalars and vectors are rounded to multiples of it and
+        encoded as (usually small) integer differences from the previous value with
+        the same **key**, so that properties which change slowly or not at all take
+        about 1 byte per coordinate. Values with infinite or NaN coordinates, which
+        cannot be quantized, are encoded exactly after an escape code, and the next
+        value with the same key is then encoded as if it were the first. Otherwise this
+        is the same as `writeValue`.
+        """
+        length = _quantizedLength(ty) if self.quantum else 0
+        if not length:
+            self.writeValue(value, ty)
+            return
+        coordinates = value.coordinates if length == 3 else (value,)
+        if not all(math.isfinite(x) for x in coordinates):
+            writeInt(_nonFiniteEscape, self.stream)
+            self.writeValue(value, ty)
+            self._previousValues.pop(key, None)
+            return
+        quantized = tuple(round(x / self.quantum) for x in coordinates)
+        previous = self._previousValues.get(key, (0,) * length)
+        for new, old in zip(quantized, previous):
+            writeZigZag(new - old, self.stream)
+        self._previousValues[key] = quantized
+
+    def readDynamicValue(self, key, ty):
+        length = _quantizedLength(ty) if self.quantum else 0
+        if not length:
+            return self.readValue(ty)
+        first = readInt(self.stream)
+        if first == _nonFiniteEscape:
+            self._previousValues.pop(key, None)
+            return self.readValue(ty)
+        previous = self._previousValues.get(key, (0,) * length)
+        differences = (_fromZigZag(first),) + tuple(
+            readZigZag(self.stream) for _ in previous[1:]
+        )
+        quantized = tuple(old + diff for old, diff in zip(previous, differences))
+        self._previousValues[key] = quantized
+        values = [x * self.quantum for x in quantized]
+        return values[0] if length == 1 else ty(*values)
+
+    def beginState(self):
+        """Mark the start of the dynamic property values of the current time step."""
+        beginState = getattr(self.stream, "beginState", None)
+        if beginState:
+            beginState()
+
+    def endStep(self):
+        """Mark the end of the data for the current time step of a replay."""
+        endStep = getattr(self.stream, "endStep", None)
+        if endStep and endStep():
+            # The next time step starts a new chunk, which does not depend on earlier
+            # chunks (so that it can be read independently).
+            self._previousValues.clear()
+
     @classmethod
     def addCodec(cls, ty, encoder, decoder):
         """Register encoder and decoder functions for the given type.
@@ -266,6 +332,19 @@ class Serializer:
         raise SerializationError(f"{ty.__name__} type does not implement serialization")
 
 
+_quantizedLengths = {}
+
+
+def _quantizedLength(ty):
+    """Number of coordinates of a type supporting quantized encoding, or 0 if none."""
+    length = _quantizedLengths.get(ty)
+    if length is None:
+        from scenic.core.vectors import Vector
+
+        length = _quantizedLengths[ty] = 1 if ty is float else 3 if ty is Vector else 0
+    return length
+
+
 # Encoder/decoder functions for various types
 
 
@@ -329,6 +408,24 @@ def readInt(stream):
 Serializer.addCodec(int, writeInt, readInt)
 
 
+def writeZigZag(value, stream):
+    """Write a signed integer, using 1 byte for values from -126 to 126."""
+    writeInt(2 * value if value >= 0 else -2 * value - 1, stream)
+
+
+def readZigZag(stream):
+    return _fromZigZag(readInt(stream))
+
+
+def _fromZigZag(value):
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+# Code written by `Serializer.writeDynamicValue` in place of the first quantized
+# coordinate of a value which cannot be quantized (`writeZigZag` never writes it).
+_nonFiniteEscape = -1
+
+
 def writeBool(value, stream):
     writeInt(value, stream)
 
@@ -364,3 +461,416 @@ def readStr(stream):
 
 
 Serializer.addCodec(str, writeStr, readStr)
+
+
+## Replay files
+
+#: Default number of time steps in each chunk of a replay file.
+REPLAY_CHUNK_STEPS = 64
+
+_replayFileMagic = b"SCNR"
+_replayIndexMagic = b"SCNX"
+_replayFileVersion = 1
+_chunkHeader = struct.Struct("<IIIB")  # payload size, first step, step count, zlib?
+_indexEntry = struct.Struct("<QII")  # offset, first step, step count
+_indexTrailer = struct.Struct("<QI4s")  # index offset, chunk count, magic
+
+
+class ReplayFileWriter(io.RawIOBase):
+    """Stream writing a `Simulation` replay to a file as the simulation runs.
+
+    Pass an instance (or a path, from which one will be created) as the **replayFile**
+    argument of `Simulator.simulate`. The replay data is divided into chunks of
+    **stepsPerChunk** time steps, each optionally compressed with `zlib` and written
+    to the file as soon as it is complete. When the writer is closed (which the
+    simulation does when it finishes), an index of the chunks is appended so that a
+    `ReplayFileReader` can quickly seek to any time step. If the simulation is
+    rejected, the data written so far is discarded (see `discard`), so that when
+    `Simulator.simulate` makes several attempts the file holds the replay of the
+    accepted simulation.
+
+    Within each chunk, the data for each time step is split into the values sampled
+    by the scenario and the values of the dynamic properties of the objects (if
+    divergence checking is enabled), so that the latter can be read without replaying
+    the simulation: see `ReplayFileReader.readState`.
+
+    Args:
+        file: A path or a :term:`binary file` opened for writing.
+        stepsPerChunk (int): Number of time steps in each chunk.
+        compressionLevel (int): Level of `zlib` compression to use, from 0 (no
+            compression) to 9.
+    """
+
+    def __init__(self, file, stepsPerChunk=REPLAY_CHUNK_STEPS, compressionLevel=6):
+        super().__init__()
+        if isinstance(file, (str, os.PathLike)):
+            self._file = open(file, "wb")
+            self._ownsFile = True
+        else:
+            self._file = file
+            self._ownsFile = False
+        self.stepsPerChunk = stepsPerChunk
+        self.compressionLevel = compressionLevel
+        self._start = self._file.tell() if self._file.seekable() else None
+        self._file.write(_replayFileMagic + struct.pack("<H", _replayFileVersion))
+        self._offset = 6
+        self._samples = bytearray()
+        self._state = None
+        self._steps = []
+        self._firstStep = 0
+        self._index = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        buffer = self._samples if self._state is None else self._state
+        buffer.extend(data)
+        return len(data)
+
+    def beginState(self):
+        self._state = bytearray()
+
+    def endStep(self):
+        """End the current time step, returning whether it ended a chunk."""
+        self._steps.append((bytes(self._samples), bytes(self._state or b"")))
+        self._samples.clear()
+        self._state = None
+        if len(self._steps) >= self.stepsPerChunk:
+            self._writeChunk()
+            return True
+        return False
+
+    def discard(self):
+        """Discard all replay data written so far, e.g. because of a rejection.
+
+        Chunks already written to the file are removed, which requires the file to be
+        seekable.
+        """
+        if self._index:
+            if self._start is None:
+                raise SerializationError(
+                    "cannot discard replay data already written to a non-seekable file"
+                )
+            self._file.seek(self._start)
+            self._file.truncate()
+            self._file.write(_replayFileMagic + struct.pack("<H", _replayFileVersion))
+        self._offset = 6
+        self._samples.clear()
+        self._state = None
+        self._steps.clear()
+        self._firstStep = 0
+        self._index.clear()
+
+    def _writeChunk(self):
+        payload = io.BytesIO()
+        for samples, state in self._steps:
+            writeInt(len(samples), payload)
+            writeInt(len(state), payload)
+        for samples, state in self._steps:
+            payload.write(samples)
+            payload.write(state)
+        payload = payload.getvalue()
+        compressed = self.compressionLevel > 0
+        if compressed:
+            payload = zlib.compress(payload, self.compressionLevel)
+        count = len(self._steps)
+        header = _chunkHeader.pack(len(payload), self._firstStep, count, compressed)
+        self._file.write(header)
+        self._file.write(payload)
+        self._index.append((self._offset, self._firstStep, count))
+        self._offset += len(header) + len(payload)
+        self._firstStep += count
+        self._steps.clear()
+
+    def close(self):
+        if self.closed:
+            return
+        if self._samples or self._state is not None:
+            self.endStep()
+        if self._steps:
+            self._writeChunk()
+        for entry in self._index:
+            self._file.write(_indexEntry.pack(*entry))
+        trailer = _indexTrailer.pack(self._offset, len(self._index), _replayIndexMagic)
+        self._file.write(trailer)
+        if self._ownsFile:
+            self._file.close()
+        else:
+            self._file.flush()
+        super().close()
+
+
+class ReplayFileReader(io.RawIOBase):
+    """Stream reading a replay written by `ReplayFileWriter`.
+
+    Pass an instance as the **replay** argument of `Simulator.simulate` to replay the
+    simulation. The reader can also be used to inspect the saved dynamic properties of
+    the objects at any time step using `readState`; this only requires decoding the
+    chunk containing that time step.
+
+    Args:
+        file: A path or a :term:`binary file` opened for reading, which must be
+            seekable.
+    """
+
+    def __init__(self, file):
+        super().__init__()
+        if isinstance(file, (str, os.PathLike)):
+            self._file = open(file, "rb")
+            self._ownsFile = True
+        else:
+            self._file = file
+            self._ownsFile = False
+        header = self._file.read(6)
+        if len(header) != 6 or header[:4] != _replayFileMagic:
+            raise SerializationError("not a Scenic replay file")
+        if struct.unpack("<H", header[4:])[0] != _replayFileVersion:
+            raise SerializationError(
+                "cannot read replay file from a different Scenic version"
+            )
+        self._file.seek(-_indexTrailer.size, io.SEEK_END)
+        trailer = self._file.read(_indexTrailer.size)
+        indexOffset, chunkCount, magic = _indexTrailer.unpack(trailer)
+        if magic != _replayIndexMagic:
+            raise SerializationError("replay file is truncated")
+        self._file.seek(indexOffset)
+        self._index = [
+            _indexEntry.unpack(self._file.read(_indexEntry.size))
+            for _ in range(chunkCount)
+        ]
+        self._chunkStarts = frozenset(first for _, first, _ in self._index)
+        self._stepsEnded = 0
+        self._loadedChunk = None
+        self._parts = []
+        self._part = 0
+        self._position = 0
+        if self._index:
+            self._loadChunk(0)
+
+    @property
+    def steps(self):
+        """The number of time steps saved in the replay."""
+        if not self._index:
+            return 0
+        _, first, count = self._index[-1]
+        return first + count
+
+    def _chunkFor(self, step):
+        for number, (_, first, count) in enumerate(self._index):
+            if first <= step < first + count:
+                return number
+        raise IndexError(f"replay has no time step {step}")
+
+    def _loadChunk(self, number):
+        if self._loadedChunk == number:
+            self._part = 0
+            self._position = 0
+            return
+        offset, first, count = self._index[number]
+        self._file.seek(offset)
+        size, _, _, compressed = _chunkHeader.unpack(self._file.read(_chunkHeader.size))
+        payload = self._file.read(size)
+        if compressed:
+            payload = zlib.decompress(payload)
+        stream = io.BytesIO(payload)
+        sizes = [(readInt(stream), readInt(stream)) for _ in range(count)]
+        data = memoryview(payload)
+        start = stream.tell()
+        self._parts = []
+        for sampleSize, stateSize in sizes:
+            self._parts.append(data[start : start + sampleSize])
+            start += sampleSize
+            self._parts.append(data[start : start + stateSize])
+            start += stateSize
+        self._loadedChunk = number
+        self._part = 0
+        self._position = 0
+
+    def _available(self):
+        """Move to the next nonempty part of the replay, returning the data left in it."""
+        while True:
+            part = self._parts[self._part] if self._part < len(self._parts) else b""
+            if self._position < len(part):
+                return part[self._position :]
+            if self._part + 1 < len(self._parts):
+                self._part += 1
+            elif self._loadedChunk is not None and self._loadedChunk + 1 < len(
+                self._index
+            ):
+                self._loadChunk(self._loadedChunk + 1)
+            else:
+                return b""
+            self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        available = self._available()
+        size = min(len(buffer), len(available))
+        buffer[:size] = available[:size]
+        self._position += size
+        return size
+
+    def peek(self, size=1):
+        return bytes(self._available()[: max(size, 1)])
+
+    def endStep(self):
+        self._stepsEnded += 1
+        return self._stepsEnded in self._chunkStarts
+
+    def seekStep(self, step):
+        """Move to the start of the data for the given time step."""
+        number = self._chunkFor(step)
+        self._loadChunk(number)
+        self._part = 2 * (step - self._index[number][1])
+        self._stepsEnded = step
+
+    def readState(self, step, objects):
+        """Read the values of the dynamic properties of objects at a given time step.
+
+        Requires that the simulation was run with divergence checking enabled (see the
+        **enableDivergenceCheck** option of `Simulator.simulate`).
+
+        Args:
+            step (int): The time step.
+            objects: The objects in the simulation at that time step (e.g.
+                ``simulation.objects``), in the same order as in the simulation.
+
+        Returns:
+            A list giving for each object existing at the time step a `dict` mapping the
+            names of its dynamic properties to their values.
+        """
+        from scenic.core.simulators import Simulation
+
+        position = (self._loadedChunk, self._part, self._position)
+        number = self._chunkFor(step)
+        self._loadChunk(0)
+        header = Serializer(self._parts[0])
+        quantum = Simulation._readReplayHeader(header)[1]
+        self._loadChunk(number)
+        first = self._index[number][1]
+        reader = Serializer(b"")
+        reader.quantum = quantum
+        # Delta-encoded values depend on those of earlier time steps in the same chunk
+        start = first if quantum is not None else step
+        for current in range(start, step + 1):
+            reader.stream = io.BytesIO(self._parts[2 * (current - first) + 1])
+            if reader.stream.getbuffer().nbytes == 0:
+                raise SerializationError(
+                    f"replay has no divergence-checking data for time step {current}"
+                )
+            count = readInt(reader.stream)
+            state = []
+            for i, obj in enumerate(objects[:count]):
+                values = {}
+                for prop, ty in obj._simulatorProvidedProperties.items():
+                    values[prop] = reader.readDynamicValue((i, prop), ty)
+                state.append(values)
+
+        # Restore the original position in the stream
+        chunk, self._part, self._position = position
+        if chunk is not None:
+            self._loadChunk(chunk)
+            _, self._part, self._position = position
+        return state
+
+    def close(self):
+        if not self.closed and self._ownsFile:
+            self._file.close()
+        super().close()
+
+
+## Shared-memory scene handoff
+
+
+class SharedScene:
+    """Handle to a `Scene` encoded in a shared-memory segment.
+
+    Created by `Scenario.sceneToSharedMemory`. The handle pickles to just the name and
+    size of the segment, so sending it to another process (e.g. through a
+    `multiprocessing` queue) is cheap no matter how large the scene's objects are.
+    The receiving process decodes the scene with `Scenario.sceneFromSharedMemory`,
+    using its own copy of the compiled scenario.
+
+    The process which created the handle owns the segment, and must release it with
+    `unlink` once all receivers have decoded the scene (or use the handle as a context
+    manager).
+    """
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self._segment = None
+
+    @classmethod
+    def create(cls, data):
+        """Copy the given encoded scene into a new shared-memory segment."""
+        from multiprocessing import shared_memory
+
+        segment = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        segment.buf[: len(data)] = data
+        handle = cls(segment.name, len(data))
+        handle._segment = segment
+        return handle
+
+    def read(self):
+        """Return the encoded scene as a `bytes` object."""
+        if self._segment is not None:
+            return bytes(self._segment.buf[: self.size])
+        segment = _attachSharedMemory(self.name)
+        try:
+            return bytes(segment.buf[: self.size])
+        finally:
+            segment.close()
+
+    def unlink(self):
+        """Release the shared-memory segment (only in the process which created it)."""
+        if self._segment is None:
+            raise RuntimeError("only the creator of a SharedScene can unlink it")
+        self._segment.close()
+        self._segment.unlink()
+        self._segment = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        if self._segment is not None:
+            self.unlink()
+
+    def __getstate__(self):
+        return {"name": self.name, "size": self.size, "_segment": None}
+
+    def __repr__(self):
+        return f"SharedScene({self.name!r}, {self.size})"
+
+
+def _attachSharedMemory(name):
+    from multiprocessing import resource_tracker, shared_memory
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    # Older versions of Python register the segment with the resource tracker (on POSIX
+    # systems), which would destroy it when this process exits even though another
+    # process owns it. Unregistering it afterwards is not an option, since processes
+    # started by multiprocessing share the tracker of their parent, which keeps only
+    # one registration per name: that would remove the creator's own registration. So
+    # skip registering this segment (but no others) while attaching to it.
+    with _attachLock:
+        register = resource_tracker.register
+
+        def registerOthers(resourceName, resourceType):
+            if resourceType != "shared_memory" or resourceName.lstrip("/") != name:
+                register(resourceName, resourceType)
+
+        resource_tracker.register = registerOthers
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+_attachLock = threading.Lock()
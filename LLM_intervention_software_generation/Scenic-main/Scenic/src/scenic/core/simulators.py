@@ -30,7 +30,8 @@ from scenic.core.object_types import (
     setDynamicProxyFor,
 )
 from scenic.core.requirements import RequirementType
-from scenic.core.serialization import Serializer
+from scenic.core.serialization import ReplayFileWriter, Serializer
+from scenic.core.trajectories import TrajectoryStore
 from scenic.core.vectors import Vector
 
 
@@ -88,6 +89,9 @@ class Simulator(abc.ABC):
         divergenceTolerance=0,
         continueAfterDivergence=False,
         allowPickle=False,
+        columnarTrajectory=False,
+        replayFile=None,
+        replayQuantum=None,
     ):
         """Run a simulation for a given scene.
 
@@ -108,7 +112,8 @@ class Simulator(abc.ABC):
             raiseGuardViolations (bool): Whether violations of preconditions/invariants
                 of scenarios/behaviors should cause this method to raise an exception,
                 instead of only rejecting the simulation (the default behavior).
-            replay (bytes): If not `None`, must be replay data output by `Simulation.getReplay`:
+            replay (bytes): If not `None`, must be replay data output by `Simulation.getReplay`
+                (or a `ReplayFileReader` for a replay saved using **replayFile**):
                 we will then replay the saved simulation rather than randomly generating
                 one as usual. If **maxSteps** is larger than that of the original
                 simulation, then once the replay is exhausted the simulation will continue
@@ -133,6 +138,21 @@ class Simulator(abc.ABC):
             allowPickle (bool): Whether to use `pickle` to (de)serialize custom object
                 types. See `sceneFromBytes` for a discussion of when this may be needed
                 (rarely) and its security implications.
+            columnarTrajectory (bool): Whether to save the trajectory and numeric
+                records of the simulation in NumPy arrays using a `TrajectoryStore`,
+                instead of as lists of Python objects. This saves memory in
+                long simulations; see :mod:`scenic.core.trajectories` for details.
+                The trajectory then always consists of the positions of the objects,
+                regardless of `Simulation.currentState`.
+            replayFile: If not `None`, a path or `ReplayFileWriter` to which the replay
+                data is streamed in chunks while the simulation runs, instead of being
+                kept in memory for `Simulation.getReplay`. See `ReplayFileWriter`.
+                The data of rejected simulations is discarded, so the file ends up
+                holding the replay of the accepted simulation (if any).
+            replayQuantum (float): If not `None`, the dynamic properties saved for
+                divergence checking are rounded to multiples of this amount and
+                delta-encoded, making them much more compact. Replays then only detect
+                divergences larger than this amount (plus **divergenceTolerance**).
 
         Returns:
             A `Simulation` object representing the completed simulation, or `None` if no
@@ -169,6 +189,12 @@ class Simulator(abc.ABC):
         if verbosity is None:
             verbosity = errors.verbosityLevel
 
+        # All attempts share one replay file, from which the data of rejected
+        # simulations is discarded.
+        if enableReplay and replayFile is not None:
+            if not isinstance(replayFile, ReplayFileWriter):
+                replayFile = ReplayFileWriter(replayFile)
+
         # Repeatedly run simulations until we find one satisfying the requirements
         iterations = 0
         simulation = None
@@ -187,7 +213,12 @@ class Simulator(abc.ABC):
                 divergenceTolerance=divergenceTolerance,
                 continueAfterDivergence=continueAfterDivergence,
                 allowPickle=allowPickle,
+                columnarTrajectory=columnarTrajectory,
+                replayFile=replayFile,
+                replayQuantum=replayQuantum,
             )
+        if not simulation and enableReplay and replayFile is not None:
+            replayFile.close()
         return simulation
 
     def replay(self, scene, replay, **kwargs):
@@ -306,6 +337,12 @@ class Simulation(abc.ABC):
         RejectSimulationException: if a requirement is violated.
     """
 
+    #: Number of initial time steps during which to check the types of the property
+    #: values provided by the simulator, or `None` to always check them. Simulator
+    #: interfaces which are known to provide values of the correct types (``float``
+    #: for scalars, `Vector` for vectors, etc.) may set this to skip the checks.
+    typeCheckSteps = None
+
     def __init_subclass__(cls):
         super().__init_subclass__()
 
@@ -329,12 +366,20 @@ class Simulation(abc.ABC):
         divergenceTolerance=0,
         continueAfterDivergence=False,
         verbosity=0,
+        columnarTrajectory=False,
+        replayFile=None,
+        replayQuantum=None,
     ):
         self.screen = None
         self.result = None
         self.scene = scene
         self.objects = []
-        self.trajectory = []
+        self._newObjects = set()
+        if columnarTrajectory:
+            self.trajectory = self._trajectoryStore = TrajectoryStore()
+        else:
+            self.trajectory = []
+            self._trajectoryStore = None
         self.records = defaultdict(list)
         self.currentTime = 0
         self.timestep = 1 if timestep is None else float(timestep)
@@ -345,12 +390,20 @@ class Simulation(abc.ABC):
         self.actionSequence = []
 
         # Prepare to save or load a replay.
-        self.initializeReplay(replay, enableReplay, enableDivergenceCheck, allowPickle)
+        self.initializeReplay(
+            replay,
+            enableReplay,
+            enableDivergenceCheck,
+            allowPickle,
+            replayFile=replayFile,
+            replayQuantum=replayQuantum,
+        )
         self.divergenceTolerance = divergenceTolerance
         self.continueAfterDivergence = continueAfterDivergence
 
         # Do the actual setup and execution of the simulation inside a try-finally
         # statement so that we roll back global state even if an error occurs.
+        rejected = False
         try:
             # Prepare global veneer state for running the simulation.
             import scenic.syntax.veneer as veneer
@@ -394,8 +447,14 @@ class Simulation(abc.ABC):
             # This simulation will be thrown out, but attach it to the exception
             # to aid in debugging.
             e.simulation = self
+            if self._replayFile:
+                # Leave the replay file open for the next attempt, if any
+                self._replayFile.discard()
+                rejected = True
             raise
         finally:
+            if self._replayFile and not rejected:
+                self._replayFile.close()
             self.destroy()
             for obj in self.objects:
                 disableDynamicProxyFor(obj)
@@ -528,32 +587,65 @@ class Simulation(abc.ABC):
         for obj in self.scene.objects:
             self._createObject(obj)
 
-    def initializeReplay(self, replay, enableReplay, enableDivergenceCheck, allowPickle):
+    def initializeReplay(
+        self,
+        replay,
+        enableReplay,
+        enableDivergenceCheck,
+        allowPickle,
+        replayFile=None,
+        replayQuantum=None,
+    ):
+        self._quantizationError = 0
         if replay:
             self.replaying = True
             self._replayIn = Serializer(replay, allowPickle=allowPickle, detectEnd=True)
-            flags = ReplayMode(self._replayIn.readReplayHeader())
+            flags, quantum = self._readReplayHeader(self._replayIn)
             self._checkDivergence = ReplayMode.checkDivergence in flags
+            if quantum is not None:
+                self._replayIn.quantum = quantum
+                self._quantizationError = quantum
         else:
             self.replaying = False
+        self._replayFile = None
         if enableReplay:
-            self._replayOut = Serializer(allowPickle=allowPickle)
+            if replayFile is not None and not isinstance(replayFile, ReplayFileWriter):
+                replayFile = ReplayFileWriter(replayFile)
+            self._replayFile = replayFile
+            self._replayOut = Serializer(
+                b"" if replayFile is None else replayFile, allowPickle=allowPickle
+            )
             flags = 0
             if enableDivergenceCheck:
                 flags |= ReplayMode.checkDivergence
                 self._writeDivergenceData = True
             else:
                 self._writeDivergenceData = False
+            if replayQuantum is not None:
+                flags |= ReplayMode.quantized
             self._replayOut.writeReplayHeader(flags)
+            if replayQuantum is not None:
+                self._replayOut.writeValue(float(replayQuantum), float)
+                self._replayOut.quantum = float(replayQuantum)
         else:
             self._replayOut = None
 
+    @staticmethod
+    def _readReplayHeader(serializer):
+        flags = ReplayMode(serializer.readReplayHeader())
+        if ReplayMode.quantized in flags:
+            quantum = serializer.readValue(float)
+        else:
+            quantum = None
+        return flags, quantum
+
     def _createObject(self, obj):
         if self.verbosity >= 3:
             print(f"      Creating object {obj}")
 
         # Add the new object to our lists.
         self.objects.append(obj)
+        self._newObjects.add(obj)
         if obj.behavior:
             self.agents.append(obj)
 
@@ -596,10 +688,15 @@ class Simulation(abc.ABC):
 
         # Record time-series values
         values = dynamicScenario._evaluateRecordedExprs(RequirementType.record)
-        for name, val in values.items():
-            records[name].append((self.currentTime, val))
-
-        self.trajectory.append(self.currentState())
+        store = self._trajectoryStore
+        if store is None:
+            for name, val in values.items():
+                records[name].append((self.currentTime, val))
+            self.trajectory.append(self.currentState())
+        else:
+            for name, val in values.items():
+                records[name] = store.recordValue(name, self.currentTime, val)
+            store.recordState(self.objects)
 
     def replayCanContinue(self):
         if not self.replaying:
@@ -678,46 +775,45 @@ class Simulation(abc.ABC):
         """Update the positions and other properties of objects from the simulation.
 
         Subclasses likely do not need to override this method: they should implement its
-        subroutine `getProperties` below.
+        subroutine `getProperties` below (and optionally `getChangedProperties`).
         """
-        for obj in self.objects:
+        changes = self.getChangedProperties()
+        newObjects = self._newObjects
+        self._newObjects = set()
+        checkTypes = self.typeCheckSteps is None or self.currentTime < self.typeCheckSteps
+
+        # If saving a replay with divergence-checking support, we'll save all the new
+        # values; if running a replay with such support, we'll check for divergence.
+        replayOut = self._replayOut
+        writeState = replayOut and self._writeDivergenceData
+        if replayOut:
+            replayOut.beginState()
+            if writeState:
+                replayOut.writeValue(len(self.objects), int)
+        checkState = self.replayCanContinue() and self._checkDivergence
+        if checkState:
+            self._replayIn.readValue(int)  # number of objects
+
+        for i, obj in enumerate(self.objects):
             # Get latest values of dynamic properties from simulation and assign them
             dynTypes = obj._simulatorProvidedProperties
-            properties = set(dynTypes)
-            values = self.getProperties(obj, properties)
-            assert properties == set(values), properties ^ set(values)
-            for prop, value in values.items():
-                # Check new value has the expected type
-                ty = dynTypes[prop]
-                if ty is float and isinstance(value, numbers.Real):
-                    # Special case for scalars so that we don't penalize simulator interfaces
-                    # for returning ints, NumPy scalar types, etc.
-                    value = float(value)
-                elif ty is type(None):
-                    # Special case for properties with initial value None: the simulator sets
-                    # their actual initial value, so we'll assume the type is correct here.
-                    ty = type(value)
-                    dynTypes[prop] = ty
-                if not isinstance(value, ty):
-                    actual = type(value).__name__
-                    expected = ty.__name__
-                    raise RuntimeError(
-                        f'simulator provided value for property "{prop}" '
-                        f"with type {actual} instead of expected {expected}"
-                    )
-
-                # Assign the new value
-                setattr(obj, prop, value)
+            if changes is None or obj in newObjects:
+                properties = set(dynTypes)
+                values = self.getProperties(obj, properties)
+                assert properties == set(values), properties ^ set(values)
+            else:
+                values = changes.get(obj)
+                assert not values or values.keys() <= dynTypes.keys(), values.keys()
+            if values:
+                self._assignProperties(obj, dynTypes, values, checkTypes)
 
-            # If saving a replay with divergence-checking support, save all the new values;
-            # if running a replay with such support, check for divergence.
-            if self._replayOut and self._writeDivergenceData:
+            if writeState:
                 for prop, ty in dynTypes.items():
-                    self._replayOut.writeValue(values[prop], ty)
-            if self.replayCanContinue() and self._checkDivergence:
+                    replayOut.writeDynamicValue((i, prop), getattr(obj, prop), ty)
+            if checkState and self.replaying:
                 for prop, ty in dynTypes.items():
-                    expected = self._replayIn.readValue(ty)
-                    actual = values[prop]
+                    expected = self._replayIn.readDynamicValue((i, prop), ty)
+                    actual = getattr(obj, prop)
                     if self.valuesHaveDiverged(obj, prop, expected, actual):
                         msg = (
                             f'expected "{prop}" of {obj} to have value '
@@ -734,12 +830,45 @@ class Simulation(abc.ABC):
                         else:
                             raise DivergenceError(msg)
 
-            # Recompute dynamic final properties
-            obj._recomputeDynamicFinals()
+            if values:
+                # Recompute dynamic final properties
+                obj._recomputeDynamicFinals()
+
+                # Clear caches to ensure that cached properties like visibleRegion, etc.
+                # are recomputed
+                obj._clearCaches()
+
+        if replayOut:
+            replayOut.endStep()
+        if self.replaying:
+            self._replayIn.endStep()
+
+    def _assignProperties(self, obj, dynTypes, values, checkTypes):
+        for prop, value in values.items():
+            ty = dynTypes[prop]
+            if ty is float:
+                # Special case for scalars so that we don't penalize simulator interfaces
+                # for returning ints, NumPy scalar types, etc. This is done even when
+                # not checking types, so that scalar properties are always floats.
+                if type(value) is not float and isinstance(value, numbers.Real):
+                    value = float(value)
+            elif ty is type(None) and checkTypes:
+                # Special case for properties with initial value None: the simulator sets
+                # their actual initial value, so we'll assume the type is correct here.
+                ty = type(value)
+                dynTypes[prop] = ty
+
+            # Check new value has the expected type
+            if checkTypes and not isinstance(value, ty):
+                actual = type(value).__name__
+                expected = ty.__name__
+                raise RuntimeError(
+                    f'simulator provided value for property "{prop}" '
+                    f"with type {actual} instead of expected {expected}"
+                )
 
-            # Clear caches to ensure that cached properties like visibleRegion, etc.
-            # are recomputed
-            obj._clearCaches()
+            # Assign the new value
+            setattr(obj, prop, value)
 
     def valuesHaveDiverged(self, obj, prop, expected, actual):
         """Decide whether the value of a dynamic property has diverged from the replay.
@@ -768,7 +897,7 @@ class Simulation(abc.ABC):
         elif isinstance(expected, Vector):
             diff = (actual - expected).norm()
         if diff:
-            return diff > self.divergenceTolerance
+            return diff > self.divergenceTolerance + self._quantizationError
         else:
             return actual != expected
 
@@ -788,6 +917,26 @@ class Simulation(abc.ABC):
         """
         raise NotImplementedError
 
+    def getChangedProperties(self):
+        """Report which dynamic properties changed during the last time step.
+
+        Simulator interfaces which can efficiently tell which objects have changed
+        (e.g. because the simulator only sends updates for moving objects) may override
+        this method to avoid reading every property of every object with
+        `getProperties` at each time step. Only objects which have changed then have
+        their dynamic final properties and cached values recomputed. Changes made to
+        objects by Scenic itself (e.g. by actions) must be reported too. Objects are
+        always read with `getProperties` in the first time step after their creation.
+
+        The default implementation returns `None`.
+
+        Returns:
+            `None` to read all properties of all objects using `getProperties`;
+            otherwise a `dict` mapping each object which changed to a `dict` giving
+            the new values of its changed properties.
+        """
+        return None
+
     def currentState(self):
         """Return the current state of the simulation.
 
@@ -818,11 +967,14 @@ class Simulation(abc.ABC):
         """
         if not self._replayOut:
             raise RuntimeError("cannot save replay without replay support enabled")
+        if self._replayFile:
+            raise RuntimeError("replay was streamed to a file")
         return self._replayOut.getBytes()
 
 
 class ReplayMode(enum.IntFlag):
     checkDivergence = enum.auto()
+    quantized = enum.auto()
 
 
 class DummySimulator(Simulator):
@@ -909,6 +1061,9 @@ class SimulationResult:
     Attributes:
         trajectory: A tuple giving for each time step the simulation's 'state': by
             default the positions of every object. See `Simulation.currentState`.
+            If the simulation was run with ``columnarTrajectory=True``, this is instead
+            a `TrajectoryStore`, which behaves like such a tuple but also provides
+            arrays of the positions and orientations of each object.
         finalState: The last 'state' of the simulation, as above.
         actions: A tuple giving for each time step a dict specifying for each agent the
             (possibly-empty) tuple of actions it took at that time step.
@@ -916,11 +1071,14 @@ class SimulationResult:
         terminationReason (str): A human-readable string giving the reason why the
             simulation ended, possibly including debugging info.
         records (dict): For each :keyword:`record` statement, the value or time series of
-            values its expression took during the simulation.
+            values its expression took during the simulation. With
+            ``columnarTrajectory=True``, numeric time series are `RecordSeries`.
     """
 
     def __init__(self, trajectory, actions, terminationType, terminationReason, records):
-        self.trajectory = tuple(trajectory)
+        if not isinstance(trajectory, TrajectoryStore):
+            trajectory = tuple(trajectory)
+        self.trajectory = trajectory
         assert self.trajectory
         self.finalState = self.trajectory[-1]
         self.actions = tuple(actions)
@@ -0,0 +1,253 @@
+"""Columnar storage for simulation trajectories.
+
+By default a `Simulation` saves its trajectory as a list of states (tuples of `Vector`
+objects) and each time series of :keyword:`record` values as a list of ``(time, value)``
+pairs. For long simulations this creates millions of small Python objects. Passing
+``columnarTrajectory=True`` to `Simulator.simulate` instead uses a `TrajectoryStore`,
+which saves positions, orientations, and numeric records into growable NumPy arrays
+(one set of arrays per object). Once the arrays of a store exceed `SPILL_THRESHOLD`
+bytes, further arrays are allocated as memory-mapped temporary files so that very
+long runs do not exhaust memory.
+
+The arrays returned by `TrajectoryStore.positions`, `RecordSeries.values`, etc. are
+views into the store's buffers, so they are not copied; they remain valid after the
+simulation ends.
+"""
+
+import collections.abc
+import numbers
+import tempfile
+
+import numpy
+
+from scenic.core.vectors import Orientation, Vector
+
+#: Number of time steps for which space is allocated when a column is created.
+INITIAL_CAPACITY = 256
+
+#: Total size in bytes of the arrays of a `TrajectoryStore` beyond which new arrays are
+#: backed by temporary files instead of memory. `None` disables spilling to disk.
+SPILL_THRESHOLD = 256 * 2**20
+
+
+class _Column:
+    """A growable array of fixed-width rows."""
+
+    def __init__(self, store, width, dtype=float):
+        self.store = store
+        self.length = 0
+        self.data = store._allocate((INITIAL_CAPACITY, width), dtype)
+
+    def append(self, row):
+        if self.length == len(self.data):
+            old = self.data
+            self.data = self.store._allocate((2 * len(old), old.shape[1]), old.dtype)
+            self.data[: len(old)] = old
+            self.store._release(old)
+        self.data[self.length] = row
+        self.length += 1
+
+    def view(self):
+        return self.data[: self.length]
+
+
+class RecordSeries(collections.abc.Sequence):
+    """The time series of values of a :keyword:`record` statement.
+
+    Behaves like the list of ``(time, value)`` pairs saved by default, but stores the
+    times and values in arrays, available (without copying) as `times` and `values`.
+    Only series whose values are all vectors, all floats, or all integers (fitting in
+    64 bits) are stored this way, so that values are returned exactly as recorded.
+    """
+
+    def __init__(self, store, kind):
+        #: Type of the values of the series: `Vector`, `float`, or `int`.
+        self.kind = kind
+        self._times = _Column(store, 1, dtype=numpy.int64)
+        if kind is Vector:
+            self._values = _Column(store, 3)
+        else:
+            self._values = _Column(store, 1, dtype=numpy.int64 if kind is int else float)
+
+    @property
+    def isVector(self):
+        return self.kind is Vector
+
+    @staticmethod
+    def kindOf(value):
+        """The kind of series in which a value can be stored, or `None` if none."""
+        if isinstance(value, Vector):
+            return Vector
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, numbers.Integral):
+            return int if -(2**63) <= value < 2**63 else None
+        if isinstance(value, numbers.Real):
+            return float
+        return None
+
+    def append(self, pair):
+        time, value = pair
+        self._times.append(time)
+        self._values.append(value.coordinates if self.kind is Vector else value)
+
+    @property
+    def times(self):
+        """Array of the time steps at which values were recorded."""
+        return self._times.view()[:, 0]
+
+    @property
+    def values(self):
+        """Array of the recorded values (with shape ``(N, 3)`` for vectors)."""
+        values = self._values.view()
+        return values if self.isVector else values[:, 0]
+
+    def __len__(self):
+        return self._times.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        time = int(self.times[index])
+        value = self._values.view()[index].tolist()
+        value = Vector(*value) if self.isVector else value[0]
+        return (time, value)
+
+    def __eq__(self, other):
+        if isinstance(other, RecordSeries):
+            other = list(other)
+        return list(self) == other
+
+    def __repr__(self):
+        return f"RecordSeries({list(self)!r})"
+
+
+class TrajectoryStore(collections.abc.Sequence):
+    """Columnar storage for the trajectory and time-series records of a simulation.
+
+    As a sequence, a `TrajectoryStore` is a drop-in replacement for the default
+    trajectory: element *i* is the tuple of positions of the objects existing at time
+    step *i*, created on demand. The underlying arrays can be accessed using the
+    `positions` and `orientations` methods.
+
+    Args:
+        spillThreshold (int): Overrides `SPILL_THRESHOLD` for this store.
+        spillDirectory (str): Directory in which to create memory-mapped files; by
+            default the system's temporary directory.
+    """
+
+    def __init__(self, spillThreshold=SPILL_THRESHOLD, spillDirectory=None):
+        self.spillThreshold = spillThreshold
+        self.spillDirectory = spillDirectory
+        self.allocatedBytes = 0
+        self.spilled = False
+        self.objects = []
+        self._starts = []
+        self._positions = []
+        self._orientations = []
+        self._length = 0
+        self.series = {}
+
+    def _allocate(self, shape, dtype):
+        size = numpy.dtype(dtype).itemsize * shape[0] * shape[1]
+        if self.spillThreshold is not None and (
+            self.allocatedBytes + size > self.spillThreshold
+        ):
+            # The mapping remains valid after the (anonymous) file is closed
+            with tempfile.TemporaryFile(dir=self.spillDirectory) as backing:
+                array = numpy.memmap(backing, dtype=dtype, mode="w+", shape=shape)
+            self.spilled = True
+        else:
+            array = numpy.empty(shape, dtype=dtype)
+        self.allocatedBytes += size
+        return array
+
+    def _release(self, array):
+        self.allocatedBytes -= array.nbytes
+
+    def recordState(self, objects):
+        """Save the positions and orientations of the given objects at a new time step.
+
+        The objects must be given in a consistent order, with any newly-created objects
+        at the end.
+        """
+        for obj in objects[len(self.objects) :]:
+            self.objects.append(obj)
+            self._starts.append(self._length)
+            self._positions.append(_Column(self, 3))
+            self._orientations.append(_Column(self, 4))
+        for obj, positions, orientations in zip(
+            objects, self._positions, self._orientations
+        ):
+            positions.append(obj.position.coordinates)
+            orientations.append(obj.orientation.q)
+        self._length += 1
+
+    def recordValue(self, name, time, value):
+        """Save a value of a time-series record.
+
+        Returns:
+            The series holding the value: a `RecordSeries` if all values of the series
+            so far could be stored in columnar form, and otherwise a list of
+            ``(time, value)`` pairs.
+        """
+        series = self.series.get(name)
+        kind = RecordSeries.kindOf(value)
+        if series is None:
+            series = [] if kind is None else RecordSeries(self, kind)
+            self.series[name] = series
+        elif isinstance(series, RecordSeries) and kind is not series.kind:
+            series = self.series[name] = list(series)
+        series.append((time, value))
+        return series
+
+    def _indexOf(self, obj):
+        if isinstance(obj, int):
+            return obj
+        for i, other in enumerate(self.objects):
+            if other is obj:
+                return i
+        raise ValueError(f"{obj} is not in the trajectory")
+
+    def startOf(self, obj):
+        """The first time step at which an object (or object index) was recorded."""
+        return self._starts[self._indexOf(obj)]
+
+    def positions(self, obj):
+        """Array of shape ``(N, 3)`` giving the positions of an object over time.
+
+        Row *i* corresponds to time step ``startOf(obj) + i``.
+        """
+        return self._positions[self._indexOf(obj)].view()
+
+    def orientations(self, obj):
+        """Array of shape ``(N, 4)`` giving the orientations of an object over time.
+
+        Orientations are represented as quaternions in the form (x, y, z, w) used by
+        `Orientation.fromQuaternion`.
+        """
+        return self._orientations[self._indexOf(obj)].view()
+
+    def orientationAt(self, obj, step):
+        """The `Orientation` of an object at the given time step."""
+        index = self._indexOf(obj)
+        return Orientation.fromQuaternion(
+            self._orientations[index].view()[step - self._starts[index]]
+        )
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, step):
+        if isinstance(step, slice):
+            return [self[i] for i in range(*step.indices(len(self)))]
+        if step < 0:
+            step += self._length
+        if not 0 <= step < self._length:
+            raise IndexError("trajectory index out of range")
+        state = []
+        for start, positions in zip(self._starts, self._positions):
+            if start > step:
+                break
+            state.append(Vector(*positions.data[step - start].tolist()))
+        return tuple(state)
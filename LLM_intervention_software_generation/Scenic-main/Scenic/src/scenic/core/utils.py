@@ -10,12 +10,13 @@ import os
 import signal
 from subprocess import CalledProcessError
 import sys
+import threading
+import time
 import typing
 import warnings
 import weakref
 
 import numpy
-import trimesh
 
 sqrt2 = math.sqrt(2)
 
@@ -122,6 +123,217 @@ def alarm(seconds, handler=None, noNesting=False):
     finally:
         signal.alarm(0)
         signal.signal(signal.SIGALRM, signal.SIG_DFL)
+        _alarmTimer.expiry = None  # our timer (if any) was cancelled
+
+
+class Watchdog:
+    """Detector for code which runs past a deadline.
+
+    This is a lightweight alternative to `alarm`: arming and disarming a deadline
+    usually only reads the clock and pushes/pops a list, rather than making system
+    calls to set up a timer, so it can be used around every step of a simulation. It
+    also works in any thread, not just the main one.
+
+    In the main thread, expired deadlines are detected by a SIGALRM timer which is
+    only reset when it would fire too late for a newly-armed deadline, so it is
+    rarely touched when deadlines are armed repeatedly. Handlers are then called in
+    the main thread itself, interrupting the body of the deadline even if it is a
+    tight loop; exceptions they raise propagate from that point. If SIGALRM is not
+    available, or another handler for it is installed, deadlines are instead
+    detected by a background thread as in other threads.
+
+    In other threads, expired deadlines are noticed by a daemon thread which sleeps
+    until the earliest pending deadline, exiting once no deadline has been armed for
+    ``interval`` seconds. Handlers are then called from the watchdog thread, and if
+    one raises an exception (e.g. a warning turned into an error by the warning
+    filters), it is raised again in the thread which armed the deadline when the
+    body of the deadline finishes.
+
+    In either case, each handler is called at most once and is passed the trace
+    function (as returned by `sys.gettrace`) which was active in the thread which
+    armed the deadline, to allow detecting the use of a debugger.
+    """
+
+    def __init__(self, interval=1):
+        self.interval = interval
+        self._local = threading.local()
+        self._stacks = weakref.WeakKeyDictionary()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._wakeTime = math.inf
+        self._armCount = 0
+        self._mainStack = None
+
+    def deadline(self, seconds, handler):
+        """Context manager calling ``handler`` if its body runs for over ``seconds``.
+
+        Deadlines may be nested. A non-positive number of seconds disables the
+        deadline.
+        """
+        return _Deadline(self, seconds, handler)
+
+    def _arm(self, deadline, now):
+        local = self._local
+        try:
+            stack = local.stack
+        except AttributeError:
+            stack = local.stack = []
+            local.useSignals = (
+                hasattr(signal, "setitimer")
+                and threading.current_thread() is threading.main_thread()
+            )
+            if local.useSignals:
+                self._mainStack = stack
+                _alarmTimer.watchdogs.add(self)
+            with self._condition:
+                self._stacks[threading.current_thread()] = stack
+        stack.append(deadline)
+
+        if local.useSignals and _alarmTimer.arm(deadline.expiry, now):
+            deadline.polled = False
+        else:
+            deadline.polled = True
+            with self._condition:
+                self._armCount += 1
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name="scenic-watchdog", daemon=True
+                    )
+                    self._thread.start()
+                elif deadline.expiry < self._wakeTime:
+                    self._condition.notify()
+        return stack
+
+    @staticmethod
+    def _collectExpired(stack, now, polled):
+        expired = []
+        nextExpiry = None
+        for deadline in tuple(stack):
+            if deadline.polled is not polled or deadline.fired:
+                continue
+            if now >= deadline.expiry:
+                deadline.fired = True
+                expired.append(deadline)
+            elif nextExpiry is None or deadline.expiry < nextExpiry:
+                nextExpiry = deadline.expiry
+        return expired, nextExpiry
+
+    def _run(self):
+        armCount = None
+        while True:
+            with self._condition:
+                now = time.monotonic()
+                expired, nextExpiry = [], None
+                for stack in self._stacks.values():
+                    exp, nxt = self._collectExpired(stack, now, polled=True)
+                    expired.extend(exp)
+                    if nxt is not None and (nextExpiry is None or nxt < nextExpiry):
+                        nextExpiry = nxt
+                if not expired:
+                    if nextExpiry is None:
+                        if armCount == self._armCount:
+                            # No deadlines were armed for a whole interval; stop
+                            self._thread = None
+                            return
+                        armCount = self._armCount
+                        nextExpiry = now + self.interval
+                    self._wakeTime = nextExpiry
+                    self._condition.wait(nextExpiry - now)
+                    self._wakeTime = math.inf
+                    continue
+            for deadline in expired:
+                try:
+                    deadline.handler(deadline.tracer)
+                except Exception as e:
+                    # Hand the error to the thread which armed the deadline
+                    deadline.error = e
+
+
+class _AlarmTimer:
+    """SIGALRM timer shared by all `Watchdog` instances for the main thread."""
+
+    def __init__(self):
+        self.expiry = None
+        self.watchdogs = weakref.WeakSet()
+        self._handler = self._onAlarm  # saved so we can recognize it later
+
+    def arm(self, expiry, now):
+        """Ensure the timer fires by ``expiry``, returning False if we can't use it."""
+        # N.B. a timer which should already have fired was lost (e.g. by forking)
+        if self.expiry is not None and now <= self.expiry <= expiry:
+            return True  # fast path: the pending timer will fire early enough
+        handler = signal.getsignal(signal.SIGALRM)
+        if handler is not self._handler:
+            if handler not in (signal.SIG_DFL, signal.SIG_IGN, None):
+                return False  # someone else is using SIGALRM
+            signal.signal(signal.SIGALRM, self._handler)
+        self.expiry = expiry
+        signal.setitimer(signal.ITIMER_REAL, max(expiry - now, 1e-6))
+        return True
+
+    def _onAlarm(self, signum, frame):
+        self.expiry = None
+        now = time.monotonic()
+        expired, nextExpiry = [], None
+        for watchdog in tuple(self.watchdogs):
+            exp, nxt = watchdog._collectExpired(watchdog._mainStack, now, polled=False)
+            expired.extend(exp)
+            if nxt is not None and (nextExpiry is None or nxt < nextExpiry):
+                nextExpiry = nxt
+        if nextExpiry is not None:
+            self.arm(nextExpiry, now)
+        for deadline in expired:
+            deadline.handler(deadline.tracer)
+
+
+_alarmTimer = _AlarmTimer()
+
+
+class _Deadline:
+    __slots__ = (
+        "watchdog",
+        "seconds",
+        "handler",
+        "expiry",
+        "tracer",
+        "polled",
+        "fired",
+        "error",
+        "stack",
+    )
+
+    def __init__(self, watchdog, seconds, handler):
+        self.watchdog = watchdog
+        self.seconds = seconds
+        self.handler = handler
+        self.fired = False
+        self.error = None
+        self.stack = None
+
+    def __enter__(self):
+        if self.seconds <= 0:
+            return
+        self.tracer = sys.gettrace()
+        now = time.monotonic()
+        self.expiry = now + self.seconds
+        self.stack = self.watchdog._arm(self, now)
+
+    def __exit__(self, excType, *exc):
+        if self.stack is not None:
+            self.stack.pop()
+            if self.error is not None and excType is None:
+                raise self.error
+
+
+_defaultWatchdog = Watchdog()
+
+
+def deadline(seconds, handler):
+    """Call ``handler`` if the body of this context manager runs for too long.
+
+    Uses a shared `Watchdog`; see its documentation for details.
+    """
+    return _defaultWatchdog.deadline(seconds, handler)
 
 
 def unifyMesh(mesh, verbose=False):
@@ -135,6 +347,8 @@ def unifyMesh(mesh, verbose=False):
     2. From each volume, subtract each hole that is fully contained.
     3. Union all the resulting volumes.
     """
+    import trimesh
+
     assert mesh.is_volume
 
     # No need to unify a mesh with less than 2 bodies
@@ -212,6 +212,142 @@ def vectorDistributionMethod(method):
     return helper
 
 
+## Quaternion arithmetic
+
+# Orientations are stored as unit quaternions (x, y, z, w), the convention used by
+# SciPy. Creating a SciPy `Rotation` for every operation is slow, so the functions
+# below implement the operations Scenic uses most often directly on quaternions; they
+# perform the same floating-point operations as SciPy, and so give identical results
+# (except for conversion to Euler angles, which agrees to within rounding error).
+# The versions with names ending in "Array" operate on arrays of shape (N, 4).
+
+
+def _quatMultiply(p, q):
+    # Hamilton product, normalized as by `Rotation.__mul__`
+    px, py, pz, pw = p
+    qx, qy, qz, qw = q
+    x = pw * qx + qw * px + (py * qz - pz * qy)
+    y = pw * qy + qw * py + (pz * qx - px * qz)
+    z = pw * qz + qw * pz + (px * qy - py * qx)
+    w = pw * qw - px * qx - py * qy - pz * qz
+    norm = math.sqrt(x * x + y * y + z * z + w * w)
+    return (x / norm, y / norm, z / norm, w / norm)
+
+
+def _quatMultiplyUnnormalized(p, q):
+    px, py, pz, pw = p
+    qx, qy, qz, qw = q
+    return (
+        pw * qx + qw * px + (py * qz - pz * qy),
+        pw * qy + qw * py + (pz * qx - px * qz),
+        pw * qz + qw * pz + (px * qy - py * qx),
+        pw * qw - px * qx - py * qy - pz * qz,
+    )
+
+
+def _quatFromEuler(yaw, pitch, roll):
+    # Intrinsic rotations about the Z, X, and Y axes, as `Rotation.from_euler("ZXY")`
+    qz = (0.0, 0.0, sin(yaw / 2), cos(yaw / 2))
+    qx = (sin(pitch / 2), 0.0, 0.0, cos(pitch / 2))
+    qy = (0.0, sin(roll / 2), 0.0, cos(roll / 2))
+    return _quatMultiplyUnnormalized(_quatMultiplyUnnormalized(qz, qx), qy)
+
+
+def _quatFromHeading(heading):
+    # As `Rotation.from_rotvec`, which uses a Taylor series for small angles
+    angle = abs(heading)
+    if angle <= 1e-3:
+        angle2 = angle * angle
+        scale = 0.5 - angle2 / 48 + angle2 * angle2 / 3840
+    else:
+        scale = sin(angle / 2) / angle
+    return (0.0, 0.0, scale * heading, cos(angle / 2))
+
+
+def _eulerFromQuat(q):
+    # Global intrinsic ZXY Euler angles, using the method of Bernardes and Viollet
+    # (2022) as `Rotation.as_euler` does; in case of gimbal lock the roll is set to zero.
+    x, y, z, w = q
+    a, b, c, d = w - x, y - z, x + w, -z - y
+    pitch = 2 * math.atan2(math.hypot(c, d), math.hypot(a, b))
+    halfSum, halfDiff = math.atan2(b, a), math.atan2(d, c)
+    if abs(pitch) <= 1e-7:
+        yaw, roll = -2 * halfSum, 0.0
+    elif abs(pitch - math.pi) <= 1e-7:
+        yaw, roll = -2 * halfDiff, 0.0
+    else:
+        yaw, roll = -(halfSum + halfDiff), halfSum - halfDiff
+    return (normalizeAngle(yaw), pitch - math.pi / 2, normalizeAngle(roll))
+
+
+def _quatMatrix(q):
+    # Rotation matrix, as `Rotation.as_matrix`
+    x, y, z, w = q
+    x2, y2, z2, w2 = x * x, y * y, z * z, w * w
+    xy, zw, xz, yw, yz, xw = x * y, z * w, x * z, y * w, y * z, x * w
+    return numpy.array(
+        (
+            (x2 - y2 - z2 + w2, 2 * (xy - zw), 2 * (xz + yw)),
+            (2 * (xy + zw), -x2 + y2 - z2 + w2, 2 * (yz - xw)),
+            (2 * (xz - yw), 2 * (yz + xw), -x2 - y2 + z2 + w2),
+        )
+    )
+
+
+def _quatMultiplyArray(p, q, normalize=True):
+    px, py, pz, pw = p.T
+    qx, qy, qz, qw = q.T
+    result = numpy.empty(numpy.broadcast_shapes(p.shape, q.shape))
+    result[:, 0] = pw * qx + qw * px + (py * qz - pz * qy)
+    result[:, 1] = pw * qy + qw * py + (pz * qx - px * qz)
+    result[:, 2] = pw * qz + qw * pz + (px * qy - py * qx)
+    result[:, 3] = pw * qw - px * qx - py * qy - pz * qz
+    if normalize:
+        result /= numpy.sqrt(numpy.einsum("ij,ij->i", result, result))[:, numpy.newaxis]
+    return result
+
+
+def _quatFromEulerArray(yaw, pitch, roll):
+    yaw, pitch, roll = numpy.broadcast_arrays(
+        *(numpy.asarray(angle, dtype=float).reshape(-1) for angle in (yaw, pitch, roll))
+    )
+    zeros = numpy.zeros_like(yaw)
+    qz = numpy.stack((zeros, zeros, numpy.sin(yaw / 2), numpy.cos(yaw / 2)), axis=1)
+    qx = numpy.stack((numpy.sin(pitch / 2), zeros, zeros, numpy.cos(pitch / 2)), axis=1)
+    qy = numpy.stack((zeros, numpy.sin(roll / 2), zeros, numpy.cos(roll / 2)), axis=1)
+    qzx = _quatMultiplyArray(qz, qx, normalize=False)
+    return _quatMultiplyArray(qzx, qy, normalize=False)
+
+
+def _eulerFromQuatArray(q):
+    x, y, z, w = q.T
+    a, b, c, d = w - x, y - z, x + w, -z - y
+    pitch = 2 * numpy.arctan2(numpy.hypot(c, d), numpy.hypot(a, b))
+    halfSum, halfDiff = numpy.arctan2(b, a), numpy.arctan2(d, c)
+    lockedUp = numpy.abs(pitch) <= 1e-7
+    lockedDown = numpy.abs(pitch - math.pi) <= 1e-7
+    locked = lockedUp | lockedDown
+    angles = numpy.empty((len(q), 3))
+    angles[:, 0] = -(halfSum + halfDiff)
+    angles[lockedUp, 0] = -2 * halfSum[lockedUp]
+    angles[lockedDown, 0] = -2 * halfDiff[lockedDown]
+    angles[:, 1] = pitch - math.pi / 2
+    angles[:, 2] = numpy.where(locked, 0.0, halfSum - halfDiff)
+    # Wrap yaw and roll to [-pi, pi]
+    for i in (0, 2):
+        column = angles[:, i]
+        column[column < -math.pi] += 2 * math.pi
+        column[column > math.pi] -= 2 * math.pi
+    return angles
+
+
+def _rotateArray(q, vectors):
+    # Apply rotations to vectors: v + 2w(u x v) + 2u x (u x v), where q = (u, w)
+    u, w = q[:, :3], q[:, 3:]
+    t = 2 * numpy.cross(u, vectors)
+    return vectors + w * t + numpy.cross(u, t)
+
+
 class Orientation:
     """An orientation in 3D space."""
 
@@ -221,14 +357,28 @@ class Orientation:
                 "Orientation's 'rotation' parameter must be a SciPy rotation."
                 " Perhaps you want to use a factory method?"
             )
-        self.r = rotation
+        # Seed the cache of the `r` property (see `scenic.core.utils.cached`)
+        self._cached_r = rotation
         self.q = rotation.as_quat()
 
+    @classmethod
+    def _fromQuat(cls, quaternion) -> Orientation:
+        # Create an `Orientation` from a unit quaternion, without going through SciPy.
+        orientation = cls.__new__(cls)
+        orientation.q = numpy.array(quaternion, dtype=float)
+        return orientation
+
     @classmethod
     def fromQuaternion(cls, quaternion) -> Orientation:
         """Create an `Orientation` from a quaternion (of the form (x,y,z,w))"""
-        r = Rotation.from_quat(quaternion)
-        return cls(r)
+        q = numpy.asarray(quaternion, dtype=float)
+        if q.shape != (4,):
+            return cls(Rotation.from_quat(quaternion))
+        x, y, z, w = q.tolist()
+        norm = math.sqrt(x * x + y * y + z * z + w * w)
+        if not norm > 0:
+            raise ValueError("quaternion must have nonzero norm")
+        return cls._fromQuat(q / norm)
 
     @classmethod
     @distributionFunction
@@ -239,14 +389,12 @@ class Orientation:
     @classmethod
     def _fromEuler(cls, yaw, pitch, roll) -> Orientation:
         # Inner version of `fromEuler` which doesn't accept distributions.
-        r = Rotation.from_euler("ZXY", [yaw, pitch, roll], degrees=False)
-        return cls(r)
+        return cls._fromQuat(_quatFromEuler(yaw, pitch, roll))
 
     @classmethod
     def _fromHeading(cls, heading) -> Orientation:
         # This method is faster than `from_euler` if we only have 1 angle.
-        r = Rotation.from_rotvec([0, 0, heading], degrees=False)
-        return cls(r)
+        return cls._fromQuat(_quatFromHeading(heading))
 
     @property
     def w(self) -> float:
@@ -306,10 +454,15 @@ class Orientation:
             return True
         return canCoerceType(ty, float) or hasattr(ty, "toOrientation")
 
+    @cached_property
+    def r(self):
+        """The SciPy `Rotation` corresponding to this orientation."""
+        return Rotation(self.q, normalize=False)
+
     @cached_property
     def eulerAngles(self) -> typing.Tuple[float, float, float]:
         """Global intrinsic Euler angles yaw, pitch, roll."""
-        return self.r.as_euler("ZXY", degrees=False)
+        return numpy.array(_eulerFromQuat(self.q.tolist()))
 
     def _trimeshEulerAngles(self):
         return self.r.as_euler("xyz", degrees=False)
@@ -317,13 +470,24 @@ class Orientation:
     def getRotation(self):
         return self.r
 
+    @cached_property
+    def _matrix(self):
+        return _quatMatrix(self.q.tolist())
+
+    def _rotate(self, vector):
+        # Faster equivalent of ``self.r.apply(vector)`` for a single vector
+        if isinstance(vector, Vector):
+            vector = vector.coordinates
+        return (self._matrix @ numpy.asarray(vector, dtype=float)).tolist()
+
     @cached_property
     def inverse(self) -> Orientation:
-        return Orientation(self.r.inv())
+        x, y, z, w = self.q.tolist()
+        return Orientation._fromQuat((-x, -y, -z, w))
 
     @cached_property
     def _inverseRotation(self):
-        return self.r.inv()
+        return self.inverse.r
 
     # will be converted to a distributionMethod after the class definition
     def __mul__(self, other) -> Orientation:
@@ -342,7 +506,7 @@ class Orientation:
             return other
         if other == globalOrientation:
             return self
-        return Orientation(self.r * other.r)
+        return Orientation._fromQuat(_quatMultiply(self.q.tolist(), other.q.tolist()))
 
     @distributionMethod
     def __add__(self, other) -> Orientation:
@@ -382,13 +546,14 @@ class Orientation:
 
         Equivalent to `localAnglesFor` but takes Euler angles as input.
         """
-        orientation = Orientation.fromEuler(yaw, pitch, roll)
+        orientation = Orientation._fromEuler(yaw, pitch, roll)
         return self.localAnglesFor(orientation)
 
     def __eq__(self, other):
         if not isinstance(other, Orientation):
             return NotImplemented
-        return numpy.array_equal(self.q, other.q) or numpy.array_equal(self.q, -other.q)
+        q, p = self.q.tolist(), other.q.tolist()
+        return q == p or q == [-c for c in p]
 
     def approxEq(self, other, tol=1e-10):
         if not isinstance(other, Orientation):
@@ -470,8 +635,7 @@ class Vector(Samplable, collections.abc.Sequence):
     def applyRotation(self, rotation):
         if not isinstance(rotation, Orientation):
             return TypeError("rotation must be an Orientation")
-        r = rotation.getRotation()
-        return Vector(*r.apply(self.coordinates))
+        return Vector(*rotation._rotate(self.coordinates))
 
     @vectorOperator
     def sphericalCoordinates(self):
@@ -498,8 +662,7 @@ class Vector(Samplable, collections.abc.Sequence):
     @vectorOperator
     def offsetLocally(self, orientation, offset) -> Vector:
         # Faster version of `offsetRotated` that only accepts Orientations.
-        r = orientation.getRotation()
-        ro = r.apply(offset)
+        ro = orientation._rotate(offset)
         x, y, z = self
         ox, oy, oz = ro
         return Vector(x + ox, y + oy, z + oz)
@@ -668,6 +831,255 @@ class OrientedVector(Vector):
         return hash((self.coordinates, self.heading))
 
 
+class OrientationArray(collections.abc.Sequence):
+    """An array of orientations, stored as an array of quaternions.
+
+    Provides the operations of `Orientation` (composition, inversion, and conversion
+    to and from Euler angles) on many orientations at once, using NumPy. This is much
+    faster than working with a list of `Orientation` objects, e.g. when a simulator
+    interface needs to convert the orientations of all objects at every time step.
+    Indexing an `OrientationArray` with an integer yields an `Orientation`.
+
+    Args:
+        quaternions: Array of shape (N, 4) of quaternions of the form (x, y, z, w).
+        normalize (bool): Whether to normalize the quaternions; pass `False` only if
+            they are already unit quaternions.
+    """
+
+    def __init__(self, quaternions, normalize=True):
+        q = numpy.array(quaternions, dtype=float)
+        if q.ndim != 2 or q.shape[1] != 4:
+            raise ValueError(f"expected array of shape (N, 4), got shape {q.shape}")
+        if normalize:
+            norms = numpy.sqrt(numpy.einsum("ij,ij->i", q, q))
+            if not numpy.all(norms > 0):
+                raise ValueError("quaternions must have nonzero norm")
+            q /= norms[:, numpy.newaxis]
+        self.q = q
+
+    @classmethod
+    def fromOrientations(cls, orientations) -> OrientationArray:
+        """Create an `OrientationArray` from an iterable of `Orientation` objects."""
+        q = [orientation.q for orientation in orientations]
+        return cls(numpy.array(q).reshape(-1, 4), normalize=False)
+
+    @classmethod
+    def fromEuler(cls, yaw, pitch, roll) -> OrientationArray:
+        """Create an `OrientationArray` from arrays of yaw, pitch, and roll angles.
+
+        The arrays are broadcast together, so scalars may be used for angles which
+        are the same for all orientations.
+        """
+        return cls(_quatFromEulerArray(yaw, pitch, roll), normalize=False)
+
+    @classmethod
+    def fromHeadings(cls, headings) -> OrientationArray:
+        """Create an `OrientationArray` from an array of headings (yaw angles)."""
+        headings = numpy.asarray(headings, dtype=float).reshape(-1)
+        q = numpy.zeros((len(headings), 4))
+        q[:, 2] = numpy.sin(headings / 2)
+        q[:, 3] = numpy.cos(headings / 2)
+        return cls(q, normalize=False)
+
+    @property
+    def eulerAngles(self) -> numpy.ndarray:
+        """Array of shape (N, 3) of global intrinsic Euler angles yaw, pitch, roll."""
+        return _eulerFromQuatArray(self.q)
+
+    @property
+    def inverse(self) -> OrientationArray:
+        q = self.q.copy()
+        q[:, :3] *= -1
+        return OrientationArray(q, normalize=False)
+
+    def __mul__(self, other) -> OrientationArray:
+        """Compose orientations elementwise, as for `Orientation.__mul__`.
+
+        The other operand may also be a single `Orientation`, which is composed with
+        every orientation of the array.
+        """
+        if isinstance(other, Orientation):
+            other = other.q[numpy.newaxis]
+        elif isinstance(other, OrientationArray):
+            other = other.q
+        else:
+            return NotImplemented
+        return OrientationArray(_quatMultiplyArray(self.q, other), normalize=False)
+
+    def __rmul__(self, other) -> OrientationArray:
+        if not isinstance(other, Orientation):
+            return NotImplemented
+        q = _quatMultiplyArray(other.q[numpy.newaxis], self.q)
+        return OrientationArray(q, normalize=False)
+
+    def localAnglesFor(self, orientations) -> numpy.ndarray:
+        """Get local Euler angles for orientations w.r.t. these orientations.
+
+        The elementwise equivalent of `Orientation.localAnglesFor`, returning an array
+        of shape (N, 3).
+        """
+        return (self.inverse * orientations).eulerAngles
+
+    def globalToLocalAngles(self, yaw, pitch, roll) -> numpy.ndarray:
+        """Convert global Euler angles to local angles w.r.t. these orientations.
+
+        The elementwise equivalent of `Orientation.globalToLocalAngles`, returning an
+        array of shape (N, 3).
+        """
+        return self.localAnglesFor(OrientationArray.fromEuler(yaw, pitch, roll))
+
+    def apply(self, vectors) -> VectorArray:
+        """Rotate vectors by these orientations (elementwise).
+
+        Args:
+            vectors: A `VectorArray`, a single `Vector`, or an array of shape (N, 3).
+        """
+        if isinstance(vectors, VectorArray):
+            vectors = vectors.coordinates
+        elif isinstance(vectors, Vector):
+            vectors = numpy.array(vectors.coordinates, dtype=float)
+        return VectorArray(_rotateArray(self.q, numpy.asarray(vectors, dtype=float)))
+
+    def approxEq(self, other, tol=1e-10) -> numpy.ndarray:
+        """Elementwise version of `Orientation.approxEq`, returning a boolean array."""
+        if isinstance(other, Orientation):
+            other = other.q[numpy.newaxis]
+        elif isinstance(other, OrientationArray):
+            other = other.q
+        else:
+            return NotImplemented
+        return (
+            numpy.abs(numpy.einsum("ij,ij->i", *numpy.broadcast_arrays(self.q, other)))
+            > 1 - tol
+        )
+
+    def __len__(self):
+        return len(self.q)
+
+    def __getitem__(self, index):
+        if isinstance(index, numbers.Integral):
+            return Orientation._fromQuat(self.q[index])
+        return OrientationArray(self.q[index], normalize=False)
+
+    def __repr__(self):
+        return f"OrientationArray({self.q.tolist()!r})"
+
+
+class VectorArray(collections.abc.Sequence):
+    """An array of vectors, stored as an array of coordinates.
+
+    Supports elementwise arithmetic with other `VectorArray` objects and with single
+    vectors, using NumPy. Indexing a `VectorArray` with an integer yields a `Vector`.
+
+    Args:
+        coordinates: Array of shape (N, 3), or (N, 2) for vectors with zero z
+            coordinate.
+    """
+
+    def __init__(self, coordinates):
+        coords = numpy.array(coordinates, dtype=float)
+        if coords.ndim == 2 and coords.shape[1] == 2:
+            coords = numpy.column_stack((coords, numpy.zeros(len(coords))))
+        if coords.ndim != 2 or coords.shape[1] != 3:
+            raise ValueError(f"expected array of shape (N, 3), got shape {coords.shape}")
+        self.coordinates = coords
+
+    @classmethod
+    def fromVectors(cls, vectors) -> VectorArray:
+        """Create a `VectorArray` from an iterable of `Vector` objects."""
+        coords = [vector.coordinates for vector in vectors]
+        return cls(numpy.array(coords, dtype=float).reshape(-1, 3))
+
+    @property
+    def x(self) -> numpy.ndarray:
+        return self.coordinates[:, 0]
+
+    @property
+    def y(self) -> numpy.ndarray:
+        return self.coordinates[:, 1]
+
+    @property
+    def z(self) -> numpy.ndarray:
+        return self.coordinates[:, 2]
+
+    @staticmethod
+    def _operand(other):
+        if isinstance(other, VectorArray):
+            return other.coordinates
+        if isinstance(other, Vector):
+            return numpy.array(other.coordinates, dtype=float)
+        return None
+
+    def __add__(self, other) -> VectorArray:
+        other = self._operand(other)
+        if other is None:
+            return NotImplemented
+        return VectorArray(self.coordinates + other)
+
+    def __sub__(self, other) -> VectorArray:
+        other = self._operand(other)
+        if other is None:
+            return NotImplemented
+        return VectorArray(self.coordinates - other)
+
+    def __mul__(self, other) -> VectorArray:
+        """Scale the vectors by a scalar, or elementwise by an array of scalars."""
+        if isinstance(other, (Vector, VectorArray, Orientation, OrientationArray)):
+            return NotImplemented
+        scale = numpy.asarray(other, dtype=float)
+        if scale.ndim == 1:
+            scale = scale[:, numpy.newaxis]
+        return VectorArray(self.coordinates * scale)
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> VectorArray:
+        return VectorArray(-self.coordinates)
+
+    def norms(self) -> numpy.ndarray:
+        """Array of the norms of the vectors."""
+        return numpy.linalg.norm(self.coordinates, axis=1)
+
+    def distancesTo(self, other) -> numpy.ndarray:
+        """Array of the distances to a `Vector`, or elementwise to a `VectorArray`."""
+        return (self - other).norms()
+
+    def dot(self, other) -> numpy.ndarray:
+        """Array of the dot products with a `Vector`, or elementwise with a `VectorArray`."""
+        other = self._operand(other)
+        return numpy.einsum("ij,ij->i", *numpy.broadcast_arrays(self.coordinates, other))
+
+    def rotatedBy(self, orientations) -> VectorArray:
+        """Rotate the vectors by an `Orientation`, or elementwise by an `OrientationArray`."""
+        if isinstance(orientations, Orientation):
+            orientations = OrientationArray(
+                orientations.q[numpy.newaxis], normalize=False
+            )
+        return orientations.apply(self)
+
+    def offsetLocally(self, orientations, offsets) -> VectorArray:
+        """Elementwise version of `Vector.offsetLocally`.
+
+        Args:
+            orientations: An `Orientation` or `OrientationArray`.
+            offsets: A `Vector` or `VectorArray` of offsets in local coordinates.
+        """
+        if isinstance(offsets, Vector):
+            offsets = VectorArray(numpy.array([offsets.coordinates], dtype=float))
+        return self + offsets.rotatedBy(orientations)
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def __getitem__(self, index):
+        if isinstance(index, numbers.Integral):
+            return Vector(*self.coordinates[index].tolist())
+        return VectorArray(self.coordinates[index])
+
+    def __repr__(self):
+        return f"VectorArray({self.coordinates.tolist()!r})"
+
+
 class VectorField:
     """A vector field, providing an orientation at every point.
 
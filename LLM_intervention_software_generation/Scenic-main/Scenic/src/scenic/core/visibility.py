@@ -1,7 +1,10 @@
 """Implementations of Scenic's visibility functions."""
 
+import collections
 import itertools
 import math
+import threading
+import weakref
 
 import numpy as np
 import trimesh
@@ -13,6 +16,167 @@ from scenic.core.vectors import Vector
 
 BATCH_SIZE = 128
 
+#: Number of recently-built `VisibilityEngine` instances kept for reuse.
+ENGINE_CACHE_SIZE = 4
+
+
+class VisibilityEngine:
+    """Acceleration structure for visibility checks against a fixed set of objects.
+
+    The meshes of all the objects are merged into a single mesh, so that rays can be
+    tested against every potential occluder with one intersection query (sharing one
+    bounding volume hierarchy). Queries may restrict which of the objects count as
+    occluders, so that one engine can serve visibility checks between different pairs
+    of objects in the same scene.
+
+    The engine also memoizes the results of `canSee`. Since it refers to the
+    occupied space of each object at the time it was built, and objects get new
+    occupied space regions whenever they change, results never become stale.
+
+    Engines only hold weak references to the occupied spaces of the objects, so that
+    the recently-built engines kept for reuse (see `forObjects`) do not keep the
+    objects of old scenes alive; engines whose objects have been freed are discarded.
+
+    Args:
+        objects: The `Object` instances which can occlude visibility.
+    """
+
+    _recentEngines = collections.deque(maxlen=ENGINE_CACHE_SIZE)
+    _lock = threading.Lock()
+
+    def __init__(self, objects):
+        regions = [obj.occupiedSpace for obj in objects]
+        self._regions = tuple(weakref.ref(region) for region in regions)
+        self._indices = {id(region): i for i, region in enumerate(regions)}
+        meshes = [region.mesh for region in regions]
+        if meshes:
+            self.mesh = trimesh.util.concatenate(meshes)
+            faceCounts = [len(mesh.faces) for mesh in meshes]
+            self.faceOwners = np.repeat(np.arange(len(meshes)), faceCounts)
+        else:
+            self.mesh = None
+            self.faceOwners = np.zeros(0, dtype=int)
+        self.memo = {}
+
+    @classmethod
+    def forObjects(cls, objects):
+        """Get an engine able to test occlusion by the given objects.
+
+        A recently-built engine is reused if it covers all of the objects.
+
+        Returns:
+            A pair ``(engine, occluders)``, where ``occluders`` is the mask to pass
+            to `occlusionDistances` to consider only the given objects.
+        """
+        regions = [obj.occupiedSpace for obj in objects]
+        with cls._lock:
+            for engine in tuple(cls._recentEngines):
+                if not engine.alive:
+                    cls._recentEngines.remove(engine)
+                    continue
+                occluders = engine.maskFor(regions)
+                if occluders is not None:
+                    return engine, occluders
+        engine = cls(objects)
+        with cls._lock:
+            cls._recentEngines.appendleft(engine)
+        return engine, np.ones(len(engine._regions), dtype=bool)
+
+    @property
+    def alive(self):
+        """Whether all the objects of this engine still exist."""
+        return all(ref() is not None for ref in self._regions)
+
+    def _index(self, region):
+        index = self._indices.get(id(region))
+        if index is None or self._regions[index]() is not region:
+            return None
+        return index
+
+    def maskFor(self, regions):
+        """Mask selecting the objects with the given occupied spaces, or None if not all are present."""
+        mask = np.zeros(len(self._regions), dtype=bool)
+        for region in regions:
+            index = self._index(region)
+            if index is None:
+                return None
+            mask[index] = True
+        return mask
+
+    def regionsFor(self, occluders):
+        """The occupied spaces of the (still existing) objects selected by a mask."""
+        regions = (ref() for ref, selected in zip(self._regions, occluders) if selected)
+        return [region for region in regions if region is not None]
+
+    def occlusionDistances(self, origin, directions, occluders, exclude=None):
+        """Find the distance along each ray to the nearest hit on an occluder.
+
+        Args:
+            origin: The common origin of the rays.
+            directions: An (n, 3) array of unit ray directions.
+            occluders: A boolean mask selecting which of the engine's objects
+              can occlude the rays.
+            exclude: An optional array of n indices of objects which cannot occlude
+              the corresponding ray (or -1 to exclude no object).
+
+        Returns:
+            An array of n distances, which are infinite for rays hitting no occluder.
+        """
+        directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+        distances = np.full(len(directions), np.inf)
+        if self.mesh is None or not np.any(occluders) or len(directions) == 0:
+            return distances
+
+        origin = np.asarray(origin, dtype=float)
+        locations, rayIndices, faceIndices = self.mesh.ray.intersects_location(
+            ray_origins=np.broadcast_to(origin, directions.shape),
+            ray_directions=directions,
+        )
+        if len(rayIndices) == 0:
+            return distances
+        owners = self.faceOwners[faceIndices]
+        relevant = occluders[owners]
+        if exclude is not None:
+            relevant &= owners != np.asarray(exclude)[rayIndices]
+        hitDistances = np.linalg.norm(locations[relevant] - origin, axis=1)
+        np.minimum.at(distances, rayIndices[relevant], hitDistances)
+        return distances
+
+    def indexOf(self, obj):
+        """Index of the given object in this engine, or -1 if it is not present."""
+        index = self._index(obj.occupiedSpace)
+        return -1 if index is None else index
+
+    def memoKey(self, viewer, target, occluders):
+        """Key identifying a visibility query for memoization."""
+        from scenic.core.object_types import Object
+
+        if isinstance(target, Object):
+            targetKey = weakref.ref(target.occupiedSpace)
+        else:
+            targetKey = toVector(target).coordinates
+        return (viewer, targetKey, occluders.tobytes())
+
+
+def _viewerKey(
+    position,
+    orientation,
+    visibleDistance,
+    viewAngles,
+    rayCount,
+    rayDensity,
+    distanceScaling,
+):
+    return (
+        position.coordinates,
+        None if orientation is None else tuple(orientation.q),
+        visibleDistance,
+        tuple(viewAngles),
+        None if rayCount is None else tuple(rayCount),
+        rayDensity,
+        distanceScaling,
+    )
+
 
 def canSee(
     position,
@@ -61,9 +225,10 @@ def canSee(
        the desired density in the intersection region. Keep all rays that intersect
        the object (candidate rays).
     6. If there are no candidate rays, the object is not visible.
-    7. For each occluding object in occludingObjects: check if any candidate rays
-       intersect the occluding object at a distance less than the distance they intersected
-       the target object. If they do, remove them from the candidate rays.
+    7. Check if any candidate rays intersect an occluding object at a distance less
+       than the distance they intersected the target object. If they do, remove them
+       from the candidate rays. All occluding objects are tested at once using a
+       `VisibilityEngine`.
     8. If any candidate rays remain, the object is visible. If not, it is occluded
        and not visible.
 
@@ -73,9 +238,12 @@ def canSee(
        If so, the point cannot be visible
     2. Create a single candidate ray, using the vector from the viewer to the target.
        If this ray is outside of the bounds of viewAngles, the point cannot be visible.
-    3. For each occluding object in occludingObjets: check if the candidate ray hits
-       the occluding object at a distance less than the distance from the viewer to the
-       target point. If so, then the object is not visible. Otherwise, the object is visible.
+    3. Check if the candidate ray hits any occluding object at a distance less than the
+       distance from the viewer to the target point. If so, then the object is not visible.
+       Otherwise, the object is visible.
+
+    Results are memoized, so repeating a query with the same viewer pose, target, and
+    occluding objects is cheap.
 
     Args:
         position: Position of the viewer, accounting for any offsets.
@@ -86,13 +254,192 @@ def canSee(
         target: The target being viewed. Currently supports Point, OrientedPoint, and Object.
         occludingObjects: An optional list of objects which can occlude the target.
     """
-    from scenic.core.object_types import Object, OrientedPoint, Point
+    # Filter occluding objects that are obviously infeasible
+    occludingObjects = [
+        obj for obj in occludingObjects if position.distanceTo(obj) <= visibleDistance
+    ]
+    engine, occluders = VisibilityEngine.forObjects(occludingObjects)
+    viewer = _viewerKey(
+        position,
+        orientation,
+        visibleDistance,
+        viewAngles,
+        rayCount,
+        rayDensity,
+        distanceScaling,
+    )
+    key = engine.memoKey(viewer, target, occluders)
+    if not debug and key in engine.memo:
+        return engine.memo[key]
+
+    result = _canSee(
+        position,
+        orientation,
+        visibleDistance,
+        viewAngles,
+        rayCount,
+        rayDensity,
+        distanceScaling,
+        target,
+        engine,
+        occluders,
+        debug=debug,
+    )
+    engine.memo[key] = result
+    return result
+
+
+def canSeeMany(
+    position,
+    orientation,
+    visibleDistance,
+    viewAngles,
+    rayCount,
+    rayDensity,
+    distanceScaling,
+    targets,
+    occludingObjects,
+):
+    """Perform visibility checks from a single viewer to many targets at once.
+
+    Equivalent to calling `canSee` for each target, except that the rays towards all of
+    the targets are tested for occlusion in batched intersection queries. A target
+    which is also one of the occluding objects is not considered to occlude itself.
+
+    Args:
+        targets: A sequence of targets, each a Point, OrientedPoint, or Object.
+
+    Other arguments are as for `canSee`.
+
+    Returns:
+        A list of booleans indicating whether each target is visible.
+    """
+    from scenic.core.object_types import Object
 
     # Filter occluding objects that are obviously infeasible
     occludingObjects = [
         obj for obj in occludingObjects if position.distanceTo(obj) <= visibleDistance
     ]
+    engine, occluders = VisibilityEngine.forObjects(occludingObjects)
+    viewer = _viewerKey(
+        position,
+        orientation,
+        visibleDistance,
+        viewAngles,
+        rayCount,
+        rayDensity,
+        distanceScaling,
+    )
+    exclusions = [
+        engine.indexOf(target) if isinstance(target, Object) else -1 for target in targets
+    ]
+    keys = []
+    for target, excluded in zip(targets, exclusions):
+        targetOccluders = occluders
+        if excluded >= 0 and occluders[excluded]:
+            targetOccluders = occluders.copy()
+            targetOccluders[excluded] = False
+        keys.append(engine.memoKey(viewer, target, targetOccluders))
+    results = [engine.memo.get(key) for key in keys]
+
+    # Gather the rays towards each target not already memoized, split into batches
+    # as in `canSee` so that visible targets can be dropped early
+    batches = {}
+    firstRound = {}
+    for i, target in enumerate(targets):
+        if results[i] is not None:
+            continue
+        results[i] = False
+
+        if isinstance(target, Object):
+            if target.distanceTo(position) > visibleDistance:
+                continue
 
+            if target.shape.containsCenter:
+                pointRay = _rayToPoint(
+                    position, orientation, visibleDistance, viewAngles, target.position
+                )
+                if pointRay is not None:
+                    firstRound[i] = ([pointRay[0]], [pointRay[1]])
+
+            targetRayCount, altitudeScaling = _rayCounts(
+                position, viewAngles, rayCount, rayDensity, distanceScaling, target
+            )
+            ray_vectors = _candidateRays(
+                position,
+                orientation,
+                viewAngles,
+                targetRayCount,
+                altitudeScaling,
+                target.occupiedSpace,
+            )
+            if ray_vectors is not None:
+                batches[i] = _rayBatches(ray_vectors)
+        else:
+            pointRay = _rayToPoint(
+                position, orientation, visibleDistance, viewAngles, target
+            )
+            if pointRay is not None:
+                firstRound[i] = ([pointRay[0]], [pointRay[1]])
+
+    # Test one batch of rays towards each undecided target per round, checking
+    # all of them for occlusion at once
+    while firstRound or batches:
+        rayLists, distanceLists, owners = [], [], []
+        for i, (rays, distances) in firstRound.items():
+            rayLists.append(rays)
+            distanceLists.append(distances)
+            owners.append(i)
+        firstRound = {}
+        for i, batchIterator in list(batches.items()):
+            ray_batch = next(batchIterator, None)
+            if ray_batch is None:
+                del batches[i]
+                continue
+            hitRays, hitDistances = _targetHits(
+                position, visibleDistance, ray_batch, targets[i].occupiedSpace
+            )
+            if len(hitRays) > 0:
+                rayLists.append(hitRays)
+                distanceLists.append(hitDistances)
+                owners.append(i)
+        if not rayLists:
+            continue
+
+        rays = np.concatenate(rayLists, axis=0)
+        targetDistances = np.concatenate(distanceLists)
+        rayCounts = [len(rayList) for rayList in rayLists]
+        exclude = np.repeat([exclusions[owner] for owner in owners], rayCounts)
+        occlusionDistances = engine.occlusionDistances(
+            position.coordinates, rays, occluders, exclude=exclude
+        )
+        clear = occlusionDistances > targetDistances
+        ends = np.cumsum(rayCounts)
+        for owner, clearRays in zip(owners, np.split(clear, ends[:-1])):
+            if np.any(clearRays):
+                results[owner] = True
+                batches.pop(owner, None)
+
+    for key, result in zip(keys, results):
+        engine.memo[key] = result
+    return results
+
+
+def _rayBatches(ray_vectors):
+    """Shuffle rays and split them into batches, generated lazily."""
+    ray_indices = np.arange(len(ray_vectors))
+    rng = np.random.default_rng(seed=42)
+    rng.shuffle(ray_indices)
+    for target_ray_indices in batched(ray_indices, BATCH_SIZE):
+        yield ray_vectors[np.asarray(target_ray_indices)]
+
+
+def _rayCounts(position, viewAngles, rayCount, rayDensity, distanceScaling, target):
+    """Compute the number of rays to cast in each dimension towards a target.
+
+    Returns:
+        A pair ``(rayCount, altitudeScaling)``.
+    """
     if rayCount is None:
         rayCount = (
             math.degrees(viewAngles[0]) * rayDensity,
@@ -104,253 +451,350 @@ def canSee(
 
             rayCount = (rayCount[0] * target_distance, rayCount[1] * target_distance)
 
-        altitudeScaling = True
+        return rayCount, True
     else:
         # Do not scale ray counts with altitude or distance if explicitly given
-        altitudeScaling = False
+        return rayCount, False
 
-    if isinstance(target, (Region, Object)):
-        # Extract the target region from the object or region.
-        if isinstance(target, Region):
-            raise NotImplementedError
-        elif isinstance(target, Object):
-            # If the object contains its center and we can see the center, the object
-            # is visible.
-            if target.shape.containsCenter and canSee(
-                position,
-                orientation,
-                visibleDistance,
-                viewAngles,
-                rayCount,
-                rayDensity,
-                distanceScaling,
-                target.position,
-                occludingObjects,
-            ):
-                return True
-            target_region = target.occupiedSpace
 
-        # Check that the distance to the target is not greater than visibleDistance,
-        if target.distanceTo(position) > visibleDistance:
-            return False
+def _candidateRays(
+    position, orientation, viewAngles, rayCount, altitudeScaling, target_region
+):
+    """Compute the rays which could hit a target region, as an array of unit vectors.
 
-        # Orient the object so that it has the same relative position and orientation to the
-        # origin as it did to the viewer
-        target_vertices = target_region.mesh.vertices - np.array(position.coordinates)
-
-        if orientation is not None:
-            target_vertices = orientation._inverseRotation.apply(target_vertices)
-
-        # Add additional points along each edge that could potentially have a higher altitude
-        # than the endpoints.
-        vec_1s = np.asarray(target_vertices[target_region.mesh.edges[:, 0], :])
-        vec_2s = np.asarray(target_vertices[target_region.mesh.edges[:, 1], :])
-        x1, y1, z1 = vec_1s[:, 0], vec_1s[:, 1], vec_1s[:, 2]
-        x2, y2, z2 = vec_2s[:, 0], vec_2s[:, 1], vec_2s[:, 2]
-        D = x1 * x2 + y1 * y2
-        N = (x1**2 + y1**2) * z2 - D * z1
-        M = (x2**2 + y2**2) * z1 - D * z2
-        with np.errstate(divide="ignore", invalid="ignore"):
-            t_vals = N / (N + M)  # t values that can be an altitude local optimum
-
-        # Keep only points where the t_value is between 0 and 1
-        t_mask = np.logical_and(t_vals > 0, t_vals < 1)
-        interpolated_points = vec_1s[t_mask] + t_vals[t_mask][:, None] * (
-            vec_2s[t_mask] - vec_1s[t_mask]
+    Returns None if no ray within the view angles can hit the region.
+    """
+    # Orient the object so that it has the same relative position and orientation to the
+    # origin as it did to the viewer
+    target_vertices = target_region.mesh.vertices - np.array(position.coordinates)
+
+    if orientation is not None:
+        target_vertices = orientation._inverseRotation.apply(target_vertices)
+
+    # Add additional points along each edge that could potentially have a higher altitude
+    # than the endpoints.
+    vec_1s = np.asarray(target_vertices[target_region.mesh.edges[:, 0], :])
+    vec_2s = np.asarray(target_vertices[target_region.mesh.edges[:, 1], :])
+    x1, y1, z1 = vec_1s[:, 0], vec_1s[:, 1], vec_1s[:, 2]
+    x2, y2, z2 = vec_2s[:, 0], vec_2s[:, 1], vec_2s[:, 2]
+    D = x1 * x2 + y1 * y2
+    N = (x1**2 + y1**2) * z2 - D * z1
+    M = (x2**2 + y2**2) * z1 - D * z2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_vals = N / (N + M)  # t values that can be an altitude local optimum
+
+    # Keep only points where the t_value is between 0 and 1
+    t_mask = np.logical_and(t_vals > 0, t_vals < 1)
+    interpolated_points = vec_1s[t_mask] + t_vals[t_mask][:, None] * (
+        vec_2s[t_mask] - vec_1s[t_mask]
+    )
+
+    target_vertices = np.concatenate((target_vertices, interpolated_points), axis=0)
+
+    ## Check if the object crosses the y axis ahead and/or behind the viewer
+
+    # Extract the two vectors that are part of each edge crossing the y axis.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y_cross_edges = (vec_1s[:, 0] / vec_2s[:, 0]) < 0
+    vec_1s = vec_1s[y_cross_edges]
+    vec_2s = vec_2s[y_cross_edges]
+
+    # Figure out for which t value the vectors cross the y axis
+    t = (-vec_1s[:, 0]) / (vec_2s[:, 0] - vec_1s[:, 0])
+
+    # Figure out what the y value is when the y axis is crossed
+    y_intercept_points = t * (vec_2s[:, 1] - vec_1s[:, 1]) + vec_1s[:, 1]
+
+    # If the object crosses ahead and behind the object, or through 0,
+    # we will not optimize ray casting.
+    target_crosses_ahead = np.any(y_intercept_points >= 0)
+    target_crosses_behind = np.any(y_intercept_points <= 0)
+
+    ## Compute the horizontal/vertical angle ranges which bound the object
+    ## (from the origin facing forwards)
+    spherical_angles = np.zeros((len(target_vertices[:, 0]), 2))
+
+    spherical_angles[:, 0] = np.arctan2(target_vertices[:, 1], target_vertices[:, 0])
+    spherical_angles[:, 1] = np.arcsin(
+        target_vertices[:, 2] / (np.linalg.norm(target_vertices, axis=1))
+    )
+
+    # Align azimuthal angle with y axis.
+    spherical_angles[:, 0] = spherical_angles[:, 0] - math.pi / 2
+
+    # Normalize angles between (-Pi,Pi)
+    spherical_angles[:, 0] = np.mod(spherical_angles[:, 0] + np.pi, 2 * np.pi) - np.pi
+    spherical_angles[:, 1] = np.mod(spherical_angles[:, 1] + np.pi, 2 * np.pi) - np.pi
+
+    # First we check if the vertical angles overlap with the vertical view angles.
+    # If not, then the object cannot be visible.
+    if (
+        np.min(spherical_angles[:, 1]) > viewAngles[1] / 2
+        or np.max(spherical_angles[:, 1]) < -viewAngles[1] / 2
+    ):
+        return None
+
+    ## Compute which horizontal/vertical angle ranges to cast rays in
+    if target_crosses_ahead and target_crosses_behind:
+        # No optimizations feasible here. Just send all rays.
+        h_range = (-viewAngles[0] / 2, viewAngles[0] / 2)
+        v_range = (-viewAngles[1] / 2, viewAngles[1] / 2)
+
+        view_ranges = [(h_range, v_range)]
+
+    elif target_crosses_behind:
+        # We can keep the view angles oriented around the front of the object and
+        # consider the spherical angles oriented around the back of the object.
+        # We can then check for impossible visibility/optimize which rays will be cast.
+
+        # Extract the viewAngle ranges
+        va_h_range = (-viewAngles[0] / 2, viewAngles[0] / 2)
+        va_v_range = (-viewAngles[1] / 2, viewAngles[1] / 2)
+
+        # Convert spherical angles to be centered around the back of the viewing object.
+        left_points = spherical_angles[:, 0] >= 0
+        right_points = spherical_angles[:, 0] < 0
+
+        spherical_angles[:, 0][left_points] = spherical_angles[:, 0][left_points] - np.pi
+        spherical_angles[:, 0][right_points] = (
+            spherical_angles[:, 0][right_points] + np.pi
         )
 
-        target_vertices = np.concatenate((target_vertices, interpolated_points), axis=0)
+        sphere_h_range = (
+            np.min(spherical_angles[:, 0]),
+            np.max(spherical_angles[:, 0]),
+        )
+        sphere_v_range = (
+            np.min(spherical_angles[:, 1]),
+            np.max(spherical_angles[:, 1]),
+        )
 
-        ## Check if the object crosses the y axis ahead and/or behind the viewer
+        # Extract the overlapping ranges in the horizontal and vertical view angles.
+        # Note that the spherical range must cross the back plane and the view angles
+        # must cross the front plane (and are centered on these points),
+        # which means we can just add up each side of the ranges and see if they add up to
+        # greater than or equal to Pi. If none do, then it's impossible for object to overlap
+        # with the viewAngle range.
+
+        # Otherwise we can extract the overlapping v_ranges and use those going forwards.
+        overlapping_v_range = (
+            np.clip(sphere_v_range[0], va_v_range[0], va_v_range[1]),
+            np.clip(sphere_v_range[1], va_v_range[0], va_v_range[1]),
+        )
+        view_ranges = []
 
-        # Extract the two vectors that are part of each edge crossing the y axis.
-        with np.errstate(divide="ignore", invalid="ignore"):
-            y_cross_edges = (vec_1s[:, 0] / vec_2s[:, 0]) < 0
-        vec_1s = vec_1s[y_cross_edges]
-        vec_2s = vec_2s[y_cross_edges]
+        if abs(va_h_range[0]) + abs(sphere_h_range[1]) > math.pi:
+            h_range = (va_h_range[0], -math.pi + sphere_h_range[1])
+            view_ranges.append((h_range, overlapping_v_range))
 
-        # Figure out for which t value the vectors cross the y axis
-        t = (-vec_1s[:, 0]) / (vec_2s[:, 0] - vec_1s[:, 0])
+        if abs(va_h_range[1]) + abs(sphere_h_range[0]) > math.pi:
+            h_range = (math.pi + sphere_h_range[0], va_h_range[1])
+            view_ranges.append((h_range, overlapping_v_range))
 
-        # Figure out what the y value is when the y axis is crossed
-        y_intercept_points = t * (vec_2s[:, 1] - vec_1s[:, 1]) + vec_1s[:, 1]
+        if len(view_ranges) == 0:
+            return None
 
-        # If the object crosses ahead and behind the object, or through 0,
-        # we will not optimize ray casting.
-        target_crosses_ahead = np.any(y_intercept_points >= 0)
-        target_crosses_behind = np.any(y_intercept_points <= 0)
+    else:
+        # We can immediately check for impossible visbility/optimize which rays
+        # will be cast.
 
-        ## Compute the horizontal/vertical angle ranges which bound the object
-        ## (from the origin facing forwards)
-        spherical_angles = np.zeros((len(target_vertices[:, 0]), 2))
+        # Check if view range and spherical angles overlap in horizontal or
+        # vertical dimensions. If not, return None
+        if (np.max(spherical_angles[:, 0]) < -viewAngles[0] / 2) or (
+            np.min(spherical_angles[:, 0]) > viewAngles[0] / 2
+        ):
+            return None
 
-        spherical_angles[:, 0] = np.arctan2(target_vertices[:, 1], target_vertices[:, 0])
-        spherical_angles[:, 1] = np.arcsin(
-            target_vertices[:, 2] / (np.linalg.norm(target_vertices, axis=1))
+        # Compute trimmed view angles
+        h_min = np.clip(
+            np.min(spherical_angles[:, 0]), -viewAngles[0] / 2, viewAngles[0] / 2
+        )
+        h_max = np.clip(
+            np.max(spherical_angles[:, 0]), -viewAngles[0] / 2, viewAngles[0] / 2
+        )
+        v_min = np.clip(
+            np.min(spherical_angles[:, 1]), -viewAngles[1] / 2, viewAngles[1] / 2
+        )
+        v_max = np.clip(
+            np.max(spherical_angles[:, 1]), -viewAngles[1] / 2, viewAngles[1] / 2
         )
 
-        # Align azimuthal angle with y axis.
-        spherical_angles[:, 0] = spherical_angles[:, 0] - math.pi / 2
-
-        # Normalize angles between (-Pi,Pi)
-        spherical_angles[:, 0] = np.mod(spherical_angles[:, 0] + np.pi, 2 * np.pi) - np.pi
-        spherical_angles[:, 1] = np.mod(spherical_angles[:, 1] + np.pi, 2 * np.pi) - np.pi
-
-        # First we check if the vertical angles overlap with the vertical view angles.
-        # If not, then the object cannot be visible.
-        if (
-            np.min(spherical_angles[:, 1]) > viewAngles[1] / 2
-            or np.max(spherical_angles[:, 1]) < -viewAngles[1] / 2
-        ):
-            return False
+        h_range = (h_min, h_max)
+        v_range = (v_min, v_max)
 
-        ## Compute which horizontal/vertical angle ranges to cast rays in
-        if target_crosses_ahead and target_crosses_behind:
-            # No optimizations feasible here. Just send all rays.
-            h_range = (-viewAngles[0] / 2, viewAngles[0] / 2)
-            v_range = (-viewAngles[1] / 2, viewAngles[1] / 2)
+        view_ranges = [(h_range, v_range)]
 
-            view_ranges = [(h_range, v_range)]
+    ## Generate candidate rays
+    candidate_ray_list = []
 
-        elif target_crosses_behind:
-            # We can keep the view angles oriented around the front of the object and
-            # consider the spherical angles oriented around the back of the object.
-            # We can then check for impossible visibility/optimize which rays will be cast.
+    for h_range, v_range in view_ranges:
+        h_size = h_range[1] - h_range[0]
+        v_size = v_range[1] - v_range[0]
 
-            # Extract the viewAngle ranges
-            va_h_range = (-viewAngles[0] / 2, viewAngles[0] / 2)
-            va_v_range = (-viewAngles[1] / 2, viewAngles[1] / 2)
+        assert h_size > 0
+        assert v_size > 0
 
-            # Convert spherical angles to be centered around the back of the viewing object.
-            left_points = spherical_angles[:, 0] >= 0
-            right_points = spherical_angles[:, 0] < 0
+        scaled_v_ray_count = math.ceil(v_size / (viewAngles[1]) * rayCount[1])
+        v_angles = np.linspace(v_range[0], v_range[1], scaled_v_ray_count)
 
-            spherical_angles[:, 0][left_points] = (
-                spherical_angles[:, 0][left_points] - np.pi
-            )
-            spherical_angles[:, 0][right_points] = (
-                spherical_angles[:, 0][right_points] + np.pi
+        # If altitudeScaling is true, we will scale the number of rays by the cosine of the altitude
+        # to get a uniform spread.
+        if altitudeScaling:
+            h_ray_counts = np.maximum(
+                np.ceil(np.cos(v_angles) * h_size / (viewAngles[0]) * rayCount[0]), 1
+            ).astype(int)
+            h_angles_list = [
+                np.linspace(h_range[0], h_range[1], h_ray_count)
+                for h_ray_count in h_ray_counts
+            ]
+            angle_matrices = [
+                np.column_stack(
+                    [
+                        h_angles_list[i],
+                        np.repeat([v_angles[i]], len(h_angles_list[i])),
+                    ]
+                )
+                for i in range(len(v_angles))
+            ]
+            angle_matrix = np.concatenate(angle_matrices, axis=0)
+        else:
+            scaled_h_ray_count = math.ceil(h_size / (viewAngles[0]) * rayCount[0])
+            h_angles = np.linspace(h_range[0], h_range[1], scaled_h_ray_count)
+            angle_matrix = np.column_stack(
+                [np.repeat(h_angles, len(v_angles)), np.tile(v_angles, len(h_angles))]
             )
 
-            sphere_h_range = (
-                np.min(spherical_angles[:, 0]),
-                np.max(spherical_angles[:, 0]),
-            )
-            sphere_v_range = (
-                np.min(spherical_angles[:, 1]),
-                np.max(spherical_angles[:, 1]),
-            )
+        ray_vectors = np.zeros((len(angle_matrix[:, 0]), 3))
 
-            # Extract the overlapping ranges in the horizontal and vertical view angles.
-            # Note that the spherical range must cross the back plane and the view angles
-            # must cross the front plane (and are centered on these points),
-            # which means we can just add up each side of the ranges and see if they add up to
-            # greater than or equal to Pi. If none do, then it's impossible for object to overlap
-            # with the viewAngle range.
-
-            # Otherwise we can extract the overlapping v_ranges and use those going forwards.
-            overlapping_v_range = (
-                np.clip(sphere_v_range[0], va_v_range[0], va_v_range[1]),
-                np.clip(sphere_v_range[1], va_v_range[0], va_v_range[1]),
-            )
-            view_ranges = []
+        ray_vectors[:, 0] = -np.sin(angle_matrix[:, 0])
+        ray_vectors[:, 1] = np.cos(angle_matrix[:, 0])
+        ray_vectors[:, 2] = np.tan(
+            angle_matrix[:, 1]
+        )  # At 90 deg, np returns super large number
 
-            if abs(va_h_range[0]) + abs(sphere_h_range[1]) > math.pi:
-                h_range = (va_h_range[0], -math.pi + sphere_h_range[1])
-                view_ranges.append((h_range, overlapping_v_range))
+        ray_vectors /= np.linalg.norm(ray_vectors, axis=1)[:, np.newaxis]
+        candidate_ray_list.append(ray_vectors)
 
-            if abs(va_h_range[1]) + abs(sphere_h_range[0]) > math.pi:
-                h_range = (math.pi + sphere_h_range[0], va_h_range[1])
-                view_ranges.append((h_range, overlapping_v_range))
+    ray_vectors = np.concatenate(candidate_ray_list, axis=0)
 
-            if len(view_ranges) == 0:
-                return False
+    if orientation is not None:
+        ray_vectors = orientation.getRotation().apply(ray_vectors)
 
-        else:
-            # We can immediately check for impossible visbility/optimize which rays
-            # will be cast.
+    return ray_vectors
 
-            # Check if view range and spherical angles overlap in horizontal or
-            # vertical dimensions. If not, return False
-            if (np.max(spherical_angles[:, 0]) < -viewAngles[0] / 2) or (
-                np.min(spherical_angles[:, 0]) > viewAngles[0] / 2
-            ):
-                return False
 
-            # Compute trimmed view angles
-            h_min = np.clip(
-                np.min(spherical_angles[:, 0]), -viewAngles[0] / 2, viewAngles[0] / 2
-            )
-            h_max = np.clip(
-                np.max(spherical_angles[:, 0]), -viewAngles[0] / 2, viewAngles[0] / 2
-            )
-            v_min = np.clip(
-                np.min(spherical_angles[:, 1]), -viewAngles[1] / 2, viewAngles[1] / 2
-            )
-            v_max = np.clip(
-                np.max(spherical_angles[:, 1]), -viewAngles[1] / 2, viewAngles[1] / 2
-            )
+def _targetHits(position, visibleDistance, ray_vectors, target_region):
+    """Find which rays hit a target region within the visible distance.
 
-            h_range = (h_min, h_max)
-            v_range = (v_min, v_max)
+    Returns:
+        A pair of arrays giving the rays which hit the target and the distances
+        at which they first hit it.
+    """
+    hit_locs, ray_indices, _ = target_region.mesh.ray.intersects_location(
+        ray_origins=np.full(ray_vectors.shape, position.coordinates),
+        ray_directions=ray_vectors,
+    )
+    if len(ray_indices) == 0:
+        return ray_vectors[:0], np.zeros(0)
+    hit_distances = np.linalg.norm(hit_locs - np.array(position), axis=1)
+    distances = np.full(len(ray_vectors), np.inf)
+    np.minimum.at(distances, ray_indices, hit_distances)
+    hit = distances <= visibleDistance
+    return ray_vectors[hit], distances[hit]
+
+
+def _rayToPoint(position, orientation, visibleDistance, viewAngles, target):
+    """Compute the ray from the viewer to a target point.
+
+    Returns:
+        A pair ``(ray, distance)`` giving the global direction of the ray and the
+        distance to the point, or None if the point is out of view.
+    """
+    target_loc = toVector(target)
 
-            view_ranges = [(h_range, v_range)]
+    # First check if the distance to the point is less than or equal to the visible distance. If not, the object cannot
+    # be visible.
+    target_distance = position.distanceTo(target_loc)
+    if target_distance > visibleDistance:
+        return None
 
-        ## Generate candidate rays
-        candidate_ray_list = []
+    # Create the single candidate ray and check that it's within viewAngles.
+    if orientation is not None:
+        target_loc = orientation._inverseRotation.apply([target_loc])[0]
 
-        for h_range, v_range in view_ranges:
-            h_size = h_range[1] - h_range[0]
-            v_size = v_range[1] - v_range[0]
+    target_vertex = target_loc - position
+    candidate_ray = target_vertex / np.linalg.norm(target_vertex)
 
-            assert h_size > 0
-            assert v_size > 0
+    azimuth = (
+        np.mod(
+            np.arctan2(candidate_ray[1], candidate_ray[0]) - math.pi / 2 + np.pi,
+            2 * np.pi,
+        )
+        - np.pi
+    )
+    altitude = np.arcsin(candidate_ray[2])
 
-            scaled_v_ray_count = math.ceil(v_size / (viewAngles[1]) * rayCount[1])
-            v_angles = np.linspace(v_range[0], v_range[1], scaled_v_ray_count)
+    # Check if this ray is within our view cone.
+    if not (-viewAngles[0] / 2 <= azimuth <= viewAngles[0] / 2) or not (
+        -viewAngles[1] / 2 <= altitude <= viewAngles[1] / 2
+    ):
+        return None
 
-            # If altitudeScaling is true, we will scale the number of rays by the cosine of the altitude
-            # to get a uniform spread.
-            if altitudeScaling:
-                h_ray_counts = np.maximum(
-                    np.ceil(np.cos(v_angles) * h_size / (viewAngles[0]) * rayCount[0]), 1
-                ).astype(int)
-                h_angles_list = [
-                    np.linspace(h_range[0], h_range[1], h_ray_count)
-                    for h_ray_count in h_ray_counts
-                ]
-                angle_matrices = [
-                    np.column_stack(
-                        [
-                            h_angles_list[i],
-                            np.repeat([v_angles[i]], len(h_angles_list[i])),
-                        ]
-                    )
-                    for i in range(len(v_angles))
-                ]
-                angle_matrix = np.concatenate(angle_matrices, axis=0)
-            else:
-                scaled_h_ray_count = math.ceil(h_size / (viewAngles[0]) * rayCount[0])
-                h_angles = np.linspace(h_range[0], h_range[1], scaled_h_ray_count)
-                angle_matrix = np.column_stack(
-                    [np.repeat(h_angles, len(v_angles)), np.tile(v_angles, len(h_angles))]
-                )
+    if orientation is not None:
+        candidate_ray = orientation.getRotation().apply([candidate_ray])[0]
 
-            ray_vectors = np.zeros((len(angle_matrix[:, 0]), 3))
+    return np.asarray(candidate_ray, dtype=float), target_distance
 
-            ray_vectors[:, 0] = -np.sin(angle_matrix[:, 0])
-            ray_vectors[:, 1] = np.cos(angle_matrix[:, 0])
-            ray_vectors[:, 2] = np.tan(
-                angle_matrix[:, 1]
-            )  # At 90 deg, np returns super large number
 
-            ray_vectors /= np.linalg.norm(ray_vectors, axis=1)[:, np.newaxis]
-            candidate_ray_list.append(ray_vectors)
+def _canSee(
+    position,
+    orientation,
+    visibleDistance,
+    viewAngles,
+    rayCount,
+    rayDensity,
+    distanceScaling,
+    target,
+    engine,
+    occluders,
+    debug=False,
+):
+    from scenic.core.object_types import Object, OrientedPoint, Point
+
+    if isinstance(target, (Region, Object)):
+        # Extract the target region from the object or region.
+        if isinstance(target, Region):
+            raise NotImplementedError
+        elif isinstance(target, Object):
+            # If the object contains its center and we can see the center, the object
+            # is visible.
+            if target.shape.containsCenter and _canSee(
+                position,
+                orientation,
+                visibleDistance,
+                viewAngles,
+                rayCount,
+                rayDensity,
+                distanceScaling,
+                target.position,
+                engine,
+                occluders,
+            ):
+                return True
+            target_region = target.occupiedSpace
 
-        ray_vectors = np.concatenate(candidate_ray_list, axis=0)
+        # Check that the distance to the target is not greater than visibleDistance,
+        if target.distanceTo(position) > visibleDistance:
+            return False
 
-        if orientation is not None:
-            ray_vectors = orientation.getRotation().apply(ray_vectors)
+        rayCount, altitudeScaling = _rayCounts(
+            position, viewAngles, rayCount, rayDensity, distanceScaling, target
+        )
+        ray_vectors = _candidateRays(
+            position, orientation, viewAngles, rayCount, altitudeScaling, target_region
+        )
+        if ray_vectors is None:
+            return False
 
         ## DEBUG ##
         # Show all original candidate rays
@@ -369,22 +813,13 @@ def canSee(
                 )
             )
             render_scene.add_geometry(target.occupiedSpace.mesh)
-            for i in list(occludingObjects):
-                render_scene.add_geometry(i.occupiedSpace.mesh)
+            for region in engine.regionsFor(occluders):
+                render_scene.add_geometry(region.mesh)
             render_scene.show()
 
         # Shuffle the rays and split them into smaller batches, so we get the
         # opportunity to return early.
-        ray_indices = np.arange(len(ray_vectors))
-        rng = np.random.default_rng(seed=42)
-        rng.shuffle(ray_indices)
-
-        batch_size = BATCH_SIZE
-
-        # Use a generator to avoid having to immediately split a large array
-        for target_ray_indices in batched(ray_indices, batch_size):
-            ray_batch = ray_vectors[np.asarray(target_ray_indices)]
-
+        for ray_batch in _rayBatches(ray_vectors):
             # Check if candidate rays hit target
             raw_target_hit_info = target_region.mesh.ray.intersects_location(
                 ray_origins=np.full(ray_batch.shape, position.coordinates),
@@ -442,122 +877,73 @@ def canSee(
                     )
                 )
                 render_scene.add_geometry(target.occupiedSpace.mesh)
-                for occ_obj in list(occludingObjects):
-                    render_scene.add_geometry(occ_obj.occupiedSpace.mesh)
+                for region in engine.regionsFor(occluders):
+                    render_scene.add_geometry(region.mesh)
                 render_scene.show()
 
-            for occ_obj in occludingObjects:
-                # If no more rays are candidates, then object is no longer visible.
-                # Short circuit the loop to get to the next batch of rays.
-                if len(candidate_rays) == 0:
-                    break
-
-                candidate_ray_list = np.array(list(candidate_rays))
-
-                # Test all candidate rays against this occluding object
-                object_hit_info = occ_obj.occupiedSpace.mesh.ray.intersects_location(
-                    ray_origins=np.full(candidate_ray_list.shape, position.coordinates),
-                    ray_directions=candidate_ray_list,
-                )
-
-                # If no hits, this object doesn't occlude. We don't need to
-                # filter any rays for this object so move on the next object.
-                if len(object_hit_info[0]) == 0:
-                    continue
-
-                # Check if any candidate ray hits the occluding object with a smaller
-                # distance than the target.
-                object_distances = np.linalg.norm(
-                    object_hit_info[0] - np.array(position), axis=1
-                )
-
-                occluded_rays = set()
-
-                for hit_iter in range(len(object_hit_info[0])):
-                    hit_ray = tuple(candidate_ray_list[object_hit_info[1][hit_iter]])
-                    hit_dist = object_distances[hit_iter]
-
-                    # If this ray hit the object earlier than it hit the target, reject the ray.
-                    if hit_dist <= target_dist_map[hit_ray]:
-                        occluded_rays.add(hit_ray)
-
-                candidate_rays = candidate_rays - occluded_rays
+            # Check if any candidate ray hits an occluding object with a smaller
+            # distance than the target.
+            candidate_ray_list = np.array(list(candidate_rays))
+            target_distances = np.array([target_dist_map[ray] for ray in candidate_rays])
+            occlusion_distances = engine.occlusionDistances(
+                position.coordinates, candidate_ray_list, occluders
+            )
+            clear = occlusion_distances > target_distances
 
-                ## DEBUG ##
-                # Show occluded and non occluded rays from this object
-                if debug:
-                    occluded_vertices = [
-                        visibleDistance * np.array(vec) + position.coordinates
-                        for vec in occluded_rays
-                    ]
-                    clear_vertices = [
-                        visibleDistance * np.array(vec) + position.coordinates
-                        for vec in candidate_rays
-                    ]
-                    vertices = occluded_vertices + clear_vertices
-                    vertices = [position.coordinates] + vertices
-                    lines = [
-                        trimesh.path.entities.Line([0, v])
-                        for v in range(1, len(vertices))
-                    ]
-                    occluded_colors = [(255, 0, 0, 255) for line in occluded_vertices]
-                    clear_colors = [(0, 255, 0, 255) for line in clear_vertices]
-                    colors = occluded_colors + clear_colors
-                    render_scene = trimesh.scene.Scene()
-                    render_scene.add_geometry(
-                        trimesh.path.Path3D(
-                            entities=lines,
-                            vertices=vertices,
-                            process=False,
-                            colors=colors,
-                        )
+            ## DEBUG ##
+            # Show occluded and non occluded rays
+            if debug:
+                occluded_vertices = [
+                    visibleDistance * np.array(vec) + position.coordinates
+                    for vec in candidate_ray_list[~clear]
+                ]
+                clear_vertices = [
+                    visibleDistance * np.array(vec) + position.coordinates
+                    for vec in candidate_ray_list[clear]
+                ]
+                vertices = occluded_vertices + clear_vertices
+                vertices = [position.coordinates] + vertices
+                lines = [
+                    trimesh.path.entities.Line([0, v]) for v in range(1, len(vertices))
+                ]
+                occluded_colors = [(255, 0, 0, 255) for line in occluded_vertices]
+                clear_colors = [(0, 255, 0, 255) for line in clear_vertices]
+                colors = occluded_colors + clear_colors
+                render_scene = trimesh.scene.Scene()
+                render_scene.add_geometry(
+                    trimesh.path.Path3D(
+                        entities=lines,
+                        vertices=vertices,
+                        process=False,
+                        colors=colors,
                     )
-                    render_scene.add_geometry(target.occupiedSpace.mesh)
-                    render_scene.add_geometry(occ_obj.occupiedSpace.mesh)
-                    render_scene.show()
+                )
+                render_scene.add_geometry(target.occupiedSpace.mesh)
+                for region in engine.regionsFor(occluders):
+                    render_scene.add_geometry(region.mesh)
+                render_scene.show()
 
-            if len(candidate_rays) > 0:
+            if np.any(clear):
                 return True
 
         # No rays hit the object and are not occluded, so the object is not visible
         return False
 
     elif isinstance(target, (Point, Vector)):
-        target_loc = toVector(target)
-
-        # First check if the distance to the point is less than or equal to the visible distance. If not, the object cannot
-        # be visible.
-        target_distance = position.distanceTo(target_loc)
-        if target_distance > visibleDistance:
+        pointRay = _rayToPoint(position, orientation, visibleDistance, viewAngles, target)
+        if pointRay is None:
             return False
-
-        # Create the single candidate ray and check that it's within viewAngles.
-        if orientation is not None:
-            target_loc = orientation._inverseRotation.apply([target_loc])[0]
-
-        target_vertex = target_loc - position
-        candidate_ray = target_vertex / np.linalg.norm(target_vertex)
-
-        candidate_ray_list = np.array([candidate_ray])
-
-        azimuth = (
-            np.mod(
-                np.arctan2(candidate_ray[1], candidate_ray[0]) - math.pi / 2 + np.pi,
-                2 * np.pi,
-            )
-            - np.pi
-        )
-        altitude = np.arcsin(candidate_ray[2])
+        candidate_ray, target_distance = pointRay
 
         ## DEBUG ##
-        # Show all original candidate rays
+        # Show the candidate ray
         if debug:
             vertices = [
-                visibleDistance * vec + position.coordinates for vec in candidate_ray_list
+                position.coordinates,
+                visibleDistance * candidate_ray + position.coordinates,
             ]
-            vertices = [position.coordinates] + vertices
-            lines = [trimesh.path.entities.Line([0, v]) for v in range(1, len(vertices))]
-            colors = [(0, 0, 255, 255) for line in lines]
+            lines = [trimesh.path.entities.Line([0, 1])]
+            colors = [(0, 0, 255, 255)]
 
             render_scene = trimesh.scene.Scene()
             render_scene.add_geometry(
@@ -565,40 +951,14 @@ def canSee(
                     entities=lines, vertices=vertices, process=False, colors=colors
                 )
             )
-            render_scene.add_geometry(
-                SpheroidRegion(position=target_loc, dimensions=(0.1, 0.1, 0.1))
-            )
-            for i in list(occludingObjects):
-                render_scene.add_geometry(i.occupiedSpace.mesh)
+            for region in engine.regionsFor(occluders):
+                render_scene.add_geometry(region.mesh)
             render_scene.show()
 
-        # Check if this ray is within our view cone.
-        if not (-viewAngles[0] / 2 <= azimuth <= viewAngles[0] / 2) or not (
-            -viewAngles[1] / 2 <= altitude <= viewAngles[1] / 2
-        ):
-            return False
-
         # Now check if occluding objects block sight to target
-        if orientation is not None:
-            candidate_ray_list = orientation.getRotation().apply(candidate_ray_list)
-
-        for occ_obj in occludingObjects:
-            # Test all candidate rays against this occluding object
-            object_hit_info = occ_obj.occupiedSpace.mesh.ray.intersects_location(
-                ray_origins=[position.coordinates for ray in candidate_ray_list],
-                ray_directions=candidate_ray_list,
-            )
-
-            for hit_iter in range(len(object_hit_info[0])):
-                ray = tuple(candidate_ray_list[object_hit_info[1][hit_iter]])
-                occ_distance = position.distanceTo(
-                    Vector(*object_hit_info[0][hit_iter, :])
-                )
-
-                if occ_distance <= target_distance:
-                    # The ray is occluded
-                    return False
-
-        return True
+        occlusion_distance = engine.occlusionDistances(
+            position.coordinates, [candidate_ray], occluders
+        )[0]
+        return bool(occlusion_distance > target_distance)
     else:
         assert False, target
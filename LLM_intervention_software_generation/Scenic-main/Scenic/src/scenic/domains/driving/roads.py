@@ -11,13 +11,15 @@ be created from a map file using :obj:`Network.fromFile`.
 
 from __future__ import annotations  # allow forward references for type annotations
 
+import collections
 import enum
-import gzip
 import hashlib
 import io
 import itertools
 import math
+import mmap
 import numbers
+import os
 import pathlib
 import pickle
 import struct
@@ -26,6 +28,7 @@ from typing import FrozenSet, List, Optional, Sequence, Tuple, Union
 import weakref
 
 import attr
+import numpy
 import shapely
 from shapely.geometry import MultiPolygon, Polygon
 
@@ -36,7 +39,7 @@ from scenic.core.distributions import (
 )
 import scenic.core.geometry as geometry
 from scenic.core.object_types import Point
-from scenic.core.regions import PolygonalRegion, PolylineRegion
+from scenic.core.regions import PolygonalRegion, PolylineRegion, Region
 import scenic.core.type_support as type_support
 import scenic.core.utils as utils
 from scenic.core.vectors import Orientation, Vector, VectorField
@@ -261,7 +264,24 @@ class NetworkElement(_ElementReferencer, PolygonalRegion):
         assert self.orientation, self
         return (self.orientation[_toVector(point)],)
 
+    def __getattr__(self, name):
+        # Elements of networks loaded from a cache start out empty, loading the rest of
+        # their attributes when one is first needed (see `Network.fromPickle`).
+        if name.startswith("__") or "_cacheIndex" not in self.__dict__:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+        self._loadFromCache()
+        return getattr(self, name)
+
+    def _loadFromCache(self):
+        index = self.__dict__["_cacheIndex"]
+        self.__dict__.update(self.network._cache.loadElement(index))
+        del self.__dict__["_cacheIndex"]
+
     def __getstate__(self):
+        if "_cacheIndex" in self.__dict__:
+            self._loadFromCache()
         state = super().__getstate__()
         del state["network"]  # do not pickle weak reference to parent network
         return state
@@ -570,6 +590,22 @@ class Lane(_ContainsCenterline, LinearElement):
         """Get the LaneSection passing through a given point."""
         return self.network.findPointIn(point, self.sections, reject)
 
+    @distributionFunction
+    def maneuverTowards(self, destination: Lane) -> Union[Maneuver, None]:
+        """Get the maneuver starting the shortest route from this lane to another.
+
+        Returns `None` if there is no route (see `Network.shortestRoute`), or if it
+        does not use any of this lane's maneuvers (e.g. if **destination** is this lane
+        or its successor).
+        """
+        route = self.network.shortestRoute(self, destination)
+        if route is None or len(route) < 2:
+            return None
+        for maneuver in self.maneuvers:
+            if (maneuver.connectingLane or maneuver.endLane).uid == route[1].uid:
+                return maneuver
+        return None
+
 
 @attr.s(auto_attribs=True, kw_only=True, repr=False, eq=False)
 class RoadSection(LinearElement):
@@ -831,6 +867,398 @@ class Signal:
         return self.type == "1000001"
 
 
+class LaneGraph:
+    """Compiled graph of the connections between the lanes of a `Network`.
+
+    Lanes are numbered as in `Network.lanes`. The lanes which can be entered from the end
+    of lane *i* (its successor, and the first lanes of its maneuvers) are stored in
+    compressed sparse row form: they are the lanes numbered ``targets[indptr[i]:indptr[i
+    + 1]]``. Moving from a lane to one of these costs the length of the lane's
+    centerline, so distances in the graph are measured from the start of one lane to the
+    start of another.
+
+    Shortest paths and reachable sets are computed with `scipy.sparse.csgraph` and
+    cached for the `maxCachedSearches` most recently used starting lanes. The graph of a
+    network is available as `Network.laneGraph`, and is used by `Network.shortestRoute`
+    and `Lane.maneuverTowards` (and hence by ``FollowLaneBehavior`` when given a
+    destination).
+    """
+
+    #: Maximum number of starting lanes whose searches are cached (each taking two
+    #: arrays with one entry per lane).
+    maxCachedSearches = 64
+
+    def __init__(self, lanes):
+        self.lanes = tuple(lanes)
+        indexForUid = {lane.uid: index for index, lane in enumerate(self.lanes)}
+        edges = set()
+        for index, lane in enumerate(self.lanes):
+            nextLanes = [] if lane._successor is None else [lane._successor]
+            for maneuver in lane.maneuvers:
+                nextLanes.append(maneuver.connectingLane or maneuver.endLane)
+            for nextLane in nextLanes:
+                target = indexForUid.get(nextLane.uid)
+                if target is not None:
+                    edges.add((index, target))
+        edges = numpy.array(sorted(edges), dtype=numpy.int64).reshape(-1, 2)
+        #: Length of the centerline of each lane.
+        self.lengths = numpy.array([lane.centerline.length for lane in self.lanes])
+        #: Row pointers of the adjacency structure (one more than the number of lanes).
+        self.indptr = numpy.searchsorted(edges[:, 0], numpy.arange(len(self.lanes) + 1))
+        #: Lanes which can be entered from the end of each lane.
+        self.targets = edges[:, 1]
+        self._searches = collections.OrderedDict()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_searches"] = collections.OrderedDict()  # searches can be recomputed
+        return state
+
+    @utils.cached_property
+    def _indexForUid(self):
+        return {lane.uid: index for index, lane in enumerate(self.lanes)}
+
+    @utils.cached_property
+    def _matrix(self):
+        import scipy.sparse
+
+        # Explicitly-stored zero weights would be ignored, so use a tiny positive cost
+        # for lanes with (nearly) zero length.
+        weights = numpy.maximum(self.lengths, 1e-9)
+        return scipy.sparse.csr_matrix(
+            (numpy.repeat(weights, numpy.diff(self.indptr)), self.targets, self.indptr),
+            shape=(len(self.lanes), len(self.lanes)),
+        )
+
+    def indexOf(self, lane: Lane) -> int:
+        """Get the index of a lane in the graph."""
+        return self._indexForUid[lane.uid]
+
+    def successorsOf(self, lane: Lane) -> Tuple[Lane]:
+        """Get the lanes which can be entered from the end of the given lane."""
+        index = self.indexOf(lane)
+        targets = self.targets[self.indptr[index] : self.indptr[index + 1]]
+        return tuple(self.lanes[target] for target in targets)
+
+    def _search(self, start):
+        index = self.indexOf(start)
+        search = self._searches.get(index)
+        if search is None:
+            from scipy.sparse.csgraph import dijkstra
+
+            search = dijkstra(self._matrix, indices=index, return_predecessors=True)
+            self._searches[index] = search
+            while len(self._searches) > self.maxCachedSearches:
+                self._searches.popitem(last=False)
+        else:
+            self._searches.move_to_end(index)
+        return search
+
+    def distancesFrom(self, start: Lane) -> numpy.ndarray:
+        """Get the distances from the start of a lane to the start of every lane.
+
+        Returns:
+            An array indexed like `Network.lanes`, with infinite distances for lanes
+            which cannot be reached.
+        """
+        return self._search(start)[0]
+
+    def distance(self, start: Lane, end: Lane) -> float:
+        """Get the distance along the shortest route from the start of one lane to
+        the start of another (infinite if there is no route)."""
+        return float(self.distancesFrom(start)[self.indexOf(end)])
+
+    def shortestPath(self, start: Lane, end: Lane) -> Union[Tuple[Lane], None]:
+        """Get the shortest route from one lane to another, as a sequence of lanes.
+
+        Returns:
+            The lanes along the route, including **start** and **end**, or `None` if
+            **end** cannot be reached from **start**.
+        """
+        distances, predecessors = self._search(start)
+        index = self.indexOf(end)
+        if not numpy.isfinite(distances[index]):
+            return None
+        path = [index]
+        while predecessors[index] >= 0:
+            index = predecessors[index]
+            path.append(index)
+        return tuple(self.lanes[index] for index in reversed(path))
+
+    def reachableFrom(self, start: Lane, maxDistance: float = math.inf) -> numpy.ndarray:
+        """Get the indices of the lanes which can be reached from a lane.
+
+        Only lanes whose starts are at most **maxDistance** from the start of **start**
+        are included (**start** itself is always included).
+        """
+        return numpy.flatnonzero(self.distancesFrom(start) <= maxDistance)
+
+    def isReachable(self, start: Lane, end: Lane) -> bool:
+        """Whether there is a route from one lane to another."""
+        return math.isfinite(self.distance(start, end))
+
+
+## Cached networks
+
+
+class _CachePickler(pickle.Pickler):
+    """Pickler storing links to network elements, maneuvers, and the network itself
+    as references, so that each part of a cached network can be loaded separately.
+
+    :meta private:
+    """
+
+    def __init__(self, file, network, indices, maneuverIndices):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.network = network
+        self.indices = indices
+        self.maneuverIndices = maneuverIndices
+
+    def persistent_id(self, obj):
+        if isinstance(obj, (NetworkElement, _ElementPlaceholder)):
+            return ("element", self.indices[obj.uid])
+        if isinstance(obj, Maneuver) and self.maneuverIndices is not None:
+            index = self.maneuverIndices.get(id(obj))
+            return None if index is None else ("maneuver", index)
+        if obj is self.network:
+            return ("network",)
+        return None
+
+
+class _CacheUnpickler(pickle.Unpickler):
+    """Unpickler resolving the references created by `_CachePickler`.
+
+    :meta private:
+    """
+
+    def __init__(self, file, cache):
+        super().__init__(file)
+        self.cache = cache
+
+    def persistent_load(self, pid):
+        kind = pid[0]
+        if kind == "element":
+            return self.cache.elements[pid[1]]
+        elif kind == "maneuver":
+            return self.cache.maneuvers[pid[1]]
+        elif kind == "network":
+            return self.cache.network
+        raise pickle.UnpicklingError(f"unknown reference {pid!r}")
+
+
+class _NetworkCache:
+    """A cached road network, memory-mapped from a file written by `Network.dumpPickle`.
+
+    The file consists of a header, a table giving the offset and length of each of a
+    sequence of blobs, and the blobs themselves: a directory describing the rest of
+    the file, the state of the `Network` object, one blob for each network element and
+    each lazily-loaded attribute of the network, the maneuvers, and the polygons of all
+    the elements in WKB form (with a flat array of their offsets) for building the
+    spatial index.
+
+    :meta private:
+    """
+
+    #: Format version, BLAKE2b digest of the original map, its size and modification
+    #: time (in nanoseconds), and the number of blobs.
+    header = struct.Struct("<I64sQqQ")
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty file
+                raise pickle.UnpicklingError(
+                    f"{Network.pickledExt} file is corrupted"
+                ) from e
+        if len(self.mmap) < 4:
+            raise pickle.UnpicklingError(f"{Network.pickledExt} file is corrupted")
+        (self.version,) = struct.unpack_from("<I", self.mmap)
+        if self.version != Network._currentFormatVersion():
+            raise pickle.UnpicklingError(
+                f"{Network.pickledExt} file is too old; "
+                "regenerate it from the original map"
+            )
+        try:
+            fields = self.header.unpack_from(self.mmap)
+            _, self.digest, self.originalSize, self.originalMtime, count = fields
+            self.blobs = numpy.frombuffer(
+                self.mmap, dtype="<u8", count=2 * count, offset=self.header.size
+            ).reshape(count, 2)
+        except (struct.error, ValueError) as e:
+            raise pickle.UnpicklingError(f"{Network.pickledExt} file is corrupted") from e
+        # Check that every blob lies within the file, after the table
+        starts, lengths = self.blobs[:, 0], self.blobs[:, 1]
+        tableEnd = self.header.size + self.blobs.nbytes
+        size = len(self.mmap)
+        if (
+            count == 0
+            or not numpy.all((tableEnd <= starts) & (starts <= size))
+            or not numpy.all(lengths <= size - starts)
+        ):
+            raise pickle.UnpicklingError(f"{Network.pickledExt} file is corrupted")
+
+    def _blob(self, index):
+        start, length = (int(field) for field in self.blobs[index])
+        return self.mmap[start : start + length]
+
+    def _load(self, index):
+        return _CacheUnpickler(io.BytesIO(self._blob(index)), self).load()
+
+    def _loadLazily(self, index, what):
+        try:
+            return self._load(index)
+        except Exception as e:
+            raise self._lazyLoadError(what, e) from e
+
+    def _lazyLoadError(self, what, error):
+        # Parts of the file loaded after `Network.fromPickle` has returned can no longer
+        # fall back to the original map, so explain how to regenerate the cache.
+        return pickle.UnpicklingError(
+            f"unable to load {what} from cached road network {self.path} "
+            f"({type(error).__name__}: {error}); delete the file so that it is "
+            "regenerated from the original map"
+        )
+
+    def load(self):
+        """Create the network, with placeholder elements to be filled in later."""
+        directory = pickle.loads(self._blob(0))
+        self.elementBlobs = directory["elementBlobs"]
+        self.attributeBlobs = directory["attributeBlobs"]
+        self.maneuverBlob = directory["maneuverBlob"]
+        self.polygonBlobs = directory["polygonBlobs"]
+        self._maneuvers = None
+        referenced = (
+            self.elementBlobs + len(directory["elements"]) - 1,
+            self.maneuverBlob,
+            directory["stateBlob"],
+            *self.attributeBlobs.values(),
+            *self.polygonBlobs,
+        )
+        if not all(0 <= index < len(self.blobs) for index in referenced):
+            raise pickle.UnpicklingError(f"{Network.pickledExt} file is corrupted")
+
+        self.network = network = Network.__new__(Network)
+        proxy = weakref.proxy(network)
+        self.elements = []
+        for index, (cls, uid) in enumerate(directory["elements"]):
+            elem = cls.__new__(cls)
+            elem.__dict__.update(uid=uid, network=proxy, _cacheIndex=index)
+            self.elements.append(elem)
+        network.__dict__.update(self._load(directory["stateBlob"]))
+        network._cache = self
+        network._lazyAttributes = set(self.attributeBlobs) | {"_rtree"}
+        return network
+
+    @property
+    def maneuvers(self):
+        if self._maneuvers is None:
+            self._maneuvers = self._loadLazily(self.maneuverBlob, "maneuvers")
+        return self._maneuvers
+
+    def loadElement(self, index):
+        """Get the state of the element with the given index."""
+        elem = self.elements[index]
+        what = f"{type(elem).__name__} {elem.uid!r}"
+        return self._loadLazily(self.elementBlobs + index, what)
+
+    def loadAttribute(self, name):
+        """Get the value of a lazily-loaded attribute of the network."""
+        if name == "_rtree":
+            wkbBlob, offsetBlob = self.polygonBlobs
+            offsets = numpy.frombuffer(self._blob(offsetBlob), dtype="<u8")
+            data = self._blob(wkbBlob)
+            wkbs = [data[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+            try:
+                geometries = shapely.from_wkb(wkbs)
+            except Exception as e:
+                raise self._lazyLoadError("spatial index", e) from e
+            return shapely.STRtree(geometries)
+        return self._loadLazily(self.attributeBlobs[name], f"attribute {name!r}")
+
+    @classmethod
+    def write(cls, network, path, digest, originalStat):
+        elements = tuple(network.elements.values())
+        indices = {elem.uid: index for index, elem in enumerate(elements)}
+        maneuvers, maneuverIndices = [], {}
+        for elem in itertools.chain(network.lanes, network.intersections):
+            for maneuver in elem.maneuvers:
+                if id(maneuver) not in maneuverIndices:
+                    maneuverIndices[id(maneuver)] = len(maneuvers)
+                    maneuvers.append(maneuver)
+
+        def dumps(obj, maneuverIndices=maneuverIndices):
+            stream = io.BytesIO()
+            _CachePickler(stream, network, indices, maneuverIndices).dump(obj)
+            return stream.getvalue()
+
+        network.laneGraph  # make sure the lane graph is cached as well
+        state = network.__dict__.copy()
+        del state["_rtree"]
+        attributes = {
+            name: value
+            for name, value in state.items()
+            if isinstance(value, (Region, VectorField, LaneGraph))
+        }
+        for name in attributes:
+            del state[name]
+        wkbs = shapely.to_wkb([elem.polygons for elem in elements])
+        offsets = numpy.cumsum([0] + [len(wkb) for wkb in wkbs], dtype="<u8")
+
+        blobs = [None, dumps(state), dumps(maneuvers, None)]
+        blobs.extend(dumps(value) for value in attributes.values())
+        blobs.extend((b"".join(wkbs), offsets.tobytes()))
+        elementBlobs = len(blobs)
+        blobs.extend(dumps(elem.__getstate__()) for elem in elements)
+        attributeBlobs = dict(zip(attributes, itertools.count(3)))
+        blobs[0] = pickle.dumps(
+            {
+                "elements": [(type(elem), elem.uid) for elem in elements],
+                "stateBlob": 1,
+                "maneuverBlob": 2,
+                "attributeBlobs": attributeBlobs,
+                "polygonBlobs": (3 + len(attributes), 4 + len(attributes)),
+                "elementBlobs": elementBlobs,
+            },
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+        if originalStat is None:
+            size, mtime = 0, 0
+        else:
+            size, mtime = originalStat.st_size, originalStat.st_mtime_ns
+        header = cls.header.pack(
+            Network._currentFormatVersion(), digest, size, mtime, len(blobs)
+        )
+        table = numpy.empty((len(blobs), 2), dtype="<u8")
+        offset = len(header) + table.nbytes
+        for row, blob in zip(table, blobs):
+            offset += -offset % 8  # align blobs to 8 bytes
+            row[:] = (offset, len(blob))
+            offset += len(blob)
+
+        # Write to a temporary file and then rename it, so that processes which have
+        # mapped an older version of the file are unaffected.
+        tempPath = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tempPath, "wb") as f:
+                f.write(header)
+                f.write(table.tobytes())
+                for (start, _), blob in zip(table, blobs):
+                    f.write(bytes(int(start) - f.tell()))
+                    f.write(blob)
+            os.replace(tempPath, path)
+        finally:
+            if tempPath.exists():
+                tempPath.unlink()
+
+
+def _fileDigest(path):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read()).digest()
+
+
 @attr.s(auto_attribs=True, kw_only=True, repr=False, eq=False)
 class Network:
     """Network()
@@ -957,6 +1385,29 @@ class Network:
         self._uidForIndex = tuple(self.elements)
         self._rtree = shapely.STRtree([elem.polygons for elem in self.elements.values()])
 
+    @property
+    def laneGraph(self) -> LaneGraph:
+        """The `LaneGraph` of this network, for fast routing between lanes.
+
+        It is built when first needed, and saved with the network by `dumpPickle`.
+        """
+        graph = getattr(self, "_laneGraph", None)
+        if graph is None:
+            graph = self._laneGraph = LaneGraph(self.lanes)
+        return graph
+
+    def shortestRoute(self, start: Lane, end: Lane) -> Union[Tuple[Lane], None]:
+        """Get the shortest route from one lane to another, as a sequence of lanes.
+
+        The route follows successors and maneuvers (including their connecting lanes),
+        and is found using the `laneGraph`.
+
+        Returns:
+            The lanes along the route, including **start** and **end**, or `None` if
+            **end** cannot be reached from **start**.
+        """
+        return self.laneGraph.shortestPath(start, end)
+
     def _defaultRoadDirection(self, point):
         """Default value for the `roadDirection` vector field.
 
@@ -981,7 +1432,7 @@ class Network:
 
         :meta private:
         """
-        return 33
+        return 34
 
     class DigestMismatchError(Exception):
         """Exception raised when loading a cached map not matching the original file."""
@@ -989,7 +1440,14 @@ class Network:
         pass
 
     @classmethod
-    def fromFile(cls, path, useCache: bool = True, writeCache: bool = True, **kwargs):
+    def fromFile(
+        cls,
+        path,
+        useCache: bool = True,
+        writeCache: bool = True,
+        verifyCache: bool = False,
+        **kwargs,
+    ):
         """Create a `Network` from a map file.
 
         This function calls an appropriate parsing routine based on the extension of the
@@ -1010,6 +1468,9 @@ class Network:
                 changes, the cached version will still not be used).
             writeCache: Whether to save a cached version of the processed map
                 after parsing has finished (default true).
+            verifyCache: Whether to always compare the hash of the map file with the
+                one recorded in the cached version. By default, the map file is only
+                hashed if its size or modification time differ from those recorded.
             kwargs: Additional keyword arguments specific to particular map formats.
 
         Raises:
@@ -1044,26 +1505,26 @@ class Network:
         if ext == cls.pickledExt:
             return cls.fromPickle(path)
 
-        # Otherwise, hash the underlying file to detect when the pickle is outdated
-        with open(path, "rb") as f:
-            data = f.read()
-        digest = hashlib.blake2b(data).digest()
-
-        # By default, use the pickled version if it exists and is not outdated
+        # By default, use the cached version if it exists and is not outdated
         pickledPath = path.with_suffix(cls.pickledExt)
         if useCache and pickledPath.exists():
             try:
-                return cls.fromPickle(pickledPath, originalDigest=digest)
+                return cls.fromPickle(
+                    pickledPath, originalPath=path, verifyDigest=verifyCache
+                )
             except pickle.UnpicklingError:
                 verbosePrint("Unable to load cached network (old format or corrupted).")
             except cls.DigestMismatchError:
                 verbosePrint("Cached network does not match original file; ignoring it.")
 
-        # Not using the pickled version; parse the original file based on its extension
+        # Not using the cached version; parse the original file based on its extension,
+        # hashing it so that we can detect when the cache is outdated
+        originalStat = path.stat()
+        digest = _fileDigest(path)
         network = handlers[ext](path, **kwargs)
         if writeCache:
             verbosePrint(f"Caching road network in {cls.pickledExt} file.")
-            network.dumpPickle(path.with_suffix(cls.pickledExt), digest)
+            network.dumpPickle(pickledPath, digest, originalStat=originalStat)
         return network
 
     @classmethod
@@ -1075,6 +1536,7 @@ class Network:
         fill_gaps: bool = True,
         fill_intersections: bool = True,
         elide_short_roads: bool = False,
+        workers: Optional[int] = None,
     ):
         """Create a `Network` from an OpenDRIVE file.
 
@@ -1088,6 +1550,8 @@ class Network:
                 intersections.
             elide_short_roads: Whether to attempt to fix geometry artifacts by
                 eliding roads with length less than **tolerance**.
+            workers: Number of processes to use to compute the geometry of the
+                roads in parallel (default 1). Useful for large maps.
         """
         import scenic.formats.opendrive.xodr_parser as xodr_parser
 
@@ -1100,49 +1564,92 @@ class Network:
         verbosePrint("Parsing OpenDRIVE file...")
         road_map.parse(path)
         verbosePrint("Computing road geometry... (this may take a while)")
-        road_map.calculate_geometry(ref_points, calc_gap=fill_gaps, calc_intersect=True)
+        road_map.calculate_geometry(
+            ref_points, calc_gap=fill_gaps, calc_intersect=True, workers=workers
+        )
         network = road_map.toScenicNetwork()
         totalTime = time.time() - startTime
         verbosePrint(f"Finished loading OpenDRIVE map in {totalTime:.2f} seconds.")
         return network
 
     @classmethod
-    def fromPickle(cls, path, originalDigest=None):
+    def fromPickle(cls, path, originalDigest=None, originalPath=None, verifyDigest=False):
+        """Load a network cached by `dumpPickle`.
+
+        The file is memory-mapped, so that processes loading the same network share its
+        pages. Network elements are created empty, and filled in from the file when
+        first used; the regions, vector fields, and spatial index of the network itself
+        are also loaded only when needed. If one of these turns out to be corrupted, a
+        `pickle.UnpicklingError` naming the file to delete is raised at that point.
+
+        Args:
+            path: Path to the cached network.
+            originalDigest: If given, the BLAKE2b digest the original map file must
+                have had for the cached network to be used.
+            originalPath: If given, path to the original map file. The cached network is
+                used only if the size and modification time of the file match those
+                recorded in the cache or, failing that, its digest does.
+            verifyDigest: Whether to check the digest of the file at **originalPath**
+                even if its size and modification time match.
+
+        Raises:
+            pickle.UnpicklingError: the cached network is corrupted or uses an old
+                format.
+            DigestMismatchError: the cached network does not match the original map.
+        """
         startTime = time.time()
         verbosePrint("Loading cached version of road network...")
 
-        with open(path, "rb") as f:
-            versionField = f.read(4)
-            if len(versionField) != 4:
-                raise pickle.UnpicklingError(f"{cls.pickledExt} file is corrupted")
-            version = struct.unpack("<I", versionField)
-            if version[0] != cls._currentFormatVersion():
-                raise pickle.UnpicklingError(
-                    f"{cls.pickledExt} file is too old; "
-                    "regenerate it from the original map"
-                )
-            digest = f.read(64)
-            if len(digest) != 64:
-                raise pickle.UnpicklingError(f"{cls.pickledExt} file is corrupted")
-            if originalDigest and originalDigest != digest:
-                raise cls.DigestMismatchError(
-                    f"{cls.pickledExt} file does not correspond to the original map; "
-                    " regenerate it"
-                )
-            with gzip.open(f) as gf:
-                try:
-                    network = pickle.load(gf)  # invokes __setstate__ below
-                except pickle.UnpicklingError:
-                    raise  # propagate unpickling errors
-                except Exception as e:
-                    # convert various other ways unpickling can fail into a more
-                    # standard exception
-                    raise pickle.UnpicklingError("unpickling failed") from e
+        cache = _NetworkCache(path)
+        if originalPath is not None and originalDigest is None:
+            stat = os.stat(originalPath)
+            if (
+                verifyDigest
+                or stat.st_size != cache.originalSize
+                or stat.st_mtime_ns != cache.originalMtime
+            ):
+                originalDigest = _fileDigest(originalPath)
+        if originalDigest is not None and originalDigest != cache.digest:
+            raise cls.DigestMismatchError(
+                f"{cls.pickledExt} file does not correspond to the original map; "
+                " regenerate it"
+            )
+        try:
+            network = cache.load()
+        except pickle.UnpicklingError:
+            raise  # propagate unpickling errors
+        except Exception as e:
+            # convert various other ways unpickling can fail into a more
+            # standard exception
+            raise pickle.UnpicklingError("unpickling failed") from e
 
         totalTime = time.time() - startTime
         verbosePrint(f"Loaded cached network in {totalTime:.2f} seconds.")
         return network
 
+    def __getattr__(self, name):
+        # Networks loaded from a cache load some attributes only when needed
+        lazy = self.__dict__.get("_lazyAttributes")
+        if not lazy or name not in lazy:
+            raise AttributeError(f"'Network' object has no attribute {name!r}")
+        value = self._cache.loadAttribute(name)
+        self.__dict__[name] = value
+        lazy.discard(name)
+        return value
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if "_cache" in state:
+            # Load everything remaining in the cache, which cannot itself be pickled
+            for name in tuple(self._lazyAttributes):
+                getattr(self, name)
+            for elem in self.elements.values():
+                if "_cacheIndex" in elem.__dict__:
+                    elem._loadFromCache()
+            state = self.__dict__.copy()
+            del state["_cache"], state["_lazyAttributes"]
+        return state
+
     def __setstate__(self, state):
         # Restore our attributes (default behavior when __setstate__ isn't defined)
         self.__dict__.update(state)
@@ -1162,17 +1669,22 @@ class Network:
             for maneuver in elem.maneuvers:
                 reconnect(maneuver)
 
-    def dumpPickle(self, path, digest):
+    def dumpPickle(self, path, digest, originalStat=None):
+        """Cache this network in a file, to be loaded by `fromPickle`.
+
+        Args:
+            path: Path of the file to write; the extension `pickledExt` is added if
+                there is none.
+            digest: BLAKE2b digest of the original map file.
+            originalStat: Result of `os.stat` on the original map file, if any, so that
+                `fromPickle` can detect changes to the file without hashing it.
+        """
         path = pathlib.Path(path)
         if not path.suffix:
             path = path.with_suffix(self.pickledExt)
-        version = struct.pack("<I", self._currentFormatVersion())
-        data = pickle.dumps(self)
-        with open(path, "wb") as f:
-            f.write(version)  # uncompressed in case we change compression schemes later
-            f.write(digest)  # uncompressed for quick lookup
-            with gzip.open(f, "wb") as gf:
-                gf.write(data)
+        if "_cache" in self.__dict__:
+            self.__getstate__()  # make sure everything is loaded
+        _NetworkCache.write(self, path, digest, originalStat)
 
     @distributionMethod
     def findPointIn(
@@ -1185,7 +1697,34 @@ class Network:
         are still no matches, we return None, unless **reject** is true, in which case we
         reject the current sample.
         """
-        point = shapely.geometry.Point(_toVector(point))
+        point = _toVector(point)
+        memo = self._pointQueryMemo
+        if memo is not None:
+            key = (id(elems), point.x, point.y)
+            entry = memo.get(key)
+            if entry is not None and entry[0] is elems:
+                elem = entry[1]
+            else:
+                if len(memo) >= self._pointQueryMemoSize:
+                    memo.clear()
+                elem = self._findPointIn(point, elems)
+                memo[key] = (elems, elem)
+        else:
+            elem = self._findPointIn(point, elems)
+        if elem is not None:
+            return elem
+
+        # No matches found.
+        if reject:
+            if isinstance(reject, str):
+                message = reject
+            else:
+                message = "requested element does not exist"
+            raise RejectionException(message)
+        return None
+
+    def _findPointIn(self, point, elems):
+        point = shapely.geometry.Point(point)
 
         def findElementWithin(distance):
             target = point if distance == 0 else point.buffer(distance)
@@ -1204,15 +1743,121 @@ class Network:
         # Second pass: check for elements within tolerance of the point.
         if self.tolerance > 0 and (elem := findElementWithin(self.tolerance)):
             return elem
+        return None
 
-        # No matches found.
-        if reject:
-            if isinstance(reject, str):
-                message = reject
+    #: Memo for `findPointIn`, if enabled by `memoizePointQueries`.
+    _pointQueryMemo = None
+    _pointQueryMemoSize = 0
+
+    def memoizePointQueries(self, maxSize=4096):
+        """Memoize the results of queries like `laneAt` for individual points.
+
+        This speeds up behaviors and requirements which repeatedly look up the lanes,
+        roads, etc. of agents during a time step. Since the network does not change,
+        results remain valid as long as they are kept; the memo is cleared whenever it
+        holds **maxSize** results. Passing 0 disables memoization.
+        """
+        self._pointQueryMemoSize = maxSize
+        self._pointQueryMemo = {} if maxSize > 0 else None
+
+    def _indicesIn(self, points, elems):
+        """Vectorized version of `findPointIn`, returning indices into **elems**."""
+        coords = numpy.asarray(points, dtype=float).reshape(-1, numpy.shape(points)[-1])
+        targets = shapely.points(coords[:, 0], coords[:, 1])
+        # rank of each element of the R-tree in elems, or len(elems) if not present
+        ranks = numpy.full(len(self._uidForIndex), len(elems))
+        ranks[self._treeIndicesOf(elems)] = numpy.arange(len(elems))
+        found = numpy.full(len(coords), len(elems))
+
+        def findElementsWithin(distance, which):
+            if distance != 0:
+                targets[which] = shapely.buffer(targets[which], distance)
+            pointIndices, treeIndices = self._rtree.query(
+                targets[which], predicate="intersects"
+            )
+            numpy.minimum.at(found, which[pointIndices], ranks[treeIndices])
+
+        # First pass: check for elements containing the points.
+        findElementsWithin(0, numpy.arange(len(coords)))
+
+        # Second pass: check for elements within tolerance of the remaining points.
+        missing = numpy.flatnonzero(found == len(elems))
+        if self.tolerance > 0 and len(missing) > 0:
+            findElementsWithin(self.tolerance, missing)
+
+        found[found == len(elems)] = -1
+        return found
+
+    def _treeIndicesOf(self, elems):
+        indices = self._treeIndexForUid
+        return numpy.fromiter((indices[elem.uid] for elem in elems), int, len(elems))
+
+    @utils.cached_property
+    def _treeIndexForUid(self):
+        return {uid: index for index, uid in enumerate(self._uidForIndex)}
+
+    def laneIndicesAt(self, points) -> numpy.ndarray:
+        """Vectorized version of `laneAt`.
+
+        Args:
+            points: Array of points, of shape (N, 2) or (N, 3).
+
+        Returns:
+            An array giving for each point the index in `lanes` of the lane passing
+            through it, or -1 if there is none.
+        """
+        return self._indicesIn(points, self.lanes)
+
+    def roadIndicesAt(self, points) -> numpy.ndarray:
+        """Vectorized version of `roadAt`, returning indices into `allRoads`.
+
+        See `laneIndicesAt` for details.
+        """
+        return self._indicesIn(points, self.allRoads)
+
+    def intersectionIndicesAt(self, points) -> numpy.ndarray:
+        """Vectorized version of `intersectionAt`, returning indices into `intersections`.
+
+        See `laneIndicesAt` for details.
+        """
+        return self._indicesIn(points, self.intersections)
+
+    def elementIndicesAt(self, points) -> numpy.ndarray:
+        """Vectorized version of `elementAt`.
+
+        Returns indices into the elements of `elements`, in order, or -1 where there
+        is no element. See `laneIndicesAt` for details.
+        """
+        intersections = self.intersectionIndicesAt(points)
+        roads = self.roadIndicesAt(points)
+        found = numpy.full(len(roads), -1)
+        inRoad, inIntersection = roads >= 0, intersections >= 0
+        found[inRoad] = self._treeIndicesOf(self.allRoads)[roads[inRoad]]
+        found[inIntersection] = self._treeIndicesOf(self.intersections)[
+            intersections[inIntersection]
+        ]
+        return found
+
+    def nominalDirectionsAtPoints(self, points) -> List[Tuple[Orientation]]:
+        """Get the nominal traffic directions at each of an array of points.
+
+        Equivalent to calling `nominalDirectionsAt` on each point, but finds the
+        intersections and roads containing the points all at once.
+        """
+        coords = numpy.asarray(points, dtype=float).reshape(-1, numpy.shape(points)[-1])
+        intersections = self.intersectionIndicesAt(coords)
+        roads = self.roadIndicesAt(coords)
+        directions = []
+        for point, inter, road in zip(coords, intersections, roads):
+            if inter >= 0:
+                elem = self.intersections[inter]
+            elif road >= 0:
+                elem = self.allRoads[road]
             else:
-                message = "requested element does not exist"
-            raise RejectionException(message)
-        return None
+                directions.append(())
+                continue
+            directions.append(elem.nominalDirectionsAt(Vector(*point)))
+        return directions
 
     def _findPointInAll(self, point, things, key=lambda e: e):
         point = _toVector(point)
@@ -4,12 +4,13 @@ import abc
 from collections import defaultdict
 import itertools
 import math
+import multiprocessing
 import warnings
 import xml.etree.ElementTree as ET
 
 import numpy as np
-from scipy.integrate import quad, solve_ivp
-from scipy.optimize import brentq
+from scipy.integrate import quad
+from scipy.special import fresnel
 from shapely.geometry import GeometryCollection, MultiPoint, MultiPolygon, Point, Polygon
 from shapely.ops import snap, unary_union
 
@@ -38,6 +39,33 @@ def buffer_union(polys, tolerance=0.01):
     return polygonUnion(polys, buf=tolerance, tolerance=tolerance)
 
 
+def parallel_buffer_union(polys, pool, tolerance=0.01, chunk_size=16):
+    """Equivalent of buffer_union using a process pool.
+
+    The polygons are merged in a tree: chunks of CHUNK_SIZE polygons are unioned in
+    parallel, then chunks of the results, and so on until few enough remain.
+    """
+    polys = list(polys)
+    if len(polys) <= chunk_size:
+        return buffer_union(polys, tolerance=tolerance)
+    buf = tolerance
+    while len(polys) > chunk_size:
+        chunks = [polys[i : i + chunk_size] for i in range(0, len(polys), chunk_size)]
+        polys = pool.starmap(_union_chunk, ((chunk, buf) for chunk in chunks))
+        buf = 0  # only buffer the original polygons
+    union = unary_union(polys).buffer(-tolerance)
+    assert union.is_valid, union
+    union = cleanPolygon(union, tolerance, holeTolerance=0.002)
+    assert union.is_valid, union
+    return union
+
+
+def _union_chunk(polys, buf):
+    if buf:
+        polys = [poly.buffer(buf) for poly in polys]
+    return unary_union([poly for poly in polys if not poly.is_empty])
+
+
 class Poly3:
     """Cubic polynomial."""
 
@@ -54,6 +82,46 @@ class Poly3:
         return self.b + 2 * self.c * x + 3 * self.d * x**2
 
 
+# Nodes and weights of the Gauss-Legendre rule used to integrate along curves.
+_GAUSS_NODES, _GAUSS_WEIGHTS = np.polynomial.legendre.leggauss(8)
+
+
+class _CumulativeIntegral:
+    """Integral of F (vectorized, possibly complex-valued) from 0 to any x in
+    [0, UPPER], computed from a table of the integral over SEGMENTS equal pieces."""
+
+    def __init__(self, f, upper, segments):
+        self.f = f
+        self.grid = np.linspace(0, upper, segments + 1)
+        self.table = np.concatenate(
+            ([0], np.cumsum(self._integrate(self.grid[:-1], self.grid[1:])))
+        )
+
+    def _integrate(self, lo, hi):
+        half = (hi - lo) / 2
+        mid = (hi + lo) / 2
+        nodes = mid[:, np.newaxis] + half[:, np.newaxis] * _GAUSS_NODES
+        return half * (self.f(nodes) @ _GAUSS_WEIGHTS)
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=float)
+        index = np.clip(np.searchsorted(self.grid, x) - 1, 0, len(self.grid) - 2)
+        start = self.grid[index]
+        return self.table[index] + self._integrate(start, x)
+
+
+def _invert_arclength(speed, upper, s, segments=64, iterations=3):
+    """Find parameters in [0, UPPER] at which a curve with the given (vectorized)
+    speed reaches the arc lengths S, using Newton's method from a tabulated guess."""
+    arclength = _CumulativeIntegral(speed, upper, segments)
+    t = np.interp(s, arclength.table, arclength.grid)
+    for _ in range(iterations):
+        error, rate = arclength(t) - s, speed(t)
+        step = np.divide(error, rate, out=np.zeros_like(error), where=rate > 0)
+        t = np.clip(t - step, 0, upper)
+    return t
+
+
 class Curve:
     """Geometric elements which compose road reference lines.
     See the OpenDRIVE Format Specification for coordinate system details."""
@@ -73,23 +141,28 @@ class Curve:
         extra_points are included if they are contained in the curve (unless
         they are extremely close to one of the equally-spaced points).
         """
-        s_vals = []
-        extras = itertools.chain(extra_points, itertools.repeat(float("inf")))
-        next_extra = next(extras)
-        last_s = 0
-        for s in np.linspace(0, self.length, num=num):
-            while next_extra <= s:
-                if last_s + 1e-6 < next_extra < s - 1e-6:
-                    s_vals.append(next_extra)
-                next_extra = next(extras)
-            s_vals.append(s)
-            last_s = s
-        return [self.point_at(s) for s in s_vals]
+        s_vals = np.linspace(0, self.length, num=num)
+        extras = np.asarray(extra_points, dtype=float)
+        if extras.size > 0:
+            # Keep extra points lying strictly between two consecutive samples.
+            after = np.searchsorted(s_vals, extras)
+            inside = (after > 0) & (after < len(s_vals))
+            extras, after = extras[inside], after[inside]
+            keep = (s_vals[after - 1] + 1e-6 < extras) & (extras < s_vals[after] - 1e-6)
+            s_vals = np.sort(np.concatenate((s_vals, extras[keep])))
+        x, y = self.points_at(s_vals)
+        return list(zip(x.tolist(), y.tolist(), s_vals.tolist()))
 
-    @abc.abstractmethod
     def point_at(self, s):
         """Get an (x, y, s) point along the curve at the given s coordinate."""
-        return
+        x, y = self.points_at(np.array([s], dtype=float))
+        return (float(x[0]), float(y[0]), s)
+
+    @abc.abstractmethod
+    def points_at(self, s):
+        """Get arrays of the absolute x and y coordinates of the points along the
+        curve at the s coordinates in the array S."""
+        raise NotImplementedError
 
     def rel_to_abs(self, point):
         """Convert from relative coordinates of curve to absolute coordinates.
@@ -101,6 +174,13 @@ class Curve:
             s,
         )
 
+    def rel_to_abs_array(self, x, y):
+        """Vectorized version of rel_to_abs, for arrays of x and y coordinates."""
+        return (
+            self.x0 + self.cos_hdg * x - self.sin_hdg * y,
+            self.y0 + self.sin_hdg * x + self.cos_hdg * y,
+        )
+
 
 class Cubic(Curve):
     """A curve defined by the cubic polynomial a + bu + cu^2 + du^3.
@@ -109,28 +189,18 @@ class Cubic(Curve):
     def __init__(self, x0, y0, hdg, length, a, b, c, d):
         super().__init__(x0, y0, hdg, length)
         self.poly = Poly3(a, b, c, d)
-        # Crude upper bound for u (used to bracket u for a given s in point_at)
-        if d != 0:
-            self.ubound = max(
-                2 * abs(c / d), abs(b / d) ** 0.5, (3 * length / abs(d)) ** (1 / 3)
-            )
-        elif c != 0:
-            self.ubound = max(abs(b / c), (2 * length / abs(c)) ** 0.5)
-        else:
-            self.ubound = length / abs(b)
+
+    def speed(self, u):
+        return np.sqrt(1 + self.poly.grad_at(u) ** 2)
 
     def arclength(self, u):
-        d_arc = lambda x: np.sqrt(1 + self.poly.grad_at(x) ** 2)
-        return quad(d_arc, 0, u)[0]
+        return quad(self.speed, 0, u)[0]
 
-    def point_at(self, s):
-        # Use Brent's method to find parameter u corresponding to arclength s;
-        # (N.B. Brent's method proved to be faster than Newton's and has no potential
-        # convergence issues.)
-        root_func = lambda x: self.arclength(x) - s
-        u = float(brentq(root_func, 0, self.ubound))
-        pt = (s, self.poly.eval_at(u), s)
-        return self.rel_to_abs(pt)
+    def points_at(self, s):
+        # Since the arc length from 0 to u is at least u, the parameter u
+        # corresponding to arc length s lies in [0, s].
+        u = _invert_arclength(self.speed, self.length, s)
+        return self.rel_to_abs_array(s, self.poly.eval_at(u))
 
 
 class ParamCubic(Curve):
@@ -146,21 +216,26 @@ class ParamCubic(Curve):
         self.v_poly = Poly3(av, bv, cv, dv)
         self.p_range = p_range if p_range else 1
 
+    def speed(self, p):
+        return np.hypot(self.u_poly.grad_at(p), self.v_poly.grad_at(p))
+
     def arclength(self, p):
-        d_arc = lambda x: math.hypot(self.u_poly.grad_at(x), self.v_poly.grad_at(x))
-        return quad(d_arc, 0, p)[0]
+        return quad(self.speed, 0, p)[0]
 
-    def point_at(self, s):
-        root_func = lambda x: self.arclength(x) - s
-        p = float(brentq(root_func, 0, self.p_range))
-        pt = (self.u_poly.eval_at(p), self.v_poly.eval_at(p), s)
-        return self.rel_to_abs(pt)
+    def points_at(self, s):
+        p = _invert_arclength(self.speed, self.p_range, s)
+        return self.rel_to_abs_array(self.u_poly.eval_at(p), self.v_poly.eval_at(p))
 
 
 class Clothoid(Curve):
     """An Euler spiral with curvature varying linearly between CURV0 and CURV1.
     The spiral starts at (X0, Y0) in direction HDG, with length LENGTH."""
 
+    #: Largest heading (in radians, measured from the point of zero curvature) for
+    #: which spirals are evaluated using Fresnel integrals; beyond it the integrals
+    #: lose precision, so the heading is integrated numerically instead.
+    max_fresnel_heading = 1e4
+
     def __init__(self, x0, y0, hdg, length, curv0, curv1):
         super().__init__(x0, y0, hdg, length)
         # Initial and final curvature.
@@ -169,34 +244,47 @@ class Clothoid(Curve):
         self.curve_rate = (curv1 - curv0) / length
         self.a = abs(curv0)
         self.r = 1 / self.a if curv0 != 0 else 1  # value not used if curv0 == 0
-        self.ode_init = np.array([x0, y0, hdg])
 
-    def point_at(self, s):
-        # Generate a origin-centered clothoid with zero curvature at origin,
-        # then translate/rotate the relevant segment.
+    def heading_at(self, s):
+        return self.hdg + self.curv0 * s + self.curve_rate * s**2 / 2
+
+    def points_at(self, s):
         # Arcs are just a degenerate clothoid:
         if self.curv0 == self.curv1:
             if self.curv0 == 0:
-                pt = (s, 0, s)
+                return self.rel_to_abs_array(s, 0 * s)
+            r = self.r
+            th = s * self.a
+            if self.curv0 > 0:
+                return self.rel_to_abs_array(r * np.sin(th), r - r * np.cos(th))
             else:
-                r = self.r
-                th = s * self.a
-                if self.curv0 > 0:
-                    pt = (r * math.sin(th), r - r * math.cos(th), s)
-                else:
-                    pt = (r * math.sin(th), -r + r * math.cos(th), s)
-            return self.rel_to_abs(pt)
+                return self.rel_to_abs_array(r * np.sin(th), -r + r * np.cos(th))
+
+        # Measure arc length from the point t0 (possibly outside the curve) where the
+        # curvature is zero, so that the heading is hdg0 + (rate / 2) * t^2 and the
+        # position is given by the Fresnel integrals of t scaled by sqrt(rate / pi).
+        rate = self.curve_rate
+        t0 = self.curv0 / rate
+        hdg0 = self.hdg - self.curv0 * t0 / 2
+        if (
+            abs(rate) * max(t0**2, (t0 + self.length) ** 2) / 2
+            <= self.max_fresnel_heading
+        ):
+            scale = math.sqrt(math.pi / abs(rate))
+            S0, C0 = fresnel(t0 / scale)
+            S, C = fresnel((s + t0) / scale)
+            offset = scale * ((C - C0) + 1j * math.copysign(1, rate) * (S - S0))
+            offset *= complex(math.cos(hdg0), math.sin(hdg0))
         else:
-
-            def clothoid_ode(s, state):
-                x, y, theta = state
-                return np.array(
-                    [math.cos(theta), math.sin(theta), self.curv0 + (self.curve_rate * s)]
-                )
-
-            sol = solve_ivp(clothoid_ode, (0, s), self.ode_init)
-            x, y, hdg = sol.y[:, -1]
-            return (x, y, s)
+            # The spiral is nearly an arc (the curvature changes very little relative
+            # to its size), so integrate its heading directly.
+            segments = math.ceil(max(abs(self.curv0), abs(self.curv1)) * self.length)
+            offset = _CumulativeIntegral(
+                lambda t: np.exp(1j * self.heading_at(t)),
+                self.length,
+                max(1, segments),
+            )(s)
+        return self.x0 + offset.real, self.y0 + offset.imag
 
 
 class Line(Curve):
@@ -208,8 +296,8 @@ class Line(Curve):
         self.x1 = x0 + length * math.cos(hdg)
         self.y1 = y0 + length * math.sin(hdg)
 
-    def point_at(self, s):
-        return self.rel_to_abs((s, 0, s))
+    def points_at(self, s):
+        return self.rel_to_abs_array(s, 0 * s)
 
 
 class Lane:
@@ -1127,6 +1215,19 @@ class SignalReference:
         return self.validity is None or self.validity != [0, 0]
 
 
+def _calculate_road_geometry(road, options):
+    road.calculate_geometry(**options)
+    return road
+
+
+def _junction_polygon(polys, tolerance, fill_intersections):
+    union = buffer_union(polys, tolerance=tolerance)
+    if fill_intersections:
+        union = removeHoles(union)
+    assert union.is_valid
+    return union
+
+
 class RoadMap:
     defaultTolerance = 0.05
 
@@ -1159,19 +1260,39 @@ class RoadMap:
         self.shoulder_lane_types = shoulder_lane_types
         self.elide_short_roads = elide_short_roads
 
-    def calculate_geometry(self, num, calc_gap=False, calc_intersect=True):
+    def calculate_geometry(self, num, calc_gap=False, calc_intersect=True, workers=None):
         # If calc_gap=True, fills in gaps between connected roads.
         # If calc_intersect=True, calculates intersection regions.
         # These are fairly expensive.
+        # If workers > 1, the geometry of each road is computed in a pool of that many
+        # processes, which are also used to merge the resulting polygons.
+        if workers is not None and workers > 1 and len(self.roads) > 1:
+            with multiprocessing.get_context().Pool(
+                min(workers, len(self.roads))
+            ) as pool:
+                self._calculate_geometry(num, calc_gap, calc_intersect, pool)
+        else:
+            self._calculate_geometry(num, calc_gap, calc_intersect, None)
+
+    def _calculate_geometry(self, num, calc_gap, calc_intersect, pool):
+        options = dict(
+            num=num,
+            calc_gap=calc_gap,
+            tolerance=self.tolerance,
+            drivable_lane_types=self.drivable_lane_types,
+            sidewalk_lane_types=self.sidewalk_lane_types,
+            shoulder_lane_types=self.shoulder_lane_types,
+        )
+        if pool is None:
+            for road in self.roads.values():
+                road.calculate_geometry(**options)
+        else:
+            # Roads are independent, and refer to each other (and to junctions) only
+            # by ID, so we can replace them with the copies computed by the workers.
+            tasks = ((road, options) for road in self.roads.values())
+            roads = pool.starmap(_calculate_road_geometry, tasks)
+            self.roads = {road.id_: road for road in roads}
         for road in self.roads.values():
-            road.calculate_geometry(
-                num,
-                calc_gap=calc_gap,
-                tolerance=self.tolerance,
-                drivable_lane_types=self.drivable_lane_types,
-                sidewalk_lane_types=self.sidewalk_lane_types,
-                shoulder_lane_types=self.shoulder_lane_types,
-            )
             self.sec_lane_polys.extend(road.sec_lane_polys)
             self.lane_polys.extend(road.lane_polys)
 
@@ -1242,25 +1363,31 @@ class RoadMap:
             sidewalk_polys = [road.sidewalk_region for road in self.roads.values()]
             shoulder_polys = [road.shoulder_region for road in self.roads.values()]
 
-        self.drivable_region = buffer_union(drivable_polys, tolerance=self.tolerance)
-        self.sidewalk_region = buffer_union(sidewalk_polys, tolerance=self.tolerance)
-        self.shoulder_region = buffer_union(shoulder_polys, tolerance=self.tolerance)
+        self.drivable_region = self._union(drivable_polys, pool)
+        self.sidewalk_region = self._union(sidewalk_polys, pool)
+        self.shoulder_region = self._union(shoulder_polys, pool)
 
         if calc_intersect:
-            self.calculate_intersections()
+            self.calculate_intersections(pool=pool)
+
+    def _union(self, polys, pool):
+        if pool is None:
+            return buffer_union(polys, tolerance=self.tolerance)
+        return parallel_buffer_union(polys, pool, tolerance=self.tolerance)
 
-    def calculate_intersections(self):
-        intersect_polys = []
+    def calculate_intersections(self, pool=None):
+        tasks = []
         for junc in self.junctions.values():
             junc_polys = [self.roads[i].drivable_region for i in junc.paths]
             assert junc_polys, junc
-            union = buffer_union(junc_polys, tolerance=self.tolerance)
-            if self.fill_intersections:
-                union = removeHoles(union)
-            assert union.is_valid
+            tasks.append((junc_polys, self.tolerance, self.fill_intersections))
+        if pool is None:
+            intersect_polys = list(itertools.starmap(_junction_polygon, tasks))
+        else:
+            intersect_polys = pool.starmap(_junction_polygon, tasks)
+        for junc, union in zip(self.junctions.values(), intersect_polys):
             junc.poly = union
-            intersect_polys.append(union)
-        self.intersection_region = buffer_union(intersect_polys, tolerance=self.tolerance)
+        self.intersection_region = self._union(intersect_polys, pool)
 
     def heading_at(self, point):
         """Return the road heading at point."""
@@ -0,0 +1,484 @@
+"""Long-running server keeping compiled scenarios resident between requests.
+
+Running ``python -m scenic`` pays the cost of importing Scenic and its dependencies,
+compiling the program, and connecting to the simulator every time. This module
+instead provides a `ScenarioServer` which does that work once and then answers
+requests over HTTP on the loopback interface. Start it with::
+
+    python -m scenic.server --port 8765 --preload scenic.simulators.newtonian
+
+Requests are ``POST`` requests to ``/generate``, ``/simulate``, or ``/replay`` whose
+bodies are JSON objects, sent with the ``Content-Type`` ``application/json``. All of
+them accept the following fields:
+
+* ``file`` (required): path to the Scenic file;
+* ``params``, ``model``, ``scenario``, ``mode2D``: as for `scenarioFromFile`;
+* ``seed``: optional random seed to use before handling the request.
+
+Compiled scenarios are kept in an LRU cache keyed by a hash of the file contents
+together with the compilation options, so editing a file causes it to be recompiled.
+Only the file named in the request is hashed: editing a Scenic or Python module it
+imports (e.g. its world model) does not cause it to be recompiled, so restart the
+server after doing so. Each cached scenario also keeps its simulator (created on the
+first simulation), so the connection to the simulator is reused. Scenes and
+simulations are exchanged using Scenic's serialization format (see
+:ref:`serialization`), encoded as base64.
+
+The server handles one request at a time. Anyone who can make requests to it can run
+any Scenic (and hence Python) program on the machine, so by default:
+
+* it only listens on the loopback interface (unless the ``--allow-remote`` option is
+  given);
+* requests whose ``Host`` header is not a loopback name or address with the server's
+  port are refused with status 403, so that web pages cannot reach the server by
+  rebinding their own host name to a loopback address (DNS rebinding);
+* requests with an ``Origin`` header naming a non-loopback host, i.e. coming from a
+  web page elsewhere, are refused with status 403;
+* requests with any ``Content-Type`` other than ``application/json`` are refused with
+  status 415, so that web pages cannot send "simple" cross-origin requests.
+
+These checks do not protect against other users of the same machine. For that, start
+the server with ``--token-file PATH``: it then writes a random token to the given
+file (readable only by the current user), and requests must include it in an
+``Authorization: Bearer <token>`` header, failing which they are refused with status
+401. Using a token is strongly recommended together with ``--allow-remote``, which
+disables the ``Host`` check.
+
+Invalid requests, including errors in the Scenic program, get responses with status
+400; internal errors get status 500.
+"""
+
+import argparse
+import base64
+import binascii
+import collections
+import hashlib
+import hmac
+import http.server
+import importlib
+import ipaddress
+import json
+import os
+import random
+import secrets
+import socket
+import sys
+import urllib.parse
+
+import numpy
+
+from scenic.core.distributions import RejectionException
+import scenic.core.errors as errors
+from scenic.core.serialization import SerializationError
+from scenic.syntax.translator import scenarioFromFile
+
+#: Default number of compiled scenarios kept by a `ScenarioServer`.
+DEFAULT_CACHE_SIZE = 16
+
+
+class BadRequestError(ValueError):
+    """Raised by `ScenarioServer.handle` for malformed requests."""
+
+
+class _CachedScenario:
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self._simulator = None
+
+    @property
+    def simulator(self):
+        if self._simulator is None:
+            self._simulator = self.scenario.getSimulator()
+        return self._simulator
+
+    def destroy(self):
+        if self._simulator is not None:
+            self._simulator.destroy()
+            self._simulator = None
+
+
+class ScenarioServer:
+    """Compiles, samples, and simulates scenarios, caching compiled scenarios.
+
+    Scenarios are cached by the contents of the file named in the request (and the
+    compilation options); modules imported by that file are not taken into account.
+
+    Args:
+        cacheSize (int): Maximum number of compiled scenarios to keep.
+        preload: Names of modules (e.g. simulator interfaces) to import immediately.
+    """
+
+    def __init__(self, cacheSize=DEFAULT_CACHE_SIZE, preload=()):
+        self.cacheSize = cacheSize
+        self._cache = collections.OrderedDict()
+        for name in preload:
+            importlib.import_module(name)
+
+    def scenarioFor(self, request):
+        """Get the compiled scenario for a request, compiling it if necessary."""
+        return self._entryFor(request).scenario
+
+    def _entryFor(self, request):
+        if not isinstance(request, dict) or "file" not in request:
+            raise BadRequestError("request must be an object with a 'file' field")
+        path = request["file"]
+        params = request.get("params", {})
+        model = request.get("model")
+        scenario = request.get("scenario")
+        mode2D = request.get("mode2D", False)
+        try:
+            with open(path, "rb") as stream:
+                digest = hashlib.blake2b(stream.read(), digest_size=16).hexdigest()
+        except (OSError, TypeError) as e:
+            raise BadRequestError(f"cannot read {path!r}: {e}") from e
+        key = (
+            os.path.realpath(path),
+            digest,
+            json.dumps(params, sort_keys=True),
+            model,
+            scenario,
+            mode2D,
+        )
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            return entry
+
+        entry = _CachedScenario(
+            scenarioFromFile(
+                path, params=params, model=model, scenario=scenario, mode2D=mode2D
+            )
+        )
+        self._cache[key] = entry
+        while len(self._cache) > self.cacheSize:
+            _, evicted = self._cache.popitem(last=False)
+            evicted.destroy()
+        return entry
+
+    def handle(self, command, request):
+        """Handle a request, returning a JSON-serializable response.
+
+        Args:
+            command (str): One of ``generate``, ``simulate``, or ``replay``.
+            request (dict): The fields of the request; see the module documentation.
+
+        Raises:
+            BadRequestError: if the request is malformed.
+        """
+        if command not in ("generate", "simulate", "replay"):
+            raise BadRequestError(f"unknown command {command!r}")
+        handler = getattr(self, f"_{command}")
+        entry = self._entryFor(request)
+        seed = _intField(request, "seed", None)
+        if seed is not None:
+            random.seed(seed)
+            numpy.random.seed(seed)
+        return handler(entry, request)
+
+    def _generate(self, entry, request):
+        """Sample scenes; accepts ``count`` (default 1) and ``maxIterations``."""
+        scenario = entry.scenario
+        scenes, iterations = scenario.generateBatch(
+            _intField(request, "count", 1),
+            maxIterations=_intField(request, "maxIterations", 2000),
+        )
+        return {
+            "scenes": [_encode(scenario.sceneToBytes(scene)) for scene in scenes],
+            "iterations": iterations,
+        }
+
+    def _simulate(self, entry, request):
+        """Run a simulation; accepts ``scene``, ``maxSteps``, and ``maxIterations``.
+
+        If no ``scene`` (as returned by ``generate``) is given, a new one is sampled.
+        """
+        scenario = entry.scenario
+        if "scene" in request:
+            scene = scenario.sceneFromBytes(_decodeField(request, "scene"))
+        else:
+            scene, _ = scenario.generate(
+                maxIterations=_intField(request, "sceneIterations", 2000)
+            )
+        simulation = entry.simulator.simulate(
+            scene,
+            maxSteps=_intField(request, "maxSteps", None),
+            maxIterations=_intField(request, "maxIterations", 1),
+        )
+        if simulation is None:
+            return {"simulation": None}
+        return {
+            "simulation": _encode(scenario.simulationToBytes(simulation)),
+            **_summarize(simulation),
+        }
+
+    def _replay(self, entry, request):
+        """Replay a simulation; accepts ``simulation`` and ``maxSteps``.
+
+        As for `Simulator.simulate`, the simulation continues past the end of the
+        replay data (without a time bound, if ``maxSteps`` is not given).
+        """
+        simulation = entry.scenario.simulationFromBytes(
+            _decodeField(request, "simulation"),
+            entry.simulator,
+            maxSteps=_intField(request, "maxSteps", None),
+        )
+        return _summarize(simulation)
+
+    def close(self):
+        """Destroy all cached simulators and forget the cached scenarios."""
+        for entry in self._cache.values():
+            entry.destroy()
+        self._cache.clear()
+
+
+def _encode(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _decode(data):
+    return base64.b64decode(data)
+
+
+def _intField(request, name, default):
+    """Get an optional integer field of a request (`None` only if **default** is)."""
+    value = request.get(name, default)
+    if value is None and default is None:
+        return None
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise BadRequestError(f"{name!r} must be an integer")
+    return value
+
+
+def _decodeField(request, name):
+    """Get a required base64-encoded field of a request."""
+    if name not in request:
+        raise BadRequestError(f"request must have a {name!r} field")
+    try:
+        return base64.b64decode(request[name], validate=True)
+    except (binascii.Error, TypeError) as e:
+        raise BadRequestError(f"{name!r} must be base64-encoded: {e}") from e
+
+
+def _summarize(simulation):
+    result = simulation.result
+    return {
+        "steps": len(result.trajectory) - 1,
+        "terminationType": result.terminationType.name,
+        "terminationReason": str(result.terminationReason),
+        "records": result.records,
+    }
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    server_version = "ScenicServer"
+
+    def do_POST(self):
+        refusal = self._refusal()
+        if refusal:
+            status, error = refusal
+            self._respond(status, {"error": error})
+            return
+        # Browsers send cross-origin requests of other types without asking first
+        if self.headers.get_content_type() != "application/json":
+            error = "requests must have Content-Type application/json"
+            self._respond(415, {"error": error})
+            return
+        command = self.path.strip("/")
+        try:
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError as e:
+                raise BadRequestError(f"malformed request: {e}") from e
+            response = self.server.scenarioServer.handle(command, request)
+            status = 200
+        except (
+            BadRequestError,
+            errors.ScenicError,
+            RejectionException,
+            SerializationError,
+        ) as e:
+            # The request (or the Scenic program it names) is invalid
+            response = {"error": f"{type(e).__name__}: {e}"}
+            status = 400
+        except Exception as e:
+            response = {"error": f"{type(e).__name__}: {e}"}
+            status = 500
+        self._respond(status, response)
+
+    def _refusal(self):
+        """Check where a request comes from, returning a status and error if refused."""
+        server = self.server
+        if server.token is not None:
+            expected = f"Bearer {server.token}".encode()
+            given = self.headers.get("Authorization", "").encode()
+            if not hmac.compare_digest(given, expected):
+                return 401, "missing or incorrect token"
+        # Pages loaded from a rebound host name send their own Host and Origin
+        if not server.allowRemote:
+            host = self.headers.get("Host", "")
+            try:
+                address = urllib.parse.urlsplit(f"//{host}")
+                hostname, port = address.hostname, address.port or 80
+            except ValueError:
+                hostname = None
+            if not hostname or not isLoopback(hostname) or port != server.server_port:
+                return 403, f"Host {host!r} is not this server's loopback address"
+        origin = self.headers.get("Origin")
+        if origin is not None:
+            try:
+                hostname = urllib.parse.urlsplit(origin).hostname
+            except ValueError:
+                hostname = None
+            if not hostname or not isLoopback(hostname):
+                return 403, f"cross-origin requests from {origin!r} are not allowed"
+        return None
+
+    def _respond(self, status, response):
+        body = json.dumps(response, default=repr).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if errors.verbosityLevel >= 2:
+            super().log_message(format, *args)
+
+
+class _IPv6HTTPServer(http.server.HTTPServer):
+    address_family = socket.AF_INET6
+
+
+def makeHTTPServer(
+    scenarioServer, host="127.0.0.1", port=0, allowRemote=False, token=None
+):
+    """Create an HTTP server answering requests using the given `ScenarioServer`.
+
+    The server is not started; call its ``serve_forever`` method to do so. Passing
+    port 0 chooses an arbitrary free port, available as ``server.server_address``.
+
+    Since anyone who can make requests to the server can run programs, a `ValueError`
+    is raised if **host** is not a loopback address, and requests not addressed to
+    the loopback interface are refused, unless **allowRemote** is true. If **token**
+    is given, requests must also include it in an ``Authorization: Bearer`` header.
+    """
+    if not allowRemote and not isLoopback(host):
+        raise ValueError(
+            f"refusing to serve on non-loopback address {host!r}, which would let "
+            "anyone on the network run Scenic programs on this machine"
+        )
+    try:
+        isIPv6 = ipaddress.ip_address(host).version == 6
+    except ValueError:
+        isIPv6 = False
+    serverClass = _IPv6HTTPServer if isIPv6 else http.server.HTTPServer
+    httpServer = serverClass((host, port), _RequestHandler)
+    httpServer.scenarioServer = scenarioServer
+    httpServer.allowRemote = allowRemote
+    httpServer.token = token
+    return httpServer
+
+
+def writeToken(path):
+    """Generate a random token for `makeHTTPServer`, saving it to the given file.
+
+    The file is created readable and writable only by the current user.
+    """
+    token = secrets.token_urlsafe(32)
+    if os.path.exists(path):
+        os.remove(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as stream:
+        stream.write(token)
+    return token
+
+
+def isLoopback(host):
+    """Whether a host name or address refers to the loopback interface."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m scenic.server",
+        description="Serve requests to sample and simulate Scenic scenarios.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help="allow listening on non-loopback addresses (INSECURE: no authentication)",
+    )
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument(
+        "--token-file",
+        metavar="PATH",
+        help="write a random token to this file, and require it in every request",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help=f"number of compiled scenarios to keep (default {DEFAULT_CACHE_SIZE})",
+    )
+    parser.add_argument(
+        "--preload",
+        action="append",
+        default=[],
+        metavar="MODULE",
+        help="module to import at startup (e.g. a simulator interface)",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbosity",
+        help="verbosity level (default 1)",
+        type=int,
+        choices=(0, 1, 2, 3),
+        default=1,
+    )
+    args = parser.parse_args(args)
+
+    errors.setDebuggingOptions(verbosity=args.verbosity)
+    if not isLoopback(args.host):
+        if not args.allow_remote:
+            parser.error(
+                f"refusing to listen on non-loopback address {args.host!r} "
+                "(use --allow-remote to override)"
+            )
+        if args.token_file is None:
+            print(
+                f"WARNING: listening on {args.host!r} without authentication; anyone "
+                "who can connect can run arbitrary Scenic programs on this machine "
+                "(use --token-file to require a token)",
+                file=sys.stderr,
+            )
+    token = None if args.token_file is None else writeToken(args.token_file)
+    scenarioServer = ScenarioServer(cacheSize=args.cache_size, preload=args.preload)
+    httpServer = makeHTTPServer(
+        scenarioServer,
+        args.host,
+        args.port,
+        allowRemote=args.allow_remote,
+        token=token,
+    )
+    if args.verbosity >= 1:
+        host, port = httpServer.server_address[:2]
+        print(f"Serving Scenic scenarios on http://{host}:{port}/")
+    try:
+        httpServer.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpServer.server_close()
+        scenarioServer.close()
+
+
+if __name__ == "__main__":
+    main()
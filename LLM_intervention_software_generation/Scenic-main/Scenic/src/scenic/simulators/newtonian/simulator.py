@@ -21,7 +21,7 @@ import shapely
 from scenic.core.geometry import allChains, findMinMax
 from scenic.core.regions import toPolygon
 from scenic.core.simulators import SimulationCreationError
-from scenic.core.vectors import Orientation, Vector
+from scenic.core.vectors import Orientation, Vector, globalOrientation
 from scenic.domains.driving.controllers import (
     PIDLateralController,
     PIDLongitudinalController,
@@ -51,6 +51,13 @@ class NewtonianSimulator(DrivingSimulator):
     Args:
         network (Network): road network to display in the background, if any.
         render (bool): whether to render the simulation in a window.
+        vectorized (bool): whether to advance all objects at once using NumPy arrays
+            rather than one at a time. This is much faster for scenes with many
+            objects, but may give results differing in the last few bits.
+        realtime (bool): whether to run the simulation in real time, i.e. wait
+            until ``timestep`` seconds have passed since the previous time step
+            before running the next one. If false, the simulation runs as fast as
+            possible. By default, simulations run in real time only when rendering.
 
     .. versionchanged:: 3.0
 
@@ -59,16 +66,33 @@ class NewtonianSimulator(DrivingSimulator):
         when not otherwise specified is still 0.1 seconds.
     """
 
-    def __init__(self, network=None, render=False, debug_render=False, export_gif=False):
+    def __init__(
+        self,
+        network=None,
+        render=False,
+        debug_render=False,
+        export_gif=False,
+        vectorized=False,
+        realtime=None,
+    ):
         super().__init__()
         self.export_gif = export_gif
         self.render = render
         self.debug_render = debug_render
         self.network = network
+        self.vectorized = vectorized
+        self.realtime = render if realtime is None else realtime
 
     def createSimulation(self, scene, **kwargs):
         simulation = NewtonianSimulation(
-            scene, self.network, self.render, self.export_gif, self.debug_render, **kwargs
+            scene,
+            self.network,
+            self.render,
+            self.export_gif,
+            self.debug_render,
+            vectorized=self.vectorized,
+            realtime=self.realtime,
+            **kwargs,
         )
         if self.export_gif and self.render:
             simulation.generate_gif("simulation.gif")
@@ -79,7 +103,16 @@ class NewtonianSimulation(DrivingSimulation):
     """Implementation of `Simulation` for the Newtonian simulator."""
 
     def __init__(
-        self, scene, network, render, export_gif, debug_render, timestep, **kwargs
+        self,
+        scene,
+        network,
+        render,
+        export_gif,
+        debug_render,
+        timestep,
+        vectorized=False,
+        realtime=None,
+        **kwargs,
     ):
         self.export_gif = export_gif
         self.render = render
@@ -87,6 +120,11 @@ class NewtonianSimulation(DrivingSimulation):
         self.screen = None
         self.frames = []
         self.debug_render = debug_render
+        self.vectorized = vectorized
+        self.realtime = render if realtime is None else realtime
+        self._lastStepTime = None
+        self._actors = None  # indices and parameters of actors, when vectorized
+        self._state = {}  # state computed by the last vectorized step
 
         if timestep is None:
             timestep = 0.1
@@ -194,6 +232,31 @@ class NewtonianSimulation(DrivingSimulation):
         return self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y
 
     def step(self):
+        if self.vectorized:
+            self.stepVectorized()
+        else:
+            self.stepObjects()
+
+        if self.render:
+            # Handle closing out pygame screen
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.destroy()
+                    return
+            self.draw_objects()
+            pygame.event.pump()
+
+        if self.realtime:
+            now = time.monotonic()
+            if self._lastStepTime is not None:
+                remaining = self._lastStepTime + self.timestep - now
+                if remaining > 0:
+                    time.sleep(remaining)
+                    now += remaining
+            self._lastStepTime = now
+
+    def stepObjects(self):
+        """Advance the objects in the simulation one at a time."""
         for obj in self.objects:
             current_speed = obj.velocity.norm()
             if hasattr(obj, "hand_brake"):
@@ -226,14 +289,98 @@ class NewtonianSimulation(DrivingSimulation):
             obj.position += obj.velocity * self.timestep
             obj.heading += obj.angularSpeed * self.timestep
 
-        if self.render:
-            # Handle closing out pygame screen
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.destroy()
-                    return
-            self.draw_objects()
-            pygame.event.pump()
+    def stepVectorized(self):
+        """Advance all objects in the simulation at once.
+
+        This implements the same dynamics as `stepObjects`, but using arrays holding
+        the states of all objects. The new states are kept in the arrays (rather than
+        being assigned to the objects) and read back by `getProperties` and
+        `getChangedProperties`.
+        """
+        objects = self.objects
+        dt = self.timestep
+        if self._actors is None or self._actors[0] != len(objects):
+            actors = [i for i, obj in enumerate(objects) if hasattr(obj, "hand_brake")]
+            lengths = np.array([objects[i].length for i in actors], dtype=float)
+            self._actors = (len(objects), np.array(actors, dtype=int), lengths)
+        _, actors, lengths = self._actors
+
+        position = np.array([obj.position.coordinates for obj in objects], dtype=float)
+        velocity = np.array([obj.velocity.coordinates for obj in objects], dtype=float)
+        heading = np.array([obj.heading for obj in objects], dtype=float)
+        angularSpeed = np.array([obj.angularSpeed for obj in objects], dtype=float)
+        speed = np.linalg.norm(velocity, axis=1)
+
+        newVelocity = velocity.copy()
+        newAngularSpeed = angularSpeed.copy()
+        newSpeed = speed.copy()
+        if len(actors) > 0:
+            throttle, steer, brake, handBrake, reverse = np.array(
+                [
+                    (obj.throttle, obj.steer, obj.brake, obj.hand_brake, obj.reverse)
+                    for obj in (objects[i] for i in actors)
+                ],
+                dtype=float,
+            ).T
+            sinH, cosH = np.sin(heading[actors]), np.cos(heading[actors])
+            v, s = velocity[actors], speed[actors]
+            forward = v[:, 0] * -sinH + v[:, 1] * cosH >= 0
+            signedSpeed = np.where(forward, s, -s)
+
+            braking = MAX_BRAKING * np.maximum(handBrake, brake) * dt
+            braked = np.where(
+                braking >= s,
+                0,
+                np.where(forward, signedSpeed - braking, signedSpeed + braking),
+            )
+            acceleration = throttle * MAX_ACCELERATION * np.where(reverse != 0, -1, 1)
+            accelerated = signedSpeed + acceleration * dt
+            signedSpeed = np.where((handBrake != 0) | (brake > 0), braked, accelerated)
+
+            newVelocity[actors] = np.stack(
+                (-sinH * signedSpeed, cosH * signedSpeed, np.zeros_like(signedSpeed)),
+                axis=1,
+            )
+            with np.errstate(divide="ignore"):
+                turningRadius = lengths / np.sin(steer * math.pi / 2)
+            newAngularSpeed[actors] = np.where(
+                steer != 0, -signedSpeed / turningRadius, 0
+            )
+            newSpeed[actors] = np.abs(signedSpeed)
+
+        newPosition = position + newVelocity * dt
+        newHeading = heading + newAngularSpeed * dt
+
+        # Objects whose state was not changed by this step or since the previous one
+        # (e.g. by actions) needn't be updated
+        previous = self._state
+        changed = (
+            np.any(newPosition != position, axis=1)
+            | np.any(newVelocity != velocity, axis=1)
+            | (newHeading != heading)
+            | (newAngularSpeed != angularSpeed)
+            | (newSpeed != np.array([obj.speed for obj in objects], dtype=float))
+        )
+        if previous.get("count") == len(objects):
+            changed |= np.any(position != previous["position"], axis=1)
+            changed |= np.any(velocity != previous["velocity"], axis=1)
+            changed |= (heading != previous["heading"]) | (
+                angularSpeed != previous["angularSpeed"]
+            )
+        else:
+            changed[:] = True
+
+        self._state = dict(
+            count=len(objects),
+            index={obj: i for i, obj in enumerate(objects)},
+            position=newPosition,
+            velocity=newVelocity,
+            heading=newHeading,
+            yaw=(newHeading + math.pi) % math.tau - math.pi,
+            angularSpeed=newAngularSpeed,
+            speed=newSpeed,
+            changed=changed,
+        )
 
     def draw_objects(self):
         self.screen.fill((255, 255, 255))
@@ -258,8 +405,6 @@ class NewtonianSimulation(DrivingSimulation):
             frame = np.transpose(frame, (1, 0, 2))
             self.frames.append(frame)
 
-        time.sleep(self.timestep)
-
     def draw_rect(self, obj, color):
         corners = [self.scenicToScreenVal(corner) for corner in obj._corners2D]
         pygame.draw.polygon(self.screen, color, corners)
@@ -278,6 +423,10 @@ class NewtonianSimulation(DrivingSimulation):
         imgs[0].save(filename, save_all=True, append_images=imgs[1:], duration=50, loop=0)
 
     def getProperties(self, obj, properties):
+        i = self._state.get("index", {}).get(obj)
+        if i is not None:
+            return self._vectorizedProperties(obj, i, properties)
+
         yaw, _, _ = obj.parentOrientation.globalToLocalAngles(obj.heading, 0, 0)
 
         values = dict(
@@ -294,6 +443,39 @@ class NewtonianSimulation(DrivingSimulation):
             values["elevation"] = obj.elevation
         return values
 
+    def getChangedProperties(self):
+        state = self._state
+        if not state:
+            return None
+        objects = self.objects
+        return {
+            objects[i]: self._vectorizedProperties(
+                objects[i], i, objects[i]._simulatorProvidedProperties
+            )
+            for i in np.flatnonzero(state["changed"])
+        }
+
+    def _vectorizedProperties(self, obj, i, properties):
+        state = self._state
+        if obj.parentOrientation is globalOrientation:
+            yaw = float(state["yaw"][i])
+        else:
+            heading = float(state["heading"][i])
+            yaw, _, _ = obj.parentOrientation.globalToLocalAngles(heading, 0, 0)
+        values = dict(
+            position=Vector(*state["position"][i].tolist()),
+            yaw=yaw,
+            pitch=0,
+            roll=0,
+            velocity=Vector(*state["velocity"][i].tolist()),
+            speed=float(state["speed"][i]),
+            angularSpeed=float(state["angularSpeed"][i]),
+            angularVelocity=obj.angularVelocity,
+        )
+        if "elevation" in properties:
+            values["elevation"] = obj.elevation
+        return values
+
     def destroy(self):
         if self.render:
             pygame.quit()
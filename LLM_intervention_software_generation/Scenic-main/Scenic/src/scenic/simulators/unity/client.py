@@ -4,10 +4,10 @@ from types import MappingProxyType
 import zmq
 import json
 from scenic.core.vectors import Vector
-from scenic.core.vectors import Orientation
+from scenic.core.vectors import Orientation, OrientationArray
+import numpy
 from numpy.linalg import norm
 from typing import Optional, Any, List, TypeVar, Type, cast, Callable
-from scipy.spatial.transform import Rotation
 import sys
 # Language: Python 3
 # Holds client information for Scenic Unity communication
@@ -243,20 +243,37 @@ class UnityMessageServer:
                 # self.destroy_all()
 
     def setupBasicProperties(self, gameObject, obj, player=False):
-        position = gameObject.position
         rotation = gameObject.rotation
-        velocity = gameObject.velocity
-        angularVelocity = gameObject.angularVelocity
-        speed = gameObject.speed
         if rotation[3] == 0:
             yaw, pitch, roll = 0, 0, 0
         else:
-            r = Rotation.from_quat(
-                [rotation[0], rotation[1], rotation[2], rotation[3]])
-            simOrientation = Orientation(r)
-            simYaw, simPitch, simRoll = simOrientation.eulerAngles   # global Euler angles
-            yaw, pitch, roll = obj.parentOrientation.globalToLocalAngles(
-                simYaw, simPitch, simRoll)   # local Euler angles
+            simOrientation = Orientation.fromQuaternion(rotation[:4])
+            # local Euler angles
+            yaw, pitch, roll = obj.parentOrientation.localAnglesFor(simOrientation)
+        return self.basicProperties(gameObject, yaw, pitch, roll, player)
+
+    def setupBasicPropertiesOfAll(self, entries):
+        # Like setupBasicProperties for a list of (gameObject, obj, player) triples,
+        # converting the orientations of all objects at once
+        rotations = numpy.array(
+            [gameObject.rotation[:4] for gameObject, _, _ in entries], dtype=float
+        ).reshape(-1, 4)
+        valid = rotations[:, 3] != 0
+        angles = numpy.zeros((len(entries), 3))
+        if numpy.any(valid):
+            parents = OrientationArray.fromOrientations(
+                obj.parentOrientation for (_, obj, _), v in zip(entries, valid) if v)
+            angles[valid] = parents.localAnglesFor(OrientationArray(rotations[valid]))
+        return [
+            self.basicProperties(gameObject, *angles[i].tolist(), player)
+            for i, (gameObject, _, player) in enumerate(entries)
+        ]
+
+    def basicProperties(self, gameObject, yaw, pitch, roll, player=False):
+        position = gameObject.position
+        velocity = gameObject.velocity
+        angularVelocity = gameObject.angularVelocity
+        speed = gameObject.speed
 
         if player:
             # print(gameObject.joint_angles.rightPalm,
@@ -306,6 +323,24 @@ class UnityMessageServer:
             object = self.ScenicObjects[int(obj.gameObject.tag)]
             return self.setupBasicProperties(object, obj, player=False)
 
+    def getPropertiesOfAll(self, objs):
+        """Read back the state of several objects, returning a dict of values for each."""
+        if len(self.ScenicPlayers) == 0:
+            self.terminate()
+            sys.exit(1)
+            return -1
+
+        scenicPlayerList = ["Scenicavatar"]
+        entries = []
+        for obj in objs:
+            if obj.gameObjectType in scenicPlayerList:
+                player = self.ScenicPlayers[int(obj.gameObject.tag)]
+                entries.append((player, obj, True))
+            else:
+                object = self.ScenicObjects[int(obj.gameObject.tag)]
+                entries.append((object, obj, False))
+        return dict(zip(objs, self.setupBasicPropertiesOfAll(entries)))
+
 
 class actionParameters:
     intVals: list
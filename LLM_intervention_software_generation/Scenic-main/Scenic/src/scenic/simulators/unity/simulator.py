@@ -65,6 +65,10 @@ class UnitySimulation(Simulation):
     def getProperties(self, obj, properties):
         values = self.client.getProperties(obj, properties)
         return values
+    def getChangedProperties(self):
+        # Unity sends the state of every object at every tick; read them all at once
+        # so that their orientations can be converted together
+        return self.client.getPropertiesOfAll(self.objects)
     def updateObjects(self):
         super().updateObjects()
 
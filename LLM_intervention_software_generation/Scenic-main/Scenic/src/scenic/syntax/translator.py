@@ -23,13 +23,17 @@ import ast
 import builtins
 from contextlib import contextmanager
 import dataclasses
+import functools
 import hashlib
 import importlib
 import importlib.abc
+import importlib.metadata
 import importlib.util
 import inspect
 import io
+import marshal
 import os
+import pickle
 import sys
 import time
 import types
@@ -274,6 +278,9 @@ def compileStream(stream, namespace, compileOptions, filename):
         3. Compile and execute the Python AST.
         4. Extract the global state (e.g. objects).
            This is done by the `storeScenarioStateIn` function.
+
+    Steps 1-2 and the compilation in step 3 are done by `compileSource`; their
+    results are cached on disk for Scenic files (see `bytecodeCacheLocation`).
     """
     if errors.verbosityLevel >= 2:
         veneer.verbosePrint(f"  Compiling Scenic module from {filename}...")
@@ -284,44 +291,22 @@ def compileStream(stream, namespace, compileOptions, filename):
         exec(compile(preamble, "<veneer>", "exec"), namespace)
         namespace[namespaceReference] = namespace
 
-        # Parse the source
+        # Translate the source into Python, reusing a cached translation if possible
         source = stream.read().decode("utf-8")
-        scenic_tree = parse_string(source, "exec", filename=filename)
-
-        if dumpScenicAST:
-            print(f"### Begin Scenic AST of {filename}")
-            print(dump(scenic_tree, include_attributes=False, indent=4))
-            print("### End Scenic AST")
-
-        # Compile the Scenic AST into a Python AST
-        tree, requirements = compileScenicAST(scenic_tree, filename=filename)
-        astHasher = hashlib.blake2b(digest_size=4)
-        astHasher.update(ast.dump(tree).encode())
-
-        if dumpFinalAST:
-            print(f"### Begin final AST of {filename}")
-            print(dump(tree, include_attributes=True, indent=4))
-            print("### End final AST")
-
-        pythonSource = astToSource(tree)
-        if dumpASTPython:
-            if pythonSource is None:
-                raise RuntimeError(
-                    "dumping the Python equivalent of the AST"
-                    " requires the astor package"
-                )
-            print(f"### Begin Python equivalent of final AST of {filename}")
-            print(pythonSource)
-            print("### End Python equivalent of final AST")
-
-        # Compile the Python AST tree
-        code = compileTranslatedTree(tree, filename)
+        cachePath, cacheKey = bytecodeCacheLocation(source, filename, compileOptions)
+        cached = readBytecodeCache(cachePath, cacheKey)
+        if cached:
+            code, requirements, astHash, pythonSource = cached
+        else:
+            code, requirements, astHash, pythonSource = compileSource(source, filename)
+            writeBytecodeCache(
+                cachePath, cacheKey, (code, requirements, astHash, pythonSource)
+            )
 
         # Execute it
         executeCodeIn(code, namespace)
 
         # Extract scenario state from veneer and store it
-        astHash = astHasher.digest()
         storeScenarioStateIn(namespace, requirements, astHash, compileOptions)
     finally:
         veneer.deactivate()
@@ -331,6 +316,146 @@ def compileStream(stream, namespace, compileOptions, filename):
     return code, pythonSource
 
 
+def compileSource(source, filename):
+    """Translate Scenic source code into a Python code object.
+
+    Returns:
+        A tuple ``(code, requirements, astHash, pythonSource)`` giving the code
+        object, the syntax of the requirements in the program, a hash of the
+        final Python AST, and the Python equivalent of that AST (if available).
+    """
+    # Parse the source
+    scenic_tree = parse_string(source, "exec", filename=filename)
+
+    if dumpScenicAST:
+        print(f"### Begin Scenic AST of {filename}")
+        print(dump(scenic_tree, include_attributes=False, indent=4))
+        print("### End Scenic AST")
+
+    # Compile the Scenic AST into a Python AST
+    tree, requirements = compileScenicAST(scenic_tree, filename=filename)
+    astHasher = hashlib.blake2b(digest_size=4)
+    astHasher.update(ast.dump(tree).encode())
+
+    if dumpFinalAST:
+        print(f"### Begin final AST of {filename}")
+        print(dump(tree, include_attributes=True, indent=4))
+        print("### End final AST")
+
+    pythonSource = astToSource(tree)
+    if dumpASTPython:
+        if pythonSource is None:
+            raise RuntimeError(
+                "dumping the Python equivalent of the AST" " requires the astor package"
+            )
+        print(f"### Begin Python equivalent of final AST of {filename}")
+        print(pythonSource)
+        print("### End Python equivalent of final AST")
+
+    # Compile the Python AST tree
+    code = compileTranslatedTree(tree, filename)
+    return code, requirements, astHasher.digest(), pythonSource
+
+
+## Bytecode cache
+
+
+def bytecodeCacheLocation(source, filename, compileOptions):
+    """Find where the compiled form of a Scenic file should be cached.
+
+    Like Python's ``__pycache__``, compiled Scenic modules are stored in a
+    :file:`__pycache__` directory next to the source file. The cache is only used
+    for programs read from files, and is disabled when any of the AST dumping
+    options are enabled.
+
+    Returns:
+        A pair ``(path, key)`` giving the path to the cache file and a key which
+        must match the one saved in the file for it to be used; the path is None
+        if the cache should not be used.
+    """
+    if (
+        not useBytecodeCache
+        or dumpScenicAST
+        or dumpFinalAST
+        or dumpASTPython
+        or not os.path.isfile(filename)
+    ):
+        return None, None
+    directory, name = os.path.split(filename)
+    tag = sys.implementation.cache_tag
+    path = os.path.join(directory, "__pycache__", f"{name}.{tag}.scenicc")
+    hasher = hashlib.blake2b(digest_size=16)
+    parts = (
+        _scenicVersion(),
+        _compilerFingerprint(),
+        tag,
+        filename,
+        compileOptions.hash,
+        source,
+    )
+    for part in parts:
+        hasher.update(part if isinstance(part, bytes) else str(part).encode())
+        hasher.update(b"\0")
+    return path, hasher.digest()
+
+
+@functools.lru_cache(maxsize=None)
+def _scenicVersion():
+    try:
+        return importlib.metadata.version("scenic")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+@functools.lru_cache(maxsize=None)
+def _compilerFingerprint():
+    """Identify the version of the compiler, so that editing it invalidates the cache.
+
+    The installed version of Scenic does not change when working on a source checkout,
+    so we also use the sizes and modification times of the modules of `scenic.syntax`
+    (including the generated parser and its grammar).
+    """
+    directory = os.path.dirname(__file__)
+    stats = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith((".py", ".gram")):
+            info = os.stat(os.path.join(directory, name))
+            stats.append((name, info.st_size, info.st_mtime_ns))
+    return repr(stats)
+
+
+def readBytecodeCache(path, key):
+    """Load a cached compiled module, returning None if it is missing or stale."""
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as stream:
+            savedKey, code, rest = pickle.load(stream)
+        if savedKey != key:
+            return None
+        return (marshal.loads(code),) + rest
+    except Exception:
+        # Ignore unreadable or corrupt cache files, like Python does for .pyc files
+        return None
+
+
+def writeBytecodeCache(path, key, compiled):
+    """Save a compiled module to the cache, ignoring any errors."""
+    if path is None or sys.dont_write_bytecode:
+        return
+    code, *rest = compiled
+    try:
+        data = pickle.dumps((key, marshal.dumps(code), tuple(rest)))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write atomically so that concurrent compilations never see partial files
+        tempPath = f"{path}.{os.getpid()}.tmp"
+        with open(tempPath, "wb") as stream:
+            stream.write(data)
+        os.replace(tempPath, path)
+    except Exception:
+        pass
+
+
 def dump(
     node: ast.AST,
     annotate_fields: bool = True,
@@ -363,6 +488,7 @@ dumpScenicAST = False
 dumpFinalAST = False
 dumpASTPython = False
 usePruning = True
+useBytecodeCache = True
 
 ## Preamble
 # (included at the beginning of every module to be translated;
@@ -1,6 +1,7 @@
 import math
 from pathlib import Path
 
+import numpy
 import pytest
 import shapely.geometry
 import trimesh.voxel
@@ -267,6 +268,67 @@ def test_polygon_sampling():
     assert sum(y >= 1.5 for y in ys) >= 1250
 
 
+def test_polygon_uniformPoints():
+    p = shapely.geometry.Polygon(
+        [(0, 0), (0, 3), (3, 3), (3, 0)], holes=[[(1, 1), (1, 2), (2, 2), (2, 1)]]
+    )
+    r = PolygonalRegion(polygon=p, z=2)
+    pts = r.uniformPoints(3000)
+    assert pts.shape == (3000, 3)
+    assert numpy.all(pts[:, 2] == 2)
+    assert numpy.all(r.containsPoints(pts))
+    xs, ys = pts[:, 0], pts[:, 1]
+    assert numpy.sum((1 <= xs) & (xs <= 2)) <= 870
+    assert numpy.sum((1 <= ys) & (ys <= 2)) <= 870
+    assert numpy.sum(xs >= 1.5) >= 1250
+    assert numpy.sum(ys >= 1.5) >= 1250
+
+
+def test_polygon_cache(tmp_path, monkeypatch):
+    # Regions with the same geometry share their sampling data
+    r1 = PolygonalRegion([(0, 0), (2, 0), (2, 1), (0, 1)])
+    r2 = PolygonalRegion([(0, 0), (2, 0), (2, 1), (0, 1)])
+    assert r1._samplingData[0] is r2._samplingData[0]
+    r3 = PolygonalRegion([(0, 0), (3, 0), (3, 1), (0, 1)])
+    assert r3._samplingData[1][-1] == pytest.approx(3)
+
+    # The cache is bounded
+    cache = PolygonCache(maxSize=2, directory=tmp_path)
+    squares = [MultiPolygon([shapely.geometry.box(i, 0, i + 1, 1)]) for i in range(3)]
+    for square in squares:
+        cache.samplingData(square)
+    assert len(cache) == 2
+
+    # Entries are persisted, so a new cache doesn't need to triangulate them
+    def fail(polygon):
+        raise AssertionError("polygon was re-triangulated")
+
+    monkeypatch.setattr("scenic.core.regions.triangulatePolygon", fail)
+    fresh = PolygonCache(directory=tmp_path)
+    for square in squares:
+        triangles, cumulativeAreas = fresh.samplingData(square)
+        assert triangles.shape == (2, 3, 2)
+        assert cumulativeAreas[-1] == pytest.approx(1)
+
+
+def test_polygon_cache_save_failure(tmp_path):
+    # Entries which can't be saved are still cached in memory
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    cache = PolygonCache(directory=blocker / "cache")
+    square = MultiPolygon([shapely.geometry.box(0, 0, 1, 1)])
+    with pytest.warns(UserWarning, match="unable to save"):
+        entry = cache.samplingData(square)
+    assert len(cache) == 1
+    assert cache.samplingData(square) is entry
+
+    # Saved entries are tagged with the format version
+    cache = PolygonCache(directory=tmp_path / "cache")
+    cache.samplingData(square)
+    (path,) = (tmp_path / "cache").iterdir()
+    assert path.name.endswith(f".v{PolygonCache.formatVersion}.npz")
+
+
 def test_polygon_trueContainsPoint():
     r = CircularRegion((0, 0), 1, resolution=64)
 
@@ -320,6 +382,154 @@ def test_mesh_volume_region_sampling():
         assert -1 <= z <= 1
 
 
+def test_mesh_volume_region_containsPoints(getAssetPath):
+    regions = [
+        BoxRegion(position=(1, 2, 3), dimensions=(2, 3, 4)),
+        SpheroidRegion(dimensions=(2, 2, 2)),
+        MeshVolumeRegion.fromFile(
+            getAssetPath("meshes/classic_plane.obj.bz2"),
+            dimensions=(20, 20, 10),
+            rotation=(math.radians(-90), 0, math.radians(-10)),
+        ),
+    ]
+    rng = numpy.random.default_rng(42)
+    for region in regions:
+        low, high = region.AABB
+        low, high = numpy.array(low) - 1, numpy.array(high) + 1
+        points = rng.uniform(low, high, size=(500, 3))
+        points = numpy.concatenate((points, region.mesh.vertices[:50]))
+
+        # Compare against a fresh proximity query for each point
+        pq = trimesh.proximity.ProximityQuery(region.mesh)
+        expected = [
+            abs(min(pq.signed_distance([pt])[0], 0)) <= region.tolerance for pt in points
+        ]
+        batched = region.containsPoints(points)
+        assert batched.shape == (len(points),)
+        assert list(batched) == expected
+        assert [region.containsPoint(Vector(*pt)) for pt in points] == expected
+        assert any(expected) and not all(expected)
+
+
+def test_mesh_volume_region_distanceTo():
+    region = BoxRegion(dimensions=(2, 2, 2))
+    assert region.distanceTo((3, 0, 0)) == pytest.approx(2)
+    assert region.distanceTo((0, 0, 0)) == 0
+    assert region.inradius == pytest.approx(1)
+    assert region.distanceTo((0, 0, 5)) == pytest.approx(4)
+
+
+def test_pointset_region_mesh_intersection():
+    region = BoxRegion(dimensions=(2, 2, 2))
+    points = [(0, 0, 0), (0.5, -0.5, 0.9), (3, 0, 0), (0, 0, 1.5)]
+    inside = PointSetRegion("foo", points[:2])
+    outside = PointSetRegion("bar", points[2:])
+    assert inside.intersects(region)
+    assert not outside.intersects(region)
+    intersection = PointSetRegion("baz", points).intersect(region, triedReversed=True)
+    for _ in range(20):
+        assert region.containsPoint(intersection.uniformPointInner())
+
+
+def test_mesh_volume_region_instanced():
+    from scenic.core.shapes import ConeShape
+    from scenic.core.vectors import Orientation
+
+    shape = ConeShape()
+    yaw, pitch, roll = 0.3, -0.2, 0.5
+    orientation = Orientation.fromEuler(yaw, pitch, roll)
+    objs = [
+        Object._with(
+            shape=shape,
+            width=2,
+            length=3,
+            height=1.5,
+            position=(i, 2 * i, 1),
+            yaw=yaw,
+            pitch=pitch,
+            roll=roll,
+        )
+        for i in range(3)
+    ]
+    spaces = [obj.occupiedSpace for obj in objs]
+    assert spaces[0]._instance is spaces[1]._instance is spaces[2]._instance
+    assert "_mesh" not in spaces[0].__dict__
+
+    space = spaces[2]
+    plain = MeshVolumeRegion(
+        mesh=shape.mesh,
+        dimensions=(2, 3, 1.5),
+        position=(2, 4, 1),
+        rotation=orientation,
+        centerMesh=False,
+    )
+    assert numpy.allclose(space._bounds, plain.mesh.bounds)
+    points = numpy.random.uniform(-1, 6, size=(200, 3))
+    assert list(space.containsPoints(points)) == list(plain.containsPoints(points))
+    for pt in points[:20]:
+        assert space.distanceTo(pt) == pytest.approx(plain.distanceTo(pt))
+    assert space.size == pytest.approx(plain.size)
+    assert numpy.allclose(objs[2].boundingBox.mesh.bounds, plain.mesh.bounds)
+    assert space.intersects(plain)
+
+    # The placed mesh is only built when needed
+    assert numpy.allclose(space.mesh.vertices, plain.mesh.vertices)
+    assert numpy.array_equal(space.mesh.faces, plain.mesh.faces)
+
+
+def test_region_containsPoints_default():
+    region = CircularRegion((0, 0), 1)
+    result = region.containsPoints([(0, 0, 0), (0.5, 0.5, 0), (2, 0, 0)])
+    assert list(result) == [True, True, False]
+
+
+def test_mesh_volume_region_tetrahedral_sampling():
+    # Thin L-shaped mesh: star-shaped, so sampled exactly without rejection
+    arm1 = trimesh.creation.box((10, 0.2, 0.2))
+    arm2 = trimesh.creation.box((0.2, 10, 0.2))
+    arm2.apply_translation((4.9, 4.9, 0))
+    r = MeshVolumeRegion(arm1.union(arm2))
+    assert r._useTetrahedralSampling
+    assert r._tetrahedralization[3] is None
+    pts = numpy.array([r.uniformPointInner() for _ in range(1000)])
+    assert numpy.all(r.containsPoints(pts))
+    # Roughly half of the volume is in the vertical arm
+    assert 0.4 < numpy.mean(pts[:, 0] > 4.8) < 0.6
+
+
+def test_mesh_volume_region_tetrahedral_sampling_nonstar():
+    # Thin annulus: not star-shaped, so some proposals are rejected
+    r = MeshVolumeRegion(trimesh.creation.annulus(1.8, 2, 0.5))
+    assert r._useTetrahedralSampling
+    assert r._tetrahedralization[3] is not None
+    pts = numpy.array(sample_ignoring_rejections(r, 1000))
+    assert len(pts) > 900
+    assert numpy.all(r.containsPoints(pts))
+    assert 0.4 < numpy.mean(pts[:, 0] > 0) < 0.6
+
+
+def test_mesh_volume_region_tetrahedral_sampling_degenerate():
+    # Some faces of this mesh contain the chosen apex, giving degenerate tetrahedra
+    r = MeshVolumeRegion(trimesh.creation.annulus(1.8, 2, 0.5, sections=256))
+    assert r._useTetrahedralSampling
+    pts = numpy.array(sample_ignoring_rejections(r, 100))
+    assert numpy.all(r.containsPoints(pts))
+
+
+def test_count_containing_tetrahedra():
+    from scipy.spatial import Delaunay
+
+    from scenic.core.regions import _barycentricTransforms, _countContainingTetrahedra
+
+    rng = numpy.random.default_rng(0)
+    tetrahedra = rng.uniform(-1, 1, size=(50, 4, 3))
+    points = rng.uniform(-1.2, 1.2, size=(500, 3))
+    counts = _countContainingTetrahedra(_barycentricTransforms(tetrahedra), points)
+    expected = sum(Delaunay(tet).find_simplex(points) >= 0 for tet in tetrahedra)
+    assert numpy.array_equal(counts, expected)
+    assert counts.max() > 1
+
+
 def test_mesh_surface_region_sampling():
     r = BoxRegion(position=(0, 0, 0), dimensions=(2, 2, 2)).getSurfaceRegion()
     pts = [r.uniformPointInner() for _ in range(100)]
@@ -621,6 +831,38 @@ def test_voxel_region():
     assert vr2.dimensionality == 3
 
 
+def test_voxel_region_queries():
+    box = BoxRegion(dimensions=(2, 2, 2), position=(1, 2, 3))
+    vr = box.voxelized(pitch=0.25)
+
+    # Batched and single-point containment agree, including on voxel faces
+    points = numpy.random.uniform(-1, 5, size=(500, 3))
+    points = numpy.concatenate([points, vr.voxel_points + vr.scale / 2])
+    contained = vr.containsPoints(points)
+    assert list(contained) == [vr.containsPoint(pt) for pt in points]
+    assert numpy.all(contained[-len(vr.voxel_points) :])
+    assert vr.containsPoint((1, 2, 3))
+    assert not vr.containsPoint((1, 2, 10))
+
+    # Distances to the union of the voxels are exact
+    low, high = numpy.array(vr.AABB)
+    assert vr.distanceTo((1, 2, 3)) == 0
+    assert vr.distanceTo((1, 2, 10)) == pytest.approx(10 - high[2])
+    corner = high + (1, 2, 2)
+    assert vr.distanceTo(corner) == pytest.approx(3)
+
+    # Containment of objects and regions is conservative
+    assert vr.containsObject(Object._with(position=(1, 2, 3)))
+    assert not vr.containsObject(Object._with(position=(1, 2, 4.5)))
+    assert vr.containsRegion(BoxRegion(dimensions=(1, 1, 1), position=(1, 2, 3)))
+    assert not vr.containsRegion(BoxRegion(dimensions=(1, 1, 1), position=(1, 2, 4)))
+
+    # Dilation isn't clipped at the edge of the grid
+    dilated = vr.dilation(iterations=2)
+    assert numpy.allclose(dilated.AABB, (low - 0.5, high + 0.5))
+    assert dilated.containsPoint(high + 0.4)
+
+
 def test_mesh_voxelization(getAssetPath):
     plane_region = MeshVolumeRegion.fromFile(getAssetPath("meshes/classic_plane.obj.bz2"))
     vr = plane_region.voxelized(max(plane_region.mesh.extents) / 100)
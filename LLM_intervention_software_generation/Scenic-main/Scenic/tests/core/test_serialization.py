@@ -6,6 +6,8 @@ For pickling, see ``test_pickle.py`` and many other tests marked with
 
 import io
 import math
+import multiprocessing
+import pickle
 import random
 import subprocess
 import sys
@@ -13,8 +15,13 @@ import sys
 import numpy
 import pytest
 
-from scenic.core.serialization import SerializationError, Serializer
-from scenic.core.simulators import DivergenceError, DummySimulator
+from scenic.core.serialization import (
+    ReplayFileReader,
+    ReplayFileWriter,
+    SerializationError,
+    Serializer,
+)
+from scenic.core.simulators import DivergenceError, DummySimulator, TerminationType
 from tests.utils import (
     areEquivalent,
     compileScenic,
@@ -305,6 +312,73 @@ class TestExportToBytes:
     def test_separate_interpreters_locals(self):
         checkReconstruction(self.behaviorLocalsScenario)
 
+    def test_shared_memory(self):
+        scenario = compileScenic(simpleScenario)
+        scene = sampleScene(scenario)
+        with scenario.sceneToSharedMemory(scene) as handle:
+            assert len(pickle.dumps(handle)) < 200
+            assert scenario.sceneFromSharedMemory(handle).params == scene.params
+            runInSubprocess(sharedMemoryHelper, simpleScenario, handle, skeleton(scene))
+            # The segment survives the receiver exiting
+            assert handle.read() == scenario.sceneToBytes(scene)
+
+    def test_shared_memory_tracking(self, monkeypatch):
+        """Attaching to a segment must not leave it registered with the tracker."""
+        from multiprocessing import resource_tracker
+
+        registered = []
+        monkeypatch.setattr(
+            resource_tracker, "register", lambda name, rtype: registered.append(name)
+        )
+        monkeypatch.setattr(
+            resource_tracker, "unregister", lambda name, rtype: registered.remove(name)
+        )
+        scenario = compileScenic(simpleScenario)
+        scene = sampleScene(scenario)
+        with scenario.sceneToSharedMemory(scene) as handle:
+            created = list(registered)
+            receiver = pickle.loads(pickle.dumps(handle))
+            assert scenario.sceneFromSharedMemory(receiver).params == scene.params
+            assert registered == created
+
+    @pytest.mark.skipif(
+        "fork" not in multiprocessing.get_all_start_methods(),
+        reason="fork start method not available",
+    )
+    def test_shared_memory_fork(self):
+        """Test attaching to a segment from a process sharing the creator's tracker."""
+        scenario = compileScenic(simpleScenario)
+        scene = sampleScene(scenario)
+        context = multiprocessing.get_context("fork")
+        with scenario.sceneToSharedMemory(scene) as handle:
+            data = scenario.sceneToBytes(scene)
+            receiver = pickle.loads(pickle.dumps(handle))
+            process = context.Process(target=forkedAttachHelper, args=(receiver, data))
+            process.start()
+            process.join()
+            assert process.exitcode == 0
+            assert handle.read() == data
+
+
+def forkedAttachHelper(handle, data):
+    from multiprocessing import resource_tracker
+
+    # Any registration or unregistration of the segment would go to the tracker of
+    # the parent process, which would then forget or destroy the segment
+    calls = []
+    for function in ("register", "unregister"):
+        setattr(resource_tracker, function, lambda name, rtype: calls.append(name))
+    assert handle.read() == data
+    assert not any(name.lstrip("/") == handle.name for name in calls)
+
+
+def sharedMemoryHelper(code, handle, skel):
+    scenario = compileScenic(code)
+    scene = scenario.sceneFromSharedMemory(handle)
+    assert skeleton(scene) == skel
+    with pytest.raises(RuntimeError):
+        handle.unlink()
+
 
 class TestSimulationReplay:
     def simulateReplayFrom(self, code, steps=1, steps2=None, maxIterations=1, **kwargs):
@@ -481,3 +555,145 @@ class TestSimulationReplay:
         data = scenario.simulationToBytes(sim1)
         sim2 = scenario.simulationFromBytes(data, simulator, maxSteps=1)
         assert getEgoActionsFrom(sim1) == getEgoActionsFrom(sim2)
+
+    replayFileScenario = """
+        behavior Foo():
+            while True:
+                take Range(0, 1)
+        ego = new Object with behavior Foo
+        new Object at (10, 0)
+    """
+
+    def test_replay_file(self, tmp_path):
+        path = tmp_path / "replay.scnr"
+        scene = sampleSceneFrom(self.replayFileScenario)
+        simulator = DummySimulator(drift=1.0)
+        writer = ReplayFileWriter(path, stepsPerChunk=4)
+        sim1 = simulator.simulate(
+            scene, maxSteps=10, enableDivergenceCheck=True, replayFile=writer
+        )
+        assert writer.closed
+        with pytest.raises(RuntimeError):
+            sim1.getReplay()
+        with ReplayFileReader(path) as reader:
+            assert reader.steps == 11  # initial state and 10 steps
+            sim2 = simulator.replay(scene, reader, maxSteps=10)
+        assert sim2.result.terminationType is TerminationType.timeLimit
+        assert getEgoActionsFrom(sim1) == getEgoActionsFrom(sim2)
+
+        with ReplayFileReader(path) as reader:
+            for step in (0, 6, 10):
+                state = reader.readState(step, sim1.objects)
+                positions = [values["position"] for values in state]
+                assert positions == list(sim1.result.trajectory[step])
+
+    # The first simulation of each scene is rejected
+    rejectFirstScenario = """
+        attempts = [0]
+        behavior Foo():
+            attempts[0] += 1
+            while True:
+                take Range(0, 1)
+        ego = new Object with behavior Foo
+        require eventually attempts[0] > 1
+    """
+
+    def test_replay_file_rejection(self, tmp_path):
+        scene = sampleSceneFrom(self.rejectFirstScenario)
+        simulator = DummySimulator(drift=1.0)
+        path = tmp_path / "replay.scnr"
+        sim1 = simulator.simulate(
+            scene,
+            maxSteps=10,
+            maxIterations=2,
+            replayFile=ReplayFileWriter(path, stepsPerChunk=2),
+        )
+        assert sim1.name == 2  # the first simulation was rejected
+        with ReplayFileReader(path) as reader:
+            assert reader.steps == 11
+            sim2 = simulator.replay(scene, reader, maxSteps=10)
+        assert getEgoActionsFrom(sim1) == getEgoActionsFrom(sim2)
+
+        # Raw streams are only wrapped once
+        scene = sampleSceneFrom(self.rejectFirstScenario)
+        stream = io.BytesIO()
+        sim1 = simulator.simulate(scene, maxSteps=10, maxIterations=2, replayFile=stream)
+        assert sim1.name == 2
+        assert stream.getvalue().count(b"SCNR") == 1
+        stream.seek(0)
+        with ReplayFileReader(stream) as reader:
+            assert reader.steps == 11
+            sim2 = simulator.replay(scene, reader, maxSteps=10)
+        assert getEgoActionsFrom(sim1) == getEgoActionsFrom(sim2)
+
+    def test_replay_file_seek(self, tmp_path):
+        path = tmp_path / "replay.scnr"
+        writer = ReplayFileWriter(path, stepsPerChunk=4)
+        serializer = Serializer(writer)
+        serializer.quantum = 0.5
+        for step in range(12):
+            serializer.beginState()
+            serializer.writeDynamicValue("x", float(step), float)
+            serializer.endStep()
+        writer.close()
+
+        with ReplayFileReader(path) as reader:
+            reader.seekStep(6)
+            serializer = Serializer(reader)
+            serializer.quantum = 0.5
+            # Values in the rest of the chunk are deltas from earlier time steps, but
+            # the next chunk can be decoded independently.
+            values = []
+            for step in range(6, 12):
+                values.append(serializer.readDynamicValue("x", float))
+                serializer.endStep()
+            assert values[2:] == [8, 9, 10, 11]
+
+    def test_replay_quantized_nonfinite(self):
+        """Test quantized encoding of values which are infinite or NaN."""
+        from scenic.core.vectors import Vector
+
+        inf, nan = math.inf, math.nan
+        floats = [1.0, inf, 1.5, -inf, nan, 2.0, 2.0]
+        vectors = [Vector(1, 2, 3), Vector(1, inf, 3), Vector(nan, 0, 0), Vector(1, 2, 4)]
+        serializer = Serializer()
+        serializer.quantum = 0.5
+        for x in floats:
+            serializer.writeDynamicValue("x", x, float)
+        for v in vectors:
+            serializer.writeDynamicValue("v", v, Vector)
+
+        serializer = Serializer(serializer.getBytes())
+        serializer.quantum = 0.5
+        values = [serializer.readDynamicValue("x", float) for x in floats]
+        values += [c for v in vectors for c in serializer.readDynamicValue("v", Vector)]
+        expected = floats + [c for v in vectors for c in v]
+        assert numpy.array_equal(values, expected, equal_nan=True)
+
+    def test_replay_quantized(self, tmp_path):
+        scene = sampleSceneFrom(self.replayFileScenario)
+        simulator = DummySimulator(drift=0.3)
+        full = simulator.simulate(scene, maxSteps=20, enableDivergenceCheck=True)
+        quantized = simulator.simulate(
+            scene, maxSteps=20, enableDivergenceCheck=True, replayQuantum=0.001
+        )
+        replay = quantized.getReplay()
+        assert len(replay) < len(full.getReplay()) / 3
+        sim2 = simulator.replay(scene, replay, maxSteps=20)
+        assert sim2.result.terminationType is TerminationType.timeLimit
+
+        path = tmp_path / "replay.scnr"
+        sim = simulator.simulate(
+            scene,
+            maxSteps=20,
+            enableDivergenceCheck=True,
+            replayFile=ReplayFileWriter(path, stepsPerChunk=8),
+            replayQuantum=0.001,
+        )
+        with ReplayFileReader(path) as reader:
+            state = reader.readState(13, sim.objects)
+            expected = sim.result.trajectory[13]
+            for values, position in zip(state, expected):
+                assert values["position"].distanceTo(position) < 0.001
+            sim2 = simulator.replay(scene, reader, maxSteps=20)
+        assert sim2.result.terminationType is TerminationType.timeLimit
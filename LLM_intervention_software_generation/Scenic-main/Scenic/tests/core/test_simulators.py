@@ -1,6 +1,11 @@
+import time
+
+import numpy
 import pytest
 
 from scenic.core.simulators import DummySimulation, DummySimulator, Simulation
+from scenic.core.trajectories import RecordSeries, TrajectoryStore
+from scenic.core.vectors import Vector
 from tests.utils import compileScenic, sampleResultFromScene, sampleSceneFrom
 
 
@@ -94,3 +99,146 @@ def test_simulator_bad_scheduler():
     simulator = TestSimulator()
     with pytest.raises(RuntimeError):
         result = simulator.simulate(scene, maxSteps=2)
+
+
+def test_columnar_trajectory():
+    scenario = compileScenic(
+        """
+        scenario Main():
+            setup:
+                ego = new Object
+                record ego.position.y as y
+                record ego.position as pos
+                record (1 if simulation().currentTime < 2 else "two") as mixed
+                record 2**60 + simulation().currentTime as big
+                record (1 if simulation().currentTime < 2 else 1.5) as numbers
+            compose:
+                wait
+                new Object at (5, 0)
+                wait
+                wait
+        """
+    )
+    scene, _ = scenario.generate(maxIterations=1)
+    simulator = DummySimulator(drift=1)
+    plain = simulator.simulate(scene, maxSteps=3).result
+    columnar = simulator.simulate(scene, maxSteps=3, columnarTrajectory=True).result
+    trajectory = columnar.trajectory
+    assert isinstance(trajectory, TrajectoryStore)
+    assert list(trajectory) == list(plain.trajectory)
+    assert columnar.finalState == plain.finalState
+    assert len(trajectory[0]) == 1 and len(trajectory[-1]) == 2
+    assert trajectory.startOf(1) == 1
+    assert trajectory.positions(1).tolist() == [[5, 0, 0], [5, 1, 0], [5, 2, 0]]
+    assert trajectory.positions(scene.egoObject)[:, 1].tolist() == [0, 1, 2, 3]
+    assert trajectory.orientations(0).shape == (4, 4)
+
+    records = columnar.records
+    assert isinstance(records["y"], RecordSeries)
+    assert records["y"].values.tolist() == [0, 1, 2, 3]
+    assert records["y"].times.tolist() == [0, 1, 2, 3]
+    assert records["pos"].values.shape == (4, 3)
+    assert type(records["mixed"]) is list
+    # Integers are stored exactly
+    assert records["big"].values.dtype == numpy.int64
+    assert records["big"][3] == (3, 2**60 + 3)
+    assert type(records["numbers"]) is list
+    for name in ("y", "pos", "mixed", "big", "numbers"):
+        assert list(records[name]) == plain.records[name]
+
+
+def test_trajectory_spill(tmp_path):
+    store = TrajectoryStore(spillThreshold=2**14, spillDirectory=tmp_path)
+    ego = sampleSceneFrom("ego = new Object").egoObject
+    for i in range(1000):
+        store.recordState([ego])
+        store.recordValue("i", i, i)
+    assert store.spilled
+    assert isinstance(store.positions(0), numpy.memmap)
+    assert len(store) == 1000
+    assert store.series["i"].values.tolist() == list(range(1000))
+    assert store[-1] == (ego.position,)
+
+
+class IncrementalSimulation(DummySimulation):
+    """Simulation reporting only the objects which moved."""
+
+    typeCheckSteps = 1
+    moved = ()
+
+    def step(self):
+        self.moved = self.objects[:1]
+        for obj in self.moved:
+            obj.position += Vector(0, self.drift)
+
+    def getChangedProperties(self):
+        return {obj: dict(position=obj.position, yaw=obj.yaw + 0.1) for obj in self.moved}
+
+
+class IncrementalSimulator(DummySimulator):
+    def createSimulation(self, scene, **kwargs):
+        return IncrementalSimulation(scene, drift=self.drift, **kwargs)
+
+
+def test_incremental_update():
+    scene = sampleSceneFrom(
+        """
+        ego = new Object
+        other = new Object at (5, 0)
+        record ego.heading as egoHeading
+        record other.heading as otherHeading
+        """
+    )
+    result = IncrementalSimulator(drift=1).simulate(scene, maxSteps=2).result
+    assert [state[0] for state in result.trajectory] == [(0, 0), (0, 1), (0, 2)]
+    assert [state[1] for state in result.trajectory] == [(5, 0)] * 3
+    egoHeadings = [heading for _, heading in result.records["egoHeading"]]
+    assert egoHeadings == pytest.approx([0, 0.1, 0.2])
+    assert [heading for _, heading in result.records["otherHeading"]] == [0, 0, 0]
+
+
+class IntegerYawSimulation(IncrementalSimulation):
+    """Simulation reporting scalars with types other than float."""
+
+    typeCheckSteps = 0
+
+    def getChangedProperties(self):
+        return {obj: dict(yaw=numpy.int64(self.currentTime)) for obj in self.moved}
+
+
+class IntegerYawSimulator(DummySimulator):
+    def createSimulation(self, scene, **kwargs):
+        return IntegerYawSimulation(scene, drift=self.drift, **kwargs)
+
+
+def test_unchecked_scalar_coercion():
+    scene = sampleSceneFrom(
+        """
+        ego = new Object
+        record ego.yaw as egoYaw
+        """
+    )
+    result = IntegerYawSimulator(drift=0).simulate(scene, maxSteps=2).result
+    yaws = [yaw for _, yaw in result.records["egoYaw"]]
+    assert yaws == [0, 1, 2]
+    assert all(type(yaw) is float for yaw in yaws)
+
+
+@pytest.mark.slow
+def test_incremental_update_benchmark():
+    scene = sampleSceneFrom(
+        """
+        ego = new Object
+        for i in range(120):
+            new Object at (2 * i, 5), with allowCollisions True
+        """
+    )
+
+    def run(simulator):
+        start = time.perf_counter()
+        simulator.simulate(scene, maxSteps=20)
+        return time.perf_counter() - start
+
+    fullTime = min(run(DummySimulator()) for _ in range(2))
+    incrementalTime = min(run(IncrementalSimulator()) for _ in range(2))
+    assert incrementalTime < fullTime / 2
@@ -1,10 +1,14 @@
 from pathlib import Path
+import signal
+import threading
+import time
+import timeit
 
 import numpy
 import pytest
 import trimesh
 
-from scenic.core.utils import repairMesh, unifyMesh
+from scenic.core.utils import Watchdog, alarm, repairMesh, unifyMesh
 
 
 @pytest.mark.slow
@@ -60,3 +64,101 @@ def test_unify_mesh():
     fixed_mesh = unifyMesh(bad_mesh)
     assert fixed_mesh.is_volume
     assert fixed_mesh.body_count == 3
+
+
+def test_watchdog_deadline():
+    watchdog = Watchdog(interval=0.01)
+    fired = []
+
+    def run():
+        with watchdog.deadline(0.05, fired.append):
+            with watchdog.deadline(10, fired.append):
+                time.sleep(0.2)
+        with watchdog.deadline(0.05, fired.append):
+            pass
+        time.sleep(0.1)
+
+    # Deadlines work outside the main thread
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert len(fired) == 1
+
+    # The watchdog thread stops once no deadlines are pending
+    assert watchdog._thread is None
+
+
+def test_watchdog_handler_error():
+    watchdog = Watchdog(interval=0.01)
+    errors = []
+
+    def handler(tracer):
+        raise RuntimeError("stuck")
+
+    def run():
+        # Errors raised by handlers are raised again when the deadline exits
+        try:
+            with watchdog.deadline(0.02, handler):
+                time.sleep(0.1)
+        except RuntimeError as e:
+            errors.append(e)
+
+        # ...without stopping later deadlines from firing
+        fired = []
+        with watchdog.deadline(0.02, fired.append):
+            time.sleep(0.1)
+        errors.append(fired)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert len(errors) == 2
+    assert str(errors[0]) == "stuck"
+    assert len(errors[1]) == 1
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGALRM"), reason="need SIGALRM")
+def test_watchdog_main_thread():
+    watchdog = Watchdog()
+
+    def handler(tracer):
+        raise RuntimeError("stuck")
+
+    # In the main thread, handlers interrupt the body of the deadline
+    with pytest.raises(RuntimeError, match="stuck"):
+        with watchdog.deadline(0.05, handler):
+            while True:
+                pass
+    assert watchdog._thread is None
+
+    # Nested deadlines fire in the right order, without a thread
+    fired = []
+    with watchdog.deadline(0.2, lambda tracer: fired.append("outer")):
+        with watchdog.deadline(0.05, lambda tracer: fired.append("inner")):
+            time.sleep(0.1)
+        assert fired == ["inner"]
+        time.sleep(0.2)
+    assert fired == ["inner", "outer"]
+    with watchdog.deadline(0.01, fired.append):
+        pass
+    time.sleep(0.05)
+    assert len(fired) == 2
+    assert watchdog._thread is None
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not hasattr(signal, "SIGALRM"), reason="need SIGALRM")
+def test_watchdog_benchmark():
+    watchdog = Watchdog()
+
+    def withDeadline():
+        with watchdog.deadline(10, None):
+            pass
+
+    def withAlarm():
+        with alarm(10):
+            pass
+
+    deadlineTime = min(timeit.repeat(withDeadline, number=2000, repeat=3))
+    alarmTime = min(timeit.repeat(withAlarm, number=2000, repeat=3))
+    assert deadlineTime < alarmTime
@@ -1,4 +1,8 @@
+import timeit
+
+import numpy
 import pytest
+from scipy.spatial.transform import Rotation
 
 from scenic.core.distributions import Options, underlyingFunction
 from scenic.core.lazy_eval import (
@@ -52,6 +56,104 @@ def test_orientation_localAnglesFor():
         assert target.approxEq(parent * local)
 
 
+def test_orientation_matches_scipy():
+    for i in range(100):
+        angles = [random.uniform(-math.pi, math.pi) for _ in range(3)]
+        other = [random.uniform(-math.pi, math.pi) for _ in range(3)]
+        heading = random.uniform(-math.pi, math.pi)
+        vec = Vector(*(random.uniform(-10, 10) for _ in range(3)))
+        o1, o2 = Orientation.fromEuler(*angles), Orientation.fromEuler(*other)
+        r1 = Rotation.from_euler("ZXY", angles)
+        r2 = Rotation.from_euler("ZXY", other)
+        assert o1.q == pytest.approx(r1.as_quat(), abs=1e-15)
+        assert (o1 * o2).q == pytest.approx((r1 * r2).as_quat(), abs=1e-15)
+        assert o1.inverse.q == pytest.approx(r1.inv().as_quat(), abs=1e-15)
+        heading_r = Rotation.from_rotvec([0, 0, heading])
+        heading_q = Orientation._fromHeading(heading).q
+        assert heading_q == pytest.approx(heading_r.as_quat(), abs=1e-15)
+        rotated = r1.apply(vec.coordinates)
+        assert vec.applyRotation(o1) == pytest.approx(rotated, rel=1e-15, abs=1e-14)
+        assert o1.eulerAngles == pytest.approx(r1.as_euler("ZXY"))
+        assert o1.r.as_quat() == pytest.approx(o1.q)
+    assert Orientation.fromQuaternion((0, 0, 2, 0)).q == pytest.approx((0, 0, 1, 0))
+    rotation = Rotation.from_euler("ZXY", (1, 2, 3))
+    assert Orientation(rotation).r is rotation
+    with pytest.raises(ValueError):
+        Orientation.fromQuaternion((0, 0, 0, 0))
+
+
+def test_orientation_array():
+    n = 50
+    angles = numpy.random.uniform(-math.pi, math.pi, (n, 3))
+    targets = numpy.random.uniform(-math.pi, math.pi, (n, 3))
+    parents = OrientationArray.fromEuler(*angles.T)
+    assert len(parents) == n
+    roundTrip = OrientationArray.fromEuler(*parents.eulerAngles.T)
+    assert numpy.all(roundTrip.approxEq(parents))
+    local = parents.globalToLocalAngles(*targets.T)
+    for i in range(n):
+        parent = parents[i]
+        assert parent == Orientation.fromEuler(*angles[i])
+        assert local[i] == pytest.approx(parent.globalToLocalAngles(*targets[i]))
+        assert (parents * parents.inverse)[i].approxEq(globalOrientation)
+    assert numpy.all((parents[:10] * parents[0]).approxEq(parents[:10] * parents[0]))
+    assert (parents[0] * parents)[3].approxEq(parents[0] * parents[3])
+
+    headings = OrientationArray.fromHeadings([0, math.pi / 2])
+    assert headings[1].approxEq(Orientation._fromHeading(math.pi / 2))
+    vectors = VectorArray([(1, 0), (1, 0)])
+    rotated = vectors.rotatedBy(headings)
+    assert numpy.allclose(rotated.coordinates, [(1, 0, 0), (0, 1, 0)])
+    offset = VectorArray([(0, 0, 0), (1, 1, 1)]).offsetLocally(headings, Vector(1, 0))
+    assert offset.coordinates[1] == pytest.approx((1, 2, 1))
+
+
+def test_vector_array():
+    vectors = VectorArray.fromVectors([Vector(1, 2), Vector(3, 4, 5)])
+    assert len(vectors) == 2
+    assert vectors[1] == Vector(3, 4, 5)
+    assert list(vectors + Vector(1, 1)) == [(2, 3, 0), (4, 5, 5)]
+    assert list(vectors - Vector(1, 1)) == [(0, 1, 0), (2, 3, 5)]
+    assert list(2 * vectors) == [(2, 4, 0), (6, 8, 10)]
+    assert list(vectors * [1, 0]) == [(1, 2, 0), (0, 0, 0)]
+    assert vectors.norms() == pytest.approx([math.sqrt(5), math.sqrt(50)])
+    assert vectors.distancesTo(Vector(1, 2)) == pytest.approx([0, math.sqrt(33)])
+    assert list(vectors.dot(vectors)) == [5, 50]
+    assert list(vectors.z) == [0, 5]
+
+
+@pytest.mark.slow
+def test_orientation_conversion_benchmark():
+    # Per-tick conversion of simulator orientations into local Euler angles, as done
+    # by simulator interfaces for every object at every time step
+    n = 200
+    quaternions = numpy.random.normal(size=(n, 4))
+    parents = [
+        Orientation.fromEuler(*(random.uniform(-math.pi, math.pi) for _ in range(3)))
+        for _ in range(n)
+    ]
+
+    def withSciPy():
+        for quaternion, parent in zip(quaternions, parents):
+            rotation = Rotation.from_quat(quaternion)
+            (parent.r.inv() * rotation).as_euler("ZXY")
+
+    def withOrientations():
+        for quaternion, parent in zip(quaternions, parents):
+            parent.localAnglesFor(Orientation.fromQuaternion(quaternion))
+
+    def withArrays():
+        OrientationArray.fromOrientations(parents).localAnglesFor(
+            OrientationArray(quaternions)
+        )
+
+    scipyTime = min(timeit.repeat(withSciPy, number=5, repeat=3))
+    scalarTime = min(timeit.repeat(withOrientations, number=5, repeat=3))
+    arrayTime = min(timeit.repeat(withArrays, number=5, repeat=3))
+    assert scalarTime < scipyTime
+    assert arrayTime < scalarTime / 5
+
+
 def test_distribution_method_encapsulation():
     vf = VectorField("Foo", lambda pos: 0)
     pt = vf.followFrom(Vector(0, 0), Options([1, 2]), steps=1)
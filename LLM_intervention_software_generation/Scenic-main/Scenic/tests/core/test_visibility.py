@@ -0,0 +1,66 @@
+import gc
+import weakref
+
+from scenic.core.vectors import Vector
+from scenic.core.visibility import VisibilityEngine
+from tests.utils import sampleSceneFrom
+
+
+def test_canSeeMany():
+    scene = sampleSceneFrom(
+        """
+        ego = new Object with visibleDistance 30, with viewAngles (340 deg, 60 deg)
+        new Object at (0, 10, 0), with name "hidden"
+        new Object at (0, 5, 0), with width 10, with height 4, with name "wall"
+        new Object at (8, 8, 0), with name "visible"
+        new Object at (0, 40, 0), with name "distant"
+        """
+    )
+    ego = scene.egoObject
+    others = scene.objects[1:]
+    targets = list(others) + [Vector(0, 10, 0), Vector(-8, 3, 0)]
+    single = [
+        ego.canSee(target, tuple(obj for obj in others if obj is not target))
+        for target in targets
+    ]
+    assert single == [False, True, True, False, False, True]
+    assert ego.canSeeMany(targets, others) == single
+
+
+def test_canSee_memoized():
+    scene = sampleSceneFrom(
+        """
+        ego = new Object
+        wall = new Object at (0, 5, 0), with width 10, with height 4
+        other = new Object at (0, 10, 0)
+        """
+    )
+    ego, wall, other = scene.objects
+    assert not ego.canSee(other, (wall,))
+    engine, occluders = VisibilityEngine.forObjects([wall])
+    assert len(engine.memo) > 0
+    # Another query with the same viewer and target reuses the memoized result
+    assert ego.canSeeMany([other], [wall]) == [False]
+    assert ego.canSeeMany([other, wall], [wall]) == [False, True]
+
+
+def test_visibility_engine_weak():
+    scene = sampleSceneFrom(
+        """
+        ego = new Object
+        wall = new Object at (0, 5, 0), with width 10, with height 4
+        other = new Object at (0, 10, 0)
+        """
+    )
+    ego, wall, other = scene.objects
+    assert not ego.canSee(other, (wall,))
+    engine, occluders = VisibilityEngine.forObjects([wall])
+    assert engine.regionsFor(occluders) == [wall.occupiedSpace]
+
+    # Cached engines do not keep the objects of old scenes alive
+    region = weakref.ref(wall.occupiedSpace)
+    del scene, ego, wall, other, engine
+    gc.collect()
+    assert region() is None
+    VisibilityEngine.forObjects([])
+    assert all(engine.alive for engine in VisibilityEngine._recentEngines)
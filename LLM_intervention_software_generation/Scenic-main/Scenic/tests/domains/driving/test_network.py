@@ -1,9 +1,14 @@
+import os
 from pathlib import Path
+import pickle
+import shutil
 
+import numpy
 import pytest
 
 from scenic.core.distributions import RejectionException
-from scenic.domains.driving.roads import Intersection, Network
+from scenic.core.vectors import Vector
+from scenic.domains.driving.roads import Intersection, Network, _NetworkCache
 from tests.domains.driving.conftest import mapFolder
 
 # Suppress all warnings from OpenDRIVE parser
@@ -53,6 +58,174 @@ def test_element_tolerance(cached_maps, pytestconfig):
         assert not network.nominalDirectionsAt(pt)
 
 
+@pytest.mark.slow
+def test_lazy_cache(cached_maps, tmp_path):
+    path = tmp_path / "map.xodr"
+    shutil.copyfile(cached_maps[str(mapFolder / "CARLA" / "Town01.xodr")], path)
+    network = Network.fromFile(path, useCache=False)
+    cached = Network.fromFile(path)
+
+    # Elements are created empty, and loaded from the cache when first used
+    assert all("_cacheIndex" in elem.__dict__ for elem in cached.elements.values())
+    assert [lane.uid for lane in cached.lanes] == [lane.uid for lane in network.lanes]
+    for lane, original in zip(cached.lanes, network.lanes):
+        assert lane.polygon.equals(original.polygon)
+        assert lane.road is cached.elements[original.road.uid]
+        endLanes = [maneuver.endLane.uid for maneuver in lane.maneuvers]
+        assert endLanes == [maneuver.endLane.uid for maneuver in original.maneuvers]
+        for maneuver in lane.maneuvers:
+            if maneuver.intersection:
+                assert any(maneuver is m for m in maneuver.intersection.maneuvers)
+    assert cached.drivableRegion.polygons.equals(network.drivableRegion.polygons)
+    pt = network.lanes[0].centerline.points[1]
+    assert cached.laneAt(pt).uid == network.laneAt(pt).uid
+
+    # Changing the modification time of the map alone does not invalidate the cache,
+    # but changing its contents does
+    os.utime(path, ns=(0, 0))
+    assert "_cache" in Network.fromFile(path).__dict__
+    with open(path, "ab") as f:
+        f.write(b"\n")
+    assert "_cache" not in Network.fromFile(path, writeCache=False).__dict__
+
+
+def test_corrupted_cache(cached_maps, tmp_path):
+    path = tmp_path / "map.xodr"
+    shutil.copyfile(cached_maps[str(mapFolder / "CARLA" / "Town01.xodr")], path)
+    cachePath = path.with_suffix(Network.pickledExt)
+    Network.fromFile(path)
+    cache = Network.fromFile(path)._cache
+    elementBlob = cache.blobs[cache.elementBlobs].copy()
+    uid = cache.elements[0].uid
+
+    def corrupt(offset, data):
+        # Replace the file, as when writing it, since it may still be mapped
+        contents = bytearray(cachePath.read_bytes())
+        contents[offset : offset + len(data)] = data
+        tempPath = tmp_path / "corrupted"
+        tempPath.write_bytes(contents)
+        os.replace(tempPath, cachePath)
+
+    # A blob extending past the end of the file is detected when the cache is opened,
+    # so that the cache is regenerated
+    size = cachePath.stat().st_size
+    corrupt(_NetworkCache.header.size + 8, (size + 1).to_bytes(8, "little"))
+    with pytest.raises(pickle.UnpicklingError):
+        Network.fromPickle(cachePath)
+    assert "_cache" not in Network.fromFile(path).__dict__
+    assert "_cache" in Network.fromFile(path).__dict__
+
+    # A corrupted element is only detected when it is loaded
+    start, length = (int(field) for field in elementBlob)
+    corrupt(start, bytes(length))
+    elem = Network.fromFile(path).elements[uid]
+    with pytest.raises(pickle.UnpicklingError, match="delete the file") as info:
+        elem.polygon
+    assert str(cachePath) in str(info.value)
+
+
+def test_batched_queries(cached_maps):
+    path = cached_maps[str(mapFolder / "CARLA" / "Town01.xodr")]
+    network = Network.fromFile(path)
+    xmin, ymin, xmax, ymax = network.drivableRegion.polygons.bounds
+    rng = numpy.random.default_rng(0)
+    points = numpy.column_stack(
+        (rng.uniform(xmin - 5, xmax + 5, 300), rng.uniform(ymin - 5, ymax + 5, 300))
+    )
+    elements = list(network.elements.values())
+
+    def lookup(seq, index):
+        return seq[index] if index >= 0 else None
+
+    lanes = network.laneIndicesAt(points)
+    roads = network.roadIndicesAt(points)
+    intersections = network.intersectionIndicesAt(points)
+    elems = network.elementIndicesAt(points)
+    directions = network.nominalDirectionsAtPoints(points)
+    assert (lanes >= 0).any() and (intersections >= 0).any() and (elems < 0).any()
+    for i, pt in enumerate(points):
+        pt = Vector(*pt)
+        assert lookup(network.lanes, lanes[i]) is network.laneAt(pt)
+        assert lookup(network.allRoads, roads[i]) is network.roadAt(pt)
+        assert lookup(network.intersections, intersections[i]) is (
+            network.intersectionAt(pt)
+        )
+        assert lookup(elements, elems[i]) is network.elementAt(pt)
+        assert directions[i] == network.nominalDirectionsAt(pt)
+
+    network.memoizePointQueries(maxSize=100)
+    for pt in points:
+        pt = Vector(*pt)
+        assert network.laneAt(pt) is network.laneAt(pt)
+        assert network.roadAt(pt) is lookup(
+            network.allRoads, network.roadIndicesAt([pt])[0]
+        )
+    assert len(network._pointQueryMemo) <= 100
+    network.memoizePointQueries(0)
+
+
+def test_lane_graph(cached_maps):
+    path = cached_maps[str(mapFolder / "CARLA" / "Town01.xodr")]
+    network = Network.fromFile(path)
+    graph = network.laneGraph
+
+    def nextLanes(lane):
+        lanes = [lane._successor] if lane._successor else []
+        lanes.extend(man.connectingLane or man.endLane for man in lane.maneuvers)
+        return lanes
+
+    start = network.lanes[0]
+    reachable, frontier = {start.uid}, [start]
+    while frontier:
+        lane = frontier.pop()
+        assert {l.uid for l in graph.successorsOf(lane)} == {
+            l.uid for l in nextLanes(lane)
+        }
+        for nextLane in nextLanes(lane):
+            if nextLane.uid not in reachable:
+                reachable.add(nextLane.uid)
+                frontier.append(nextLane)
+    indices = graph.reachableFrom(start)
+    assert {network.lanes[i].uid for i in indices} == reachable
+
+    for end in network.lanes:
+        route = graph.shortestPath(start, end)
+        if end.uid not in reachable:
+            assert route is None and not graph.isReachable(start, end)
+            continue
+        assert route[0] is start and route[-1] is end
+        for lane, nextLane in zip(route, route[1:]):
+            assert nextLane in nextLanes(lane)
+        length = sum(lane.centerline.length for lane in route[:-1])
+        assert graph.distance(start, end) == pytest.approx(length)
+
+
+def test_routing(cached_maps):
+    path = cached_maps[str(mapFolder / "CARLA" / "Town01.xodr")]
+    network = Network.fromFile(path)
+    lane = next(lane for lane in network.lanes if len(lane.maneuvers) > 1)
+    for maneuver in lane.maneuvers:
+        route = network.shortestRoute(lane, maneuver.endLane)
+        assert route == network.laneGraph.shortestPath(lane, maneuver.endLane)
+        assert route[1] is (maneuver.connectingLane or maneuver.endLane)
+        assert lane.maneuverTowards(maneuver.endLane) is maneuver
+    assert lane.maneuverTowards(lane) is None
+
+
+def test_lane_graph_cache(cached_maps, monkeypatch):
+    path = cached_maps[str(mapFolder / "CARLA" / "Town01.xodr")]
+    graph = Network.fromFile(path).laneGraph
+    monkeypatch.setattr(graph, "maxCachedSearches", 3)
+    graph._searches.clear()
+    lanes = graph.lanes[:5]
+    distances = [graph.distancesFrom(lane) for lane in lanes]
+    assert list(graph._searches) == [2, 3, 4]
+    assert graph.distancesFrom(lanes[2]) is distances[2]
+    assert list(graph._searches) == [3, 4, 2]
+    assert numpy.array_equal(graph.distancesFrom(lanes[0]), distances[0])
+    assert list(graph._searches) == [4, 2, 0]
+
+
 def test_orientation_consistency(network):
     for i in range(30):
         pt = network.drivableRegion.uniformPointInner()
@@ -1,12 +1,16 @@
 import glob
+import math
 import os
 from pathlib import Path
 
 import matplotlib.pyplot as plt
 import pytest
+from scipy.integrate import solve_ivp
+from scipy.optimize import brentq
 
 from scenic.core.geometry import TriangulationError
 from scenic.formats.opendrive import OpenDriveWorkspace
+from scenic.formats.opendrive.xodr_parser import Clothoid, Cubic, ParamCubic, RoadMap
 
 oldDir = os.getcwd()
 os.chdir(Path("tests") / "formats" / "opendrive")
@@ -30,3 +34,74 @@ def test_map(path, runLocally, pytestconfig):
             odw.show(plt)
             plt.show(block=False)
             plt.close()
+
+
+@pytest.mark.parametrize(
+    "curv0, curv1",
+    [
+        (0, 0.2),  # spiral starting from a straight line
+        (0.1, -0.15),  # spiral changing direction of turning
+        (-0.05, -0.05 * (1 + 1e-9)),  # nearly an arc
+        (0.08, 0.08),  # arc
+    ],
+)
+def test_clothoid_points(curv0, curv1):
+    length = 40
+    curve = Clothoid(3, -2, 0.7, length, curv0, curv1)
+    rate = (curv1 - curv0) / length
+
+    def ode(s, state):
+        return [math.cos(state[2]), math.sin(state[2]), curv0 + rate * s]
+
+    points = curve.to_points(9, extra_points=[13])
+    assert len(points) == 10
+    sol = solve_ivp(
+        ode,
+        (0, length),
+        [3, -2, 0.7],
+        t_eval=[s for x, y, s in points],
+        rtol=1e-10,
+        atol=1e-10,
+    )
+    for (x, y, s), ex, ey in zip(points, sol.y[0], sol.y[1]):
+        assert x == pytest.approx(ex, abs=1e-6)
+        assert y == pytest.approx(ey, abs=1e-6)
+    assert curve.point_at(13) == pytest.approx(points[3])
+
+
+def test_cubic_points():
+    cubics = [
+        Cubic(1, 2, -0.4, 25, 0.5, 0.1, -0.02, 0.001),
+        ParamCubic(1, 2, -0.4, 25, 0, 24, 1.5, -0.5, 0, 0.3, 4, -2),
+    ]
+    for curve in cubics:
+        upper = curve.p_range if isinstance(curve, ParamCubic) else curve.length
+        for x, y, s in curve.to_points(7):
+            if s > curve.arclength(upper):
+                continue
+            u = brentq(lambda u: curve.arclength(u) - s, 0, upper)
+            if isinstance(curve, ParamCubic):
+                point = (curve.u_poly.eval_at(u), curve.v_poly.eval_at(u), s)
+            else:
+                point = (s, curve.poly.eval_at(u), s)
+            assert (x, y, s) == pytest.approx(curve.rel_to_abs(point), abs=1e-6)
+
+
+@pytest.mark.filterwarnings("ignore::scenic.formats.opendrive.OpenDriveWarning")
+def test_parallel_geometry():
+    path = Path("assets") / "maps" / "CARLA" / "Town01.xodr"
+    maps = []
+    for workers in (None, 2):
+        roadMap = RoadMap()
+        roadMap.parse(path)
+        roadMap.calculate_geometry(10, calc_gap=True, workers=workers)
+        maps.append(roadMap)
+    serial, parallel = maps
+    assert list(parallel.roads) == list(serial.roads)
+    for road in serial.roads.values():
+        assert parallel.roads[road.id_].sec_points == road.sec_points
+    for region in ("drivable_region", "sidewalk_region", "intersection_region"):
+        expected = getattr(serial, region)
+        actual = getattr(parallel, region)
+        assert actual.area == pytest.approx(expected.area, rel=1e-3)
+        assert actual.symmetric_difference(expected).area < 1e-3 * expected.area
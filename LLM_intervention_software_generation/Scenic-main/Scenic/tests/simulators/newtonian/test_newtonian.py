@@ -1,5 +1,7 @@
 import os
 from pathlib import Path
+import random
+import time
 
 from PIL import Image as IPImage
 import pytest
@@ -38,6 +40,44 @@ def test_driving_2D(loadLocalScenario):
     check()  # If we fail here, something is leaking.
 
 
+def test_follow_lane_destination(loadLocalScenario):
+    scenario = loadLocalScenario("route.scenic", mode2D=True)
+    scene, _ = scenario.generate(maxIterations=1)
+    simulation = scenario.getSimulator().simulate(scene, maxSteps=3)
+    assert simulation.result.records["turning"]
+    assert len(simulation.result.trajectory) == 4
+
+
+def test_vectorized(loadLocalScenario):
+    scenario = loadLocalScenario("driving.scenic", mode2D=True)
+    random.seed(4)
+    scene, _ = scenario.generate(maxIterations=1000)
+    results = []
+    for vectorized in (False, True):
+        simulator = NewtonianSimulator(vectorized=vectorized)
+        simulation = simulator.simulate(scene, maxSteps=2)
+        results.append(simulation.result)
+    trajectories = [result.trajectory for result in results]
+    assert trajectories[0][0] != trajectories[0][-1]
+    for before, after in zip(*trajectories):
+        for pos1, pos2 in zip(before, after):
+            assert pos1 == pytest.approx(pos2)
+
+
+def test_realtime(loadLocalScenario):
+    scenario = loadLocalScenario("basic.scenic")
+    scene, _ = scenario.generate(maxIterations=1)
+    for realtime in (False, True):
+        simulator = NewtonianSimulator(realtime=realtime)
+        startTime = time.monotonic()
+        simulator.simulate(scene, maxSteps=4, timestep=0.1)
+        elapsed = time.monotonic() - startTime
+        if realtime:
+            assert elapsed >= 0.3
+        else:
+            assert elapsed < 0.3
+
+
 @pytest.mark.graphical
 def test_gif_creation(loadLocalScenario):
     scenario = loadLocalScenario("driving.scenic", mode2D=True)
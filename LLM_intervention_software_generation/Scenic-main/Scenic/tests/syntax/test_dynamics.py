@@ -1,5 +1,4 @@
 import inspect
-import signal
 import sys
 
 import pytest
@@ -189,7 +188,6 @@ def test_behavior_no_actions():
         )
 
 
-@pytest.mark.skipif(not hasattr(signal, "SIGALRM"), reason="need SIGALRM")
 @pytest.mark.slow
 def test_behavior_stuck(monkeypatch):
     scenario = compileScenic(
@@ -1378,6 +1376,30 @@ def test_require_implies_3():
     assert result is None
 
 
+def test_require_shared_atomics():
+    scenario = compileScenic(
+        """
+        calls = []
+        def check(value):
+            calls.append(value)
+            return value < 100
+        behavior Foo():
+            while True:
+                take self.blah
+                self.blah += 1
+        ego = new Object with behavior Foo, with blah 0
+        require always check(ego.blah) or ego.blah > 200
+        require eventually check(ego.blah) and ego.blah > 1
+        record final len(calls) as calls
+        """
+    )
+    result = sampleResultOnce(scenario, maxSteps=3).result
+    assert result.terminationType is TerminationType.timeLimit
+    # check() is called once per requirement when sampling the scene, then only once
+    # per time step (at times 0-3) since the two requirements share it
+    assert result.records["calls"] == 2 + 4
+
+
 ## Monitors
 
 
@@ -201,3 +201,48 @@ def test_malformed_model():
 def test_missing_model():
     with pytest.raises(InvalidScenarioError):
         compileScenic("model __no_such_package__")
+
+
+def test_bytecode_cache(tmp_path, monkeypatch):
+    import scenic.syntax.translator as translator
+
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    (tmp_path / "cachedhelper.scenic").write_text("param helper = 'cached'\n")
+    program = tmp_path / "program.scenic"
+    program.write_text(
+        "import cachedhelper\nego = new Object at (Range(1, 2), 0)\nrequire ego.x > 1\n"
+    )
+    scenario = scenarioFromFile(str(program))
+    caches = sorted(path.name.split(".")[0] for path in tmp_path.glob("__pycache__/*"))
+    assert caches == ["cachedhelper", "program"]
+
+    # Recompiling uses the cache for both the program and the imported module
+    def fail(*args, **kwargs):
+        raise AssertionError("should not be called")
+
+    with monkeypatch.context() as m:
+        m.setattr(translator, "compileSource", fail)
+        scenario = scenarioFromFile(str(program))
+    scene = sampleScene(scenario, maxIterations=100)
+    assert scene.params["helper"] == "cached"
+    assert len(scenario.requirements) == 1
+
+    # Changing the source invalidates the cache
+    program.write_text("import cachedhelper\nego = new Object at (5, 0)\n")
+    scene = sampleScene(scenarioFromFile(str(program)))
+    assert scene.egoObject.x == 5
+
+    # So does changing the compiler
+    compiled = []
+    compileSource = translator.compileSource
+
+    def recordingCompile(*args, **kwargs):
+        compiled.append(args)
+        return compileSource(*args, **kwargs)
+
+    monkeypatch.setattr(translator, "compileSource", recordingCompile)
+    scenarioFromFile(str(program))
+    assert not compiled
+    monkeypatch.setattr(translator, "_compilerFingerprint", lambda: "edited")
+    scenarioFromFile(str(program))
+    assert len(compiled) == 2
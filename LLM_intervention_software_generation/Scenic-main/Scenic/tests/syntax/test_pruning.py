@@ -3,7 +3,9 @@ import random
 
 import pytest
 
+from scenic.core import pruning
 from scenic.core.errors import InconsistentScenarioError
+from scenic.core.regions import VoxelRegion
 from scenic.core.vectors import Vector
 from tests.utils import compileScenic, sampleEgo, sampleParamP
 
@@ -73,6 +75,88 @@ def test_containment_2d_region():
     assert any(0.5 <= x <= 0.7 or 1.3 <= x <= 1.5 for x in xs)
 
 
+def test_containment_mesh_voxels():
+    """Test pruning of a mesh container using a voxel approximation."""
+    scenario = compileScenic(
+        """
+        workspace = Workspace(BoxRegion(dimensions=(4, 4, 4)))
+        ego = new Object in workspace, with width 2, with length 2, with height 2
+        """
+    )
+    # The position should be sampled from an eroded voxel approximation of the box
+    pruned = scenario.objects[0].position._conditioned.region
+    assert isinstance(pruned, VoxelRegion)
+    assert pruned.size < 0.7 * 4**3
+    assert pruned.containsPoint((0.99, -0.99, 0.99))
+    assert not pruned.containsPoint((0, 0, 1.9))
+    for i in range(30):
+        pos = sampleEgo(scenario, maxIterations=100).position
+        assert all(-1 <= coord <= 1 for coord in pos)
+
+
+def test_pruning_cache(monkeypatch):
+    """Test that pruning results are shared between scenarios, and computed in parallel."""
+    monkeypatch.setattr("scenic.syntax.translator.usePruning", False)
+    pruning.clearCache()
+    code = """
+        workspace = Workspace(PolygonalRegion([0@0, 2@0, 2@2, 0@2]))
+        ego = new Object in workspace, with allowCollisions True
+        other = new Object in workspace, with width 0.5, with length 0.5,
+            with allowCollisions True
+        param p = other.position
+        """
+    scenario = compileScenic(code)
+    statistics = pruning.prune(scenario, verbosity=0, workers=2)
+    assert [s.name for s in statistics] == [
+        "Containment",
+        "Relative heading",
+        "Visibility",
+    ]
+    containment = statistics[0]
+    assert containment.time >= 0
+    assert containment.cacheHits == 0
+    assert len(containment.percentages) == 2
+    assert all(0 < p < 100 for p in containment.percentages)
+    xs = [sampleEgo(scenario).position.x for i in range(30)]
+    assert all(0.5 <= x <= 1.5 for x in xs)
+
+    # Compiling the scenario again reuses the pruned regions
+    scenario = compileScenic(code)
+    containment = pruning.prune(scenario, verbosity=0, workers=1)[0]
+    assert containment.cacheHits == 2
+    assert len(containment.percentages) == 2
+    xs = [sampleEgo(scenario).position.x for i in range(30)]
+    assert all(0.5 <= x <= 1.5 for x in xs)
+    ps = [sampleParamP(scenario).x for i in range(30)]
+    assert all(0.25 <= x <= 1.75 for x in ps)
+    assert any(x < 0.5 or x > 1.5 for x in ps)
+    pruning.clearCache()
+
+
+def test_pruning_cache_bytes(monkeypatch):
+    """Test that the pruning cache is bounded by the size of the cached geometry."""
+    monkeypatch.setattr("scenic.syntax.translator.usePruning", False)
+    pruning.clearCache()
+    code = """
+        workspace = Workspace(PolygonalRegion([0@0, 2@0, 2@2, 0@2]))
+        ego = new Object in workspace, with allowCollisions True
+        """
+    scenario = compileScenic(code)
+    pruning.prune(scenario, verbosity=0)
+    assert len(pruning._cache) == 1
+    ((result, size),) = pruning._cache.values()
+    assert size == pruning.resultSize(result) > 0
+
+    monkeypatch.setattr(pruning, "PRUNING_CACHE_BYTES", size - 1)
+    pruning.clearCache()
+    scenario = compileScenic(code)
+    containment = pruning.prune(scenario, verbosity=0)[0]
+    assert containment.cacheHits == 0
+    assert not pruning._cache
+    xs = [sampleEgo(scenario).position.x for i in range(30)]
+    assert all(0.5 <= x <= 1.5 for x in xs)
+
+
 def test_containment_in_polyline():
     """As above, but when the object is placed on a polyline."""
     scenario = compileScenic(
@@ -0,0 +1,69 @@
+"""Tests for the parallel batch runner."""
+
+import json
+
+import pytest
+
+from scenic.batch import main, simulateBatch
+from scenic.syntax.translator import scenarioFromFile
+
+program = """
+import scenic
+simulator scenic.core.simulators.DummySimulator()
+ego = new Object at (Range(-5, 5), 0)
+record final ego.position.x as x
+"""
+
+
+@pytest.fixture
+def scenicFile(tmp_path):
+    path = tmp_path / "test.scenic"
+    path.write_text(program)
+    return str(path)
+
+
+def test_batch(scenicFile):
+    results = list(simulateBatch(scenicFile, 4, workers=2, seed=7, maxSteps=2))
+    assert sorted(result.index for result in results) == [0, 1, 2, 3]
+    for result in results:
+        assert result.error is None
+        assert result.steps == 2
+        assert result.terminationType == "timeLimit"
+
+    # Results do not depend on the number of workers
+    serial = list(simulateBatch(scenicFile, 4, workers=1, seed=7, maxSteps=2))
+    xs = {result.index: result.records["x"] for result in results}
+    assert xs == {result.index: result.records["x"] for result in serial}
+    assert len(set(xs.values())) == 4
+
+    # Simulations can be replayed from their serialized form
+    scenario = scenarioFromFile(scenicFile)
+    simulator = scenario.getSimulator()
+    result = results[0]
+    replay = result.replay(scenario, simulator, maxSteps=2)
+    assert replay.result.records["x"] == result.records["x"]
+
+
+def test_batch_errors(scenicFile):
+    files = [scenicFile, scenicFile + ".missing"]
+    results = list(simulateBatch(files, workers=2, maxSteps=1))
+    results.sort(key=lambda result: result.file)
+    assert results[0].error is None
+    assert results[1].error.startswith("BadRequestError: cannot read")
+    assert results[1].simulation is None
+
+
+def test_batch_main(scenicFile, tmp_path, capsys):
+    output = tmp_path / "results"
+    status = main(
+        ["--count", "2", "--workers", "2", "--time", "1", "-o", str(output), scenicFile]
+    )
+    assert status == 0
+    assert capsys.readouterr().out.count(": 1 steps,") == 2
+    with open(output / "results.jsonl") as stream:
+        summaries = [json.loads(line) for line in stream]
+    assert sorted(summary["simulation"] for summary in summaries) == [
+        "test-0.replay",
+        "test-1.replay",
+    ]
+    assert (output / "test-0.replay").stat().st_size > 0
@@ -4,6 +4,7 @@ import inspect
 import os
 import re
 import subprocess
+import sys
 
 import pytest
 
@@ -106,3 +107,83 @@ def test_time(runAndGetRecordR):
         options=["--time", "5"],
     )
     assert r == "10"
+
+
+def test_workers(runAndGetRecordR):
+    r = runAndGetRecordR(
+        """
+        ego = new Object
+        record final simulation().currentTime as r
+    """,
+        options=["--time", "3", "--workers", "2"],
+    )
+    assert r == "3"
+
+
+def test_workers_gather_stats(tmpdir):
+    path = os.path.join(tmpdir, "test.sc")
+    with open(path, "w") as f:
+        f.write("ego = new Object\n")
+    args = ["scenic", path, "-S", "--count", "2", "--workers", "2", "--gather-stats", "1"]
+    result = subprocess.run(args, capture_output=True, text=True)
+    assert result.returncode == 2
+    assert "--gather-stats cannot be used with --workers" in result.stderr
+
+
+## Startup time
+
+
+def importTimes(*args):
+    """Run Python with ``-X importtime``, returning cumulative import times in μs."""
+    command = [sys.executable, "-X", "importtime", *args]
+    result = subprocess.run(command, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize(
+    "args",
+    (
+        ("-c", "import scenic"),
+        ("-c", "import scenic.core.serialization"),
+        ("-m", "scenic", "--help"),
+    ),
+)
+def test_startup_imports(args):
+    times = importTimes(*args)
+    assert "scenic" in times
+    # Neither the compiler nor the mesh library should be imported
+    assert "scenic.syntax.translator" not in times
+    assert "trimesh" not in times
+
+
+def test_lazy_attributes():
+    code = (
+        "import sys, scenic\n"
+        "assert 'scenic.syntax.translator' not in sys.modules\n"
+        "assert callable(scenic.scenarioFromString)\n"
+        "assert 'scenic.syntax.translator' in sys.modules\n"
+        "assert scenic.syntax.translator.scenarioFromFile is scenic.scenarioFromFile\n"
+    )
+    times = importTimes("-c", code)
+    assert "trimesh" in times
+
+
+def test_startup_time_benchmark():
+    def importTime(module):
+        # Time to import the scenic package and then the module, best of 3 runs
+        def total(times):
+            return sum(times[name] for name in {"scenic", module})
+
+        return min(total(importTimes("-c", f"import {module}")) for _ in range(3))
+
+    # Importing Scenic should take only a fraction of the time needed for the compiler
+    lazyTime = importTime("scenic")
+    eagerTime = importTime("scenic.syntax.translator")
+    assert lazyTime < eagerTime / 4
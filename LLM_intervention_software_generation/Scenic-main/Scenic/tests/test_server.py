@@ -0,0 +1,187 @@
+"""Tests for the scenario server."""
+
+import base64
+import json
+import os
+import socket
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from scenic.server import ScenarioServer, isLoopback, makeHTTPServer, writeToken
+
+program = """
+import scenic
+simulator scenic.core.simulators.DummySimulator()
+param p = Range(0, 1)
+ego = new Object at (Range(-5, 5), 0)
+record final ego.position.x as x
+"""
+
+
+@pytest.fixture
+def scenicFile(tmp_path):
+    path = tmp_path / "test.scenic"
+    path.write_text(program)
+    return str(path)
+
+
+def test_server_cache(scenicFile, tmp_path):
+    server = ScenarioServer(cacheSize=2)
+    scenario = server.scenarioFor({"file": scenicFile})
+    assert server.scenarioFor({"file": scenicFile}) is scenario
+    withParams = server.scenarioFor({"file": scenicFile, "params": {"p": 2}})
+    assert withParams is not scenario
+
+    # Editing the file causes it to be recompiled
+    with open(scenicFile, "a") as f:
+        f.write("new Object at (0, 10)\n")
+    edited = server.scenarioFor({"file": scenicFile})
+    assert edited is not scenario
+    assert len(edited.objects) == 2
+
+    # Least recently used scenarios are evicted
+    other = tmp_path / "other.scenic"
+    other.write_text("ego = new Object")
+    server.scenarioFor({"file": str(other)})
+    assert server.scenarioFor({"file": scenicFile}) is edited
+    assert server.scenarioFor({"file": scenicFile, "params": {"p": 2}}) is not withParams
+
+
+def test_server_requests(scenicFile):
+    server = ScenarioServer()
+    request = {"file": scenicFile, "seed": 12}
+    response = server.handle("generate", dict(request, count=2))
+    assert len(response["scenes"]) == 2
+    assert (
+        response["scenes"] == server.handle("generate", dict(request, count=2))["scenes"]
+    )
+
+    scene = response["scenes"][0]
+    scenario = server.scenarioFor(request)
+    sim = server.handle("simulate", dict(request, scene=scene, maxSteps=3))
+    assert sim["steps"] == 3
+    x = sim["records"]["x"]
+    assert x == scenario.sceneFromBytes(base64.b64decode(scene)).egoObject.position.x
+
+    replay = server.handle(
+        "replay", dict(request, simulation=sim["simulation"], maxSteps=3)
+    )
+    assert replay["records"]["x"] == x
+    with pytest.raises(ValueError):
+        server.handle("frobnicate", request)
+    server.close()
+
+
+class ServerClient:
+    """An HTTP server running in a separate thread, with helpers to make requests."""
+
+    def __init__(self, scenarioServer, **kwargs):
+        self.httpServer = makeHTTPServer(scenarioServer, **kwargs)
+        threading.Thread(target=self.httpServer.serve_forever, daemon=True).start()
+        host, self.port = self.httpServer.server_address[:2]
+        self.host = f"[{host}]" if ":" in host else host
+
+    def post(self, command, request, contentType="application/json", **headers):
+        data = request if isinstance(request, bytes) else json.dumps(request).encode()
+        url = f"http://{self.host}:{self.port}/{command}"
+        headers["Content-Type"] = contentType
+        httpRequest = urllib.request.Request(url, data=data, headers=headers)
+        with urllib.request.urlopen(httpRequest) as response:
+            return json.load(response)
+
+    def statusOf(self, *args, **kwargs):
+        with pytest.raises(urllib.error.HTTPError) as info:
+            self.post(*args, **kwargs)
+        return info.value.code
+
+    def close(self):
+        self.httpServer.shutdown()
+        self.httpServer.server_close()
+
+
+def test_server_http(scenicFile, monkeypatch):
+    scenarioServer = ScenarioServer()
+    client = ServerClient(scenarioServer)
+    statusOf = client.statusOf
+    try:
+        response = client.post("generate", {"file": scenicFile})
+        assert len(response["scenes"]) == 1
+
+        # Invalid requests
+        assert statusOf("generate", {"file": scenicFile + ".missing"}) == 400
+        assert statusOf("frobnicate", {"file": scenicFile}) == 400
+        assert statusOf("generate", b"{") == 400
+        assert statusOf("generate", {"file": scenicFile, "count": "2"}) == 400
+        assert statusOf("simulate", {"file": scenicFile, "maxSteps": 1.5}) == 400
+        assert statusOf("simulate", {"file": scenicFile, "scene": "!"}) == 400
+        assert statusOf("replay", {"file": scenicFile}) == 400
+
+        # Requests which browsers could send cross-origin are refused
+        assert statusOf("generate", {"file": scenicFile}, contentType="text/plain") == 415
+
+        # Internal errors
+        def fail(*args):
+            raise RuntimeError("internal")
+
+        monkeypatch.setattr(scenarioServer, "handle", fail)
+        assert statusOf("generate", {"file": scenicFile}) == 500
+    finally:
+        client.close()
+
+
+def test_server_rebinding(scenicFile):
+    """Test that requests from web pages on other hosts are refused."""
+    client = ServerClient(ScenarioServer())
+    request = {"file": scenicFile}
+    port = client.port
+    try:
+        for host in (f"localhost:{port}", f"127.0.0.1:{port}", f"[::1]:{port}"):
+            assert client.post("generate", request, Host=host)["scenes"]
+        for host in (f"evil.example.com:{port}", "localhost", f"localhost:{port + 1}"):
+            assert client.statusOf("generate", request, Host=host) == 403
+        origin = f"http://localhost:{port}"
+        assert client.post("generate", request, Origin=origin)["scenes"]
+        for origin in ("http://evil.example.com", "null"):
+            assert client.statusOf("generate", request, Origin=origin) == 403
+    finally:
+        client.close()
+
+
+def test_server_token(scenicFile, tmp_path):
+    tokenFile = tmp_path / "token"
+    token = writeToken(tokenFile)
+    assert tokenFile.read_text() == token
+    if os.name == "posix":
+        assert tokenFile.stat().st_mode & 0o777 == 0o600
+    client = ServerClient(ScenarioServer(), token=token)
+    request = {"file": scenicFile}
+    try:
+        assert client.statusOf("generate", request) == 401
+        assert client.statusOf("generate", request, Authorization="Bearer x") == 401
+        auth = f"Bearer {token}"
+        assert client.post("generate", request, Authorization=auth)["scenes"]
+    finally:
+        client.close()
+
+
+@pytest.mark.skipif(not socket.has_ipv6, reason="IPv6 not supported")
+def test_server_ipv6(scenicFile):
+    try:
+        client = ServerClient(ScenarioServer(), host="::1")
+    except OSError as e:
+        pytest.skip(f"cannot listen on ::1: {e}")
+    try:
+        assert client.post("generate", {"file": scenicFile})["scenes"]
+    finally:
+        client.close()
+
+
+def test_server_remote():
+    assert isLoopback("localhost")
+    assert isLoopback("::1")
+    assert not isLoopback("0.0.0.0")
+    with pytest.raises(ValueError):
+        makeHTTPServer(ScenarioServer(), host="0.0.0.0")